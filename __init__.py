@@ -62,6 +62,7 @@ def _check_blender_version() -> bool:
 _classes = [
     preferences.PathToolPreferences,
     operators.MESH_OT_select_path,
+    operators.MESH_OT_select_path_batch,
 ]
 
 _register_cls, _unregister_cls = bpy.utils.register_classes_factory(classes=_classes)
@@ -3,6 +3,7 @@
 import bpy
 
 from . import operators
+from .utils import inputs
 
 km_path_tool_name = "3D View Tool: Edit Mesh, Path Tool"
 
@@ -45,8 +46,12 @@ def register():
     keyconfig_init_from_data(kc_default, _generate_empty_keymap())
     keyconfig_init_from_data(kc_addon, _generate_tool_keymap())
 
+    inputs.subscribe_keymap_changes()
+
 
 def unregister():
+    inputs.unsubscribe_keymap_changes()
+
     wm = bpy.context.window_manager
 
     blender_keyconfig_name = "blender"
@@ -38,18 +38,29 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
     popup_menu_pie_draw = utils.ui.popup_menu_pie_draw
 
     __slots__ = (
-        "mouse_buttons",
-        "navigation_evkeys",
-        "modal_action_evkeys",
-        "undo_redo_evkeys",
+        "modal_evkeys",
         "bm_seq",
+        "mesh_seq",
+        "graph_seq",
+        "warmup_seq",
+        "warmup_queue",
+        "warmup_executor",
+        "warmup_total",
+        "warmup_timer",
+        "control_index",
+        "draw_layer",
         "initial_select",
         "draw_handle_3d",
+        "draw_handle_2d",
+        "timer",
+        "profile",
+        "recorder",
+        "header_text",
         "navigation_element",
         "is_mouse_pressed",
         "is_navigation_active",
+        "use_compact_pathes",
         "path_seq",
-        "mesh_islands",
         "drag_elem_indices",
         "_active_path_index",
         "_drag_elem",
@@ -57,18 +68,19 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
         "undo_history",
         "redo_history",
         "markup_seq",
-        "active_index"
+        "stored_pathes_seq",
     )
 
     def invoke(self, context, event):
         wm = context.window_manager
 
-        # Stadard input event keys (type, value, alt, ctrl, shift)
-        kc = wm.keyconfigs.user
-        self.mouse_buttons = utils.inputs.get_mouse_buttons(wm)
-        self.navigation_evkeys = utils.inputs.get_navigation_evkeys(kc)
-        self.modal_action_evkeys = utils.inputs.get_modal_action_evkeys(kc)
-        self.undo_redo_evkeys = utils.inputs.get_undo_redo_evkeys(kc)
+        preferences = context.preferences.addons[__package__].preferences
+        # Profile and recording are started only if session is not cancelled by the first click
+        self.profile = None
+        self.recorder = None
+
+        # Stadard input event keys (type, value, alt, ctrl, shift) - modal action, cached until keyconfigs change
+        self.modal_evkeys = utils.inputs.get_modal_evkeys(wm)
 
         # Setup mesh select mode
         tool_settings = context.scene.tool_settings
@@ -81,6 +93,19 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
         tool_settings.mesh_select_mode = mesh_mode
 
         self.bm_seq = []
+        self.mesh_seq = {}
+        self.graph_seq = {}
+        self.warmup_seq = {}
+        self.warmup_queue = []
+        self.warmup_executor = None
+        self.warmup_total = 0
+        self.warmup_timer = None
+        self.control_index = utils.spatial.ControlElementsIndex()
+        self.draw_layer = utils.draw.DrawLayer()
+        self.timer = utils.timing.StageTimer(is_enabled=preferences.show_timing != 'NONE')
+        self._drag_elem = None
+        self.use_compact_pathes = preferences.use_compact_pathes
+        self.path_seq = []
         self.gen_bmeshes(context)
 
         if initial_select_mode[0]:
@@ -92,23 +117,34 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
         self.initial_select = self.get_selected_elements(mesh_elements)
         self.draw_handle_3d = bpy.types.SpaceView3D.draw_handler_add(
             utils.draw.draw_callback_3d, (self,), 'WINDOW', 'POST_VIEW')
+        self.draw_handle_2d = None
+        if preferences.show_timing == 'OVERLAY':
+            self.draw_handle_2d = bpy.types.SpaceView3D.draw_handler_add(
+                utils.draw.draw_callback_2d, (self,), 'WINDOW', 'POST_PIXEL')
         # Prevent first click empty space
         elem, _ = self.get_element_by_mouse(context, event)
         if not elem:
             tool_settings.mesh_select_mode = initial_select_mode
             self.cancel(context)
             return {'CANCELLED'}
+
+        if preferences.use_profile:
+            self.profile = utils.timing.start_profile()
+        if preferences.use_record:
+            self.recorder = utils.replay.SessionRecorder(
+                context, self.get_session_directory(context), preferences.use_session_fills,
+                preferences.use_mesh_storage)
         #
         self.navigation_element = elem
 
         self.is_mouse_pressed = False
         self.is_navigation_active = False
         #
-        context.area.header_text_set("Path Tool (%s)" % header_text_mode)
+        self.header_text = "Path Tool (%s)" % header_text_mode
+        context.area.header_text_set(self.header_text)
         wm.modal_handler_add(self)
 
         self.path_seq = []
-        self.mesh_islands = []
         self.drag_elem_indices = []
 
         self._active_path_index = None
@@ -121,25 +157,176 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
 
         self.select_only_seq = {}
         self.markup_seq = {}
+        self.stored_pathes_seq = {}
+
+        # Objects are prepared in background, header shows progress until all of them are ready
+        self.start_warmup(context)
+        if self.get_warmup_progress() is not None:
+            self.warmup_timer = wm.event_timer_add(0.1, window=context.window)
+            self.update_warmup_progress(context)
+
+        if preferences.use_mesh_storage and self.restore_pathes(context):
+            # The first click starts a new path, clicks on restored pathes change them
+            self._just_closed_path = True
 
         self.modal(context, event)
         return {'RUNNING_MODAL'}
 
-    def cancel(self, context):
+    def remove_draw_handlers(self):
         bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle_3d, 'WINDOW')
+        if self.draw_handle_2d is not None:
+            bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle_2d, 'WINDOW')
+
+    def remove_warmup_timer(self, context):
+        if self.warmup_timer is not None:
+            context.window_manager.event_timer_remove(self.warmup_timer)
+            self.warmup_timer = None
+
+    def update_warmup_progress(self, context):
+        """Show count of prepared objects in header, timer is removed when all of them are ready"""
+        progress = self.get_warmup_progress()
+        if progress is None:
+            self.remove_warmup_timer(context)
+            context.area.header_text_set(self.header_text)
+            if self.timer.is_enabled:
+                self.update_timing_readout(context)
+        else:
+            context.area.header_text_set("%s  |  Preparing objects %d/%d" % ((self.header_text,) + progress))
+
+    def save_debug_data(self, context):
+        """Save session recording and profile, if enabled"""
+        if (self.recorder is None) and (self.profile is None):
+            return
+        preferences = context.preferences.addons[__package__].preferences
+        directory = bpy.path.abspath(preferences.debug_directory) or bpy.app.tempdir
+        name = bpy.path.clean_name(context.active_object.name) if context.active_object else "session"
+
+        if self.recorder is not None:
+            mark_options = {n: getattr(self, n) for n in utils.replay.MARK_OPTIONS}
+            filepath = self.recorder.save(directory, name, mark_options)
+            self.recorder = None
+            self.report({'INFO'}, message="Session recording saved to %s" % filepath)
+
+        if self.profile is not None:
+            filepath = utils.timing.save_profile(self.profile, directory, name)
+            self.profile = None
+            self.report({'INFO'}, message="Profile saved to %s" % filepath)
+
+    def cancel(self, context):
+        self.remove_warmup_timer(context)
+        self.end_warmup()
+        self.remove_draw_handlers()
         self.set_selection_state(self.initial_select, True)
         self.update_meshes(context)
         context.area.header_text_set(None)
+        self.save_debug_data(context)
+
+    @staticmethod
+    def get_session_directory(context):
+        preferences = context.preferences.addons[__package__].preferences
+        directory = preferences.session_directory
+        # Relative directory can not be used for unsaved file
+        if directory.startswith("//") and not bpy.data.filepath:
+            return bpy.app.tempdir
+        return bpy.path.abspath(directory)
+
+    def update_timing_readout(self, context):
+        preferences = context.preferences.addons[__package__].preferences
+        if preferences.show_timing == 'HEADER':
+            context.area.header_text_set("  |  ".join([self.header_text] + self.timer.format_stats()))
+        else:
+            context.area.tag_redraw()
+
+    def get_context_menu_action(self):
+        """Modal action chosen in context pie menu (or None), choice is cleared"""
+        for action in ('APPLY', 'TCLPATH', 'CHDIR', 'SAVE', 'LOAD'):
+            if action in self.context_action:
+                self.context_action = set()
+                return action
+        for action in ('UNDO', 'REDO'):
+            if action in self.context_undo:
+                self.context_undo = set()
+                return action
+
+    # Modal action handlers. Return value is returned by modal if it is not None
+
+    def modal_cancel(self, context, event):
+        self.cancel(context)
+        return {'CANCELLED'}
+
+    def modal_apply(self, context, event):
+        self.context_action = set()
+
+        self.gen_final_elements_seq(context)
+        preferences = context.preferences.addons[__package__].preferences
+        if preferences.use_mesh_storage:
+            self.gen_stored_pathes_seq(context)
+
+        context.area.header_text_set(None)
+        self.remove_warmup_timer(context)
+        self.end_warmup()
+        self.remove_draw_handlers()
+        ret = self.execute(context)
+        self.save_debug_data(context)
+        return ret
+
+    def modal_undo(self, context, event):
+        return utils.redo.undo(self, context)
+
+    def modal_redo(self, context, event):
+        utils.redo.redo(self, context)
+
+    def modal_context_menu(self, context, event):
+        wm = context.window_manager
+        wm.popup_menu_pie(event=event, draw_func=self.popup_menu_pie_draw, title='Path Tool', icon='NONE')
+
+    def modal_save(self, context, event):
+        preferences = context.preferences.addons[__package__].preferences
+        directory = self.get_session_directory(context)
+        try:
+            count = self.save_session(context, directory, preferences.use_session_fills)
+        except OSError as err:
+            self.report({'WARNING'}, message="Unable to save paths: %s" % err)
+        else:
+            self.report({'INFO'}, message="Saved %d paths to %s" % (count, directory))
+
+    def modal_load(self, context, event):
+        directory = self.get_session_directory(context)
+        count = self.load_session(context, directory)
+        self.report({'INFO'}, message="Loaded %d paths from %s" % (count, directory))
+
+    modal_handlers = {
+        'CANCEL': modal_cancel,
+        'APPLY': modal_apply,
+        'UNDO': modal_undo,
+        'REDO': modal_redo,
+        'CONTEXT_MENU': modal_context_menu,
+        'SAVE': modal_save,
+        'LOAD': modal_load,
+    }
+
+    # Modal actions of interaction with control elements - (InteractEvent, mouse pressed state or None if unchanged)
+    modal_interact_events = {
+        'TCLPATH': (InteractEvent.CLOSE, None),
+        'CHDIR': (InteractEvent.CHDIR, None),
+        'ADD': (InteractEvent.ADD, True),
+        'ADD_NEW_PATH': (InteractEvent.ADD_NEW_PATH, True),
+        'REMOVE': (InteractEvent.REMOVE, False),
+        'RELEASE': (InteractEvent.RELEASE, False),
+    }
 
     def modal(self, context, event):
+        if event.type == 'TIMER' and self.warmup_timer is not None:
+            self.warmup_step(context)
+            self.update_warmup_progress(context)
+            return {'PASS_THROUGH'}
+
         evkey = utils.inputs.get_evkey(event)
-        select_mb, context_mb = self.mouse_buttons
-        modal_action = self.modal_action_evkeys.get(evkey, None)
-        undo_redo_action = self.undo_redo_evkeys.get(evkey, None)
+        modal_action = self.modal_evkeys.get(evkey, None)
         interact_event = None
 
         # Navigation
-        if evkey in self.navigation_evkeys:
+        if modal_action == 'NAVIGATION':
             return {'PASS_THROUGH'}
 
         elif self.is_navigation_active and event.value == 'RELEASE':
@@ -148,68 +335,23 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
             self.update_meshes(context)
             return {'RUNNING_MODAL'}
 
-        # Cancel
-        elif modal_action == 'CANCEL':
-            self.cancel(context)
-            return {'CANCELLED'}
+        # Context pie menu choice is handled before other events, except of cancel
+        if (modal_action not in ('CANCEL', 'APPLY')) and (self.context_action or self.context_undo):
+            modal_action = self.get_context_menu_action()
 
-        # Apply all
-        elif (modal_action == 'APPLY') or ('APPLY' in self.context_action):
-            self.context_action = set()
-
-            self.gen_final_elements_seq(context)
-
-            context.area.header_text_set(None)
-            bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle_3d, 'WINDOW')
-            return self.execute(context)
-
-        # Close path
-        elif 'TCLPATH' in self.context_action:
-            self.context_action = set()
-            interact_event = InteractEvent.CLOSE
-
-        # Switch direction
-        elif 'CHDIR' in self.context_action:
-            self.context_action = set()
-            interact_event = InteractEvent.CHDIR
-
-        # Undo
-        elif (undo_redo_action == 'UNDO') or ('UNDO' in self.context_undo):
-            self.context_undo = set()
-            return utils.redo.undo(self, context)
-
-        # Redo
-        elif (undo_redo_action == 'REDO') or ('REDO' in self.context_undo):
-            self.context_undo = set()
-            utils.redo.redo(self, context)
-
-        # Open context pie menu
-        elif evkey == (context_mb, 'PRESS', False, False, False):  # Context menu mouse button
-            wm = context.window_manager
-            wm.popup_menu_pie(event=event, draw_func=self.popup_menu_pie_draw, title='Path Tool', icon='NONE')
-
-        # Select mouse button
-        elif evkey == (select_mb, 'PRESS', False, False, False):
-            self.is_mouse_pressed = True
-            interact_event = InteractEvent.ADD
-
-        # Select mouse button + Shift
-        elif evkey == (select_mb, 'PRESS', False, False, True):
-            self.is_mouse_pressed = True
-            interact_event = InteractEvent.ADD_NEW_PATH
-
-        # Select mouse button + Ctrl
-        elif evkey == (select_mb, 'PRESS', False, True, False):
-            self.is_mouse_pressed = False
-            interact_event = InteractEvent.REMOVE
-
-        # Release select mouse event
-        elif evkey in ((select_mb, 'RELEASE', False, False, False),
-                       (select_mb, 'RELEASE', False, True, False),
-                       (select_mb, 'RELEASE', False, False, True),
-                       ):
-            self.is_mouse_pressed = False
-            interact_event = InteractEvent.RELEASE
+        if (self.recorder is not None) and (modal_action in utils.replay.SESSION_EVENTS):
+            self.recorder.add(modal_action, event=event)
+
+        if modal_action is not None:
+            handler = self.modal_handlers.get(modal_action, None)
+            if handler is not None:
+                ret = handler(self, context, event)
+                if ret is not None:
+                    return ret
+            else:
+                interact_event, is_mouse_pressed = self.modal_interact_events[modal_action]
+                if is_mouse_pressed is not None:
+                    self.is_mouse_pressed = is_mouse_pressed
 
         if self.is_mouse_pressed:
             if evkey[0] == 'MOUSEMOVE':
@@ -217,6 +359,8 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
 
         if interact_event is not None:
             elem, matrix_world = self.get_element_by_mouse(context, event)
+            if self.recorder is not None:
+                self.recorder.add(interact_event.name, matrix_world, elem, event)
             if elem:
                 self.navigation_element = elem
             self.interact_control_element(context, elem, matrix_world, interact_event)
@@ -224,6 +368,9 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
             self.set_selection_state(self.initial_select, True)
             self.update_meshes(context)
 
+            if self.timer.is_enabled:
+                self.update_timing_readout(context)
+
         # If removed the last control element of the last path
         if not len(self.path_seq):
             self.cancel(context)
@@ -242,50 +389,61 @@ class MESH_OT_select_path(utils.base.PathUtils, bpy.types.Operator):
         for ob, bm in self.bm_seq:
             ptr = ob.as_pointer()
 
-            if self.mark_select != 'NONE':
-                if ptr not in self.select_only_seq:
-                    print("Not found object %s in self.select_only_seq! This should never happen." % ob.name)
-                else:
-                    index_select_seq = self.select_only_seq[ptr]
-                    elem_seq = bm.edges
-                    if initial_select_mode[2]:
-                        elem_seq = bm.faces
-                    if self.mark_select == 'EXTEND':
-                        for i in index_select_seq:
-                            elem_seq[i].select_set(True)
-                    elif self.mark_select == 'SUBTRACT':
-                        for i in index_select_seq:
-                            elem_seq[i].select_set(False)
-                    elif self.mark_select == 'INVERT':
-                        for i in index_select_seq:
-                            elem_seq[i].select_set(not elem_seq[i].select)
-
-            if ptr not in self.markup_seq:
-                print("Not found object %s in self.markup_seq! This should never happen." % ob.name)
-            else:
-                index_markup_seq = self.markup_seq[ptr]
-                elem_seq = bm.edges
-                if self.mark_seam != 'NONE':
-                    if self.mark_seam == 'MARK':
-                        for i in index_markup_seq:
-                            elem_seq[i].seam = True
-                    elif self.mark_seam == 'CLEAR':
-                        for i in index_markup_seq:
-                            elem_seq[i].seam = False
-                    elif self.mark_seam == 'TOGGLE':
-                        for i in index_markup_seq:
-                            elem_seq[i].seam = not elem_seq[i].seam
-
-                if self.mark_sharp != 'NONE':
-                    if self.mark_sharp == 'MARK':
-                        for i in index_markup_seq:
-                            elem_seq[i].smooth = False
-                    elif self.mark_sharp == 'CLEAR':
-                        for i in index_markup_seq:
-                            elem_seq[i].smooth = True
-                    elif self.mark_sharp == 'TOGGLE':
-                        for i in index_markup_seq:
-                            elem_seq[i].smooth = not elem_seq[i].smooth
+            if ptr not in self.select_only_seq or ptr not in self.markup_seq:
+                print("Not found object %s in final elements sequences! This should never happen." % ob.name)
+                continue
+
+            utils.base.mark_elements(
+                bm, initial_select_mode[2], self.select_only_seq[ptr], self.markup_seq[ptr],
+                self.mark_select, self.mark_seam, self.mark_sharp)
+
+            if ptr in self.stored_pathes_seq:
+                self.store_pathes(ob, initial_select_mode[2], self.stored_pathes_seq[ptr])
 
         self.update_meshes(context)
         return {'FINISHED'}
+
+
+class MESH_OT_select_path_batch(bpy.types.Operator):
+    """
+    Non-modal markup of pathes from spec file (utils.batch), works in background mode.
+    Operator properties are used instead of mark options of spec file, select mode of spec file is used by default.
+    """
+    bl_idname = "mesh.select_path_batch"
+    bl_label = "Select Path Batch"
+    bl_description = "Mark up mesh elements along pathes given by control element indices in spec file"
+
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(
+        name="Spec File",
+        subtype='FILE_PATH',
+        description="JSON file with list of pathes",
+    )
+    select_mode: bpy.props.EnumProperty(
+        items=[
+            ('SPEC', "Spec File", "Select mode of spec file"),
+            ('EDGE', "Edge", "Control elements are vertices, pathes are along edges"),
+            ('FACE', "Face", "Control elements are faces, pathes are along faces"),
+        ],
+        name="Select Mode",
+        default='SPEC',
+    )
+    mark_select: utils.props.mark_select
+    mark_seam: utils.props.mark_seam
+    mark_sharp: utils.props.mark_sharp
+
+    def execute(self, context):
+        try:
+            data = utils.batch.load_spec(bpy.path.abspath(self.filepath))
+        except (OSError, ValueError) as err:
+            self.report({'ERROR'}, message="Unable to read spec file: %s" % err)
+            return {'CANCELLED'}
+
+        select_mode = data["select_mode"] if self.select_mode == 'SPEC' else self.select_mode
+        report = utils.batch.mark_pathes(
+            context, utils.batch.get_file_pathes(data), select_mode, self.mark_select, self.mark_seam, self.mark_sharp)
+        for message in report["messages"]:
+            self.report({'WARNING'}, message=message)
+        self.report({'INFO'}, message=utils.batch.format_report(report))
+        return {'FINISHED'}
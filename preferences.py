@@ -1,5 +1,7 @@
 import bpy
-from bpy.props import FloatProperty, FloatVectorProperty, EnumProperty
+from bpy.props import BoolProperty, FloatProperty, FloatVectorProperty, EnumProperty, StringProperty
+
+from .utils import draw
 
 
 class PathToolPreferences(bpy.types.AddonPreferences):
@@ -9,46 +11,110 @@ class PathToolPreferences(bpy.types.AddonPreferences):
         name="Control Element",
         default=[0.622574, 0.685957, 0.666101, 1.000000],
         subtype="COLOR", size=4, min=0.0, max=1.0,
-        description="Control element color"
+        description="Control element color",
+        update=draw.tag_preferences_update
     )
 
     color_active_path_control_element: FloatVectorProperty(
         name="Active Path Control Element",
         default=[0.969922, 0.969922, 0.969922, 1.000000],
         subtype="COLOR", size=4, min=0.0, max=1.0,
-        description="Control element color"
+        description="Control element color",
+        update=draw.tag_preferences_update
     )
 
     color_active_control_element: FloatVectorProperty(
         name="Active Control Element",
         default=[0.039087, 0.331906, 0.940392, 1.000000],
         subtype="COLOR", size=4, min=0.0, max=1.0,
-        description="Control element color"
+        description="Control element color",
+        update=draw.tag_preferences_update
     )
 
     color_path: FloatVectorProperty(
         name="Path",
         default=[0.000000, 0.700000, 1.000000, 1.000000],
         subtype="COLOR", size=4, min=0.0, max=1.0,
-        description="Path color"
+        description="Path color",
+        update=draw.tag_preferences_update
     )
 
     color_active_path: FloatVectorProperty(
         name="Active Path",
         default=[1.000000, 0.100000, 0.100000, 1.000000],
         subtype="COLOR", size=4, min=0.0, max=1.0,
-        description="Path color"
+        description="Path color",
+        update=draw.tag_preferences_update
     )
 
     point_size: FloatProperty(
         name="Vertex Size",
         default=4.0,
-        min=1.0, max=10.0, subtype='PIXEL')
+        min=1.0, max=10.0, subtype='PIXEL',
+        update=draw.tag_preferences_update)
 
     line_width: FloatProperty(
         name="Edge Width",
         default=3.0,
-        min=1.0, max=10.0, subtype='PIXEL')
+        min=1.0, max=10.0, subtype='PIXEL',
+        update=draw.tag_preferences_update)
+
+    snap_radius: FloatProperty(
+        name="Snap Radius",
+        default=10.0,
+        min=0.0, max=50.0, subtype='PIXEL',
+        description="Distance in pixels to existing control elements at which they are picked before mesh elements")
+
+    use_compact_pathes: BoolProperty(
+        name="Compact Paths",
+        default=False,
+        description="Store elements of paths as arrays of indices, which use less memory for long paths. "
+        "Elements are looked up by indices when paths are changed or drawn")
+
+    show_timing: EnumProperty(
+        items=[
+            ('NONE', "None", "Do not measure timings"),
+            ('HEADER', "Header", "Show timings in the header of 3D Viewport"),
+            ('OVERLAY', "Overlay", "Show timings in the 3D Viewport"),
+        ],
+        default='NONE',
+        name="Show Timings",
+        description="Measure timings of tool stages and show their median, 95th percentile and maximum "
+        "in milliseconds. Timings are measured only if shown")
+
+    use_record: BoolProperty(
+        name="Record Sessions",
+        default=False,
+        description="Record interactions of each tool session, so they can be replayed in background mode")
+
+    use_profile: BoolProperty(
+        name="Profile Sessions",
+        default=False,
+        description="Profile each tool session with cProfile and save stats and summary of top functions")
+
+    debug_directory: StringProperty(
+        name="Debug Directory",
+        default="",
+        subtype='DIR_PATH',
+        description="Directory to save session recordings and profiles to, temporary directory is used if not set")
+
+    session_directory: StringProperty(
+        name="Session Directory",
+        default="//path_tool",
+        subtype='DIR_PATH',
+        description="Directory to save paths of objects to (one file per object) and load them from. "
+        "Temporary directory is used for unsaved files if directory is relative")
+
+    use_session_fills: BoolProperty(
+        name="Save Path Fills",
+        default=True,
+        description="Save routed elements of paths, so loaded paths are not routed again if mesh topology is unchanged")
+
+    use_mesh_storage: BoolProperty(
+        name="Store Paths in Meshes",
+        default=False,
+        description="Store paths in meshes when they are applied and restore them when the tool is started again. "
+        "Paths are stored as custom properties of meshes, separately for edge and face selection modes")
 
     def draw(self, context):
         layout = self.layout
@@ -69,3 +135,17 @@ class PathToolPreferences(bpy.types.AddonPreferences):
         col.separator()
         col.prop(self, "point_size")
         col.prop(self, "line_width")
+        col.prop(self, "snap_radius")
+        col.prop(self, "use_compact_pathes")
+        col.separator()
+        col.prop(self, "show_timing")
+        col.separator()
+        col.prop(self, "use_record")
+        col.prop(self, "use_profile")
+        row = col.row()
+        row.active = self.use_record or self.use_profile
+        row.prop(self, "debug_directory")
+        col.separator()
+        col.prop(self, "session_directory")
+        col.prop(self, "use_session_fills")
+        col.prop(self, "use_mesh_storage")
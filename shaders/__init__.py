@@ -1,10 +1,12 @@
 # <pep8 compliant>
 
 # A module containing all the shaders used.
-# All files with the *.glsl extension in the module directory during import are placed in the "shader" container.
+# All files with the *.glsl extension in the module directory are available in the "shader" container.
 # Vertex, fragment, and other shader files must have the endings "_vert", "_frag", ect.
+# Sources are read and shaders are compiled only on first access, so import does no GPU work
+# (and addon can be imported in background mode, where there is no GPU context).
 
-__version__ = (1, 0, 0)
+__version__ = (1, 1, 0)
 
 import os
 
@@ -20,10 +22,11 @@ SHADER_DEFINES = "def"
 SHADER_LIBRARY = "lib"
 
 
-def _generate_shaders():
+def _read_shader_sources():
     """
-    Returns a dictionary consisting where the key is the name of the shader and the value is the GPUShader object
-    @return: dict - {str shader_name: GPUShader}
+    Returns a dictionary where the key is the name of the shader and the value is the keyword arguments
+    for GPUShader with preprocessed sources (common library and defines are already concatenated)
+    @return: dict - {str shader_name: dict}
     """
     shader_endings = (
         SHADER_VERTEX,
@@ -97,8 +100,7 @@ def _generate_shaders():
 
         kwargs = dict(filter(lambda item: item[1] is not None, kwargs.items()))
 
-        data = gpu.types.GPUShader(**kwargs)
-        _res[shader_name] = data
+        _res[shader_name] = kwargs
 
     assert len(_res)
 
@@ -106,9 +108,34 @@ def _generate_shaders():
 
 
 class ShaderStorage(object):
+    """
+    Container of shaders, each shader is compiled on first access to the attribute with it's name.
+    Sources of all shaders are read once, on first access to any of them.
+    """
+
     def __init__(self):
-        for shader_name, data in _generate_shaders().items():
-            object.__setattr__(self, shader_name, data)
+        object.__setattr__(self, "_sources", None)
+
+    def _get_sources(self):
+        sources = object.__getattribute__(self, "_sources")
+        if sources is None:
+            sources = _read_shader_sources()
+            object.__setattr__(self, "_sources", sources)
+        return sources
+
+    def __getattr__(self, name):
+        # Called only for attributes which are not set yet, so compiled shaders are returned directly later
+        if name.startswith("_"):
+            raise AttributeError(name)
+        kwargs = self._get_sources().get(name, None)
+        if kwargs is None:
+            raise AttributeError("Shader \"%s\" not found" % name)
+        data = gpu.types.GPUShader(**kwargs)
+        object.__setattr__(self, name, data)
+        return data
+
+    def __dir__(self):
+        return list(self._get_sources().keys())
 
 
 shader = ShaderStorage()  # The main instance container containing all the shaders
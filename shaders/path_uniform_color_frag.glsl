@@ -1,4 +1,7 @@
 uniform vec4 color;
+uniform vec4 color_active;
+
+flat in float is_active;
 
 #ifdef USE_CLIP_PLANES
 uniform bool use_clip_planes;
@@ -19,5 +22,10 @@ void main()
 		discard;
 	}
 #endif
-	fragColor = linearrgb_to_srgb(color);
+	if (is_active > 0.5) {
+		fragColor = linearrgb_to_srgb(color_active);
+	}
+	else {
+		fragColor = linearrgb_to_srgb(color);
+	}
 }
@@ -9,6 +9,9 @@ out vec4 clip_distance;
 #endif
 
 in vec3 pos;
+in float active;
+
+flat out float is_active;
 
 void main()
 {
@@ -21,5 +24,6 @@ void main()
 		}
 	}
 #endif
+	is_active = active;
 	gl_Position = ModelViewProjectionMatrix * ModelMatrix * vec4(pos, 1.0);
 }
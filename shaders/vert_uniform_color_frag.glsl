@@ -3,6 +3,7 @@ uniform mat4 ModelViewProjectionMatrix;
 uniform vec4 color;
 uniform vec4 color_active;
 uniform int active_index;
+uniform int active_count;
 
 #ifdef USE_CLIP_PLANES
 uniform bool use_clip_planes;
@@ -23,7 +24,7 @@ void main()
 		discard;
 	}
 #endif
-	if (gl_PrimitiveID >= active_index) {
+	if ((gl_PrimitiveID >= active_index) && (gl_PrimitiveID < active_index + active_count)) {
 		fragColor = linearrgb_to_srgb(color_active);
 	}
 	else {
@@ -1,6 +1,8 @@
 if "bpy" in locals():
     import importlib
 
+    if "timing" in locals():
+        importlib.reload(timing)
     if "base" in locals():
         importlib.reload(base)
     if "draw" in locals():
@@ -13,15 +15,53 @@ if "bpy" in locals():
         importlib.reload(ui)
     if "redo" in locals():
         importlib.reload(redo)
+    if "rope" in locals():
+        importlib.reload(rope)
     if "unified_path" in locals():
         importlib.reload(unified_path)
+    if "graph" in locals():
+        importlib.reload(graph)
+    if "mesh_graph" in locals():
+        importlib.reload(mesh_graph)
+    if "core" in locals():
+        importlib.reload(core)
+    if "spatial" in locals():
+        importlib.reload(spatial)
+    if "replay" in locals():
+        importlib.reload(replay)
+    if "benchmark" in locals():
+        importlib.reload(benchmark)
+    if "batch" in locals():
+        importlib.reload(batch)
+    if "remap" in locals():
+        importlib.reload(remap)
+    if "session_io" in locals():
+        importlib.reload(session_io)
 
-import bpy
+try:
+    import bpy
+except ImportError:
+    # Outside of Blender only Blender-free modules can be imported directly
+    # (utils.rope, utils.graph, utils.mesh_graph, utils.unified_path, utils.core, utils.remap,
+    # utils.session_io)
+    bpy = None
 
-from . import base
-from . import draw
-from . import inputs
-from . import props
-from . import ui
-from . import redo
-from . import unified_path
+if bpy is not None:
+    from . import timing
+    from . import base
+    from . import draw
+    from . import inputs
+    from . import props
+    from . import ui
+    from . import redo
+    from . import rope
+    from . import unified_path
+    from . import graph
+    from . import mesh_graph
+    from . import core
+    from . import spatial
+    from . import replay
+    from . import benchmark
+    from . import batch
+    from . import remap
+    from . import session_io
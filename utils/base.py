@@ -1,49 +1,65 @@
 if "bpy" in locals():
     import importlib
 
-    if "unified_path" in locals():
-        importlib.reload(unified_path)
+    if "timing" in locals():
+        importlib.reload(timing)
+    if "graph" in locals():
+        importlib.reload(graph)
+    if "mesh_graph" in locals():
+        importlib.reload(mesh_graph)
+    if "core" in locals():
+        importlib.reload(core)
+    if "spatial" in locals():
+        importlib.reload(spatial)
     if "draw" in locals():
         importlib.reload(draw)
-    if "redo" in locals():
-        importlib.reload(redo)
+    if "session_io" in locals():
+        importlib.reload(session_io)
 
-from enum import Enum
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 
 import bpy
 import bmesh
 from mathutils import Vector
 
-from . import unified_path
+from . import timing
+from . import graph
+from . import mesh_graph
+from . import core
+from . import spatial
 from . import draw
-from . import redo
+from . import session_io
+from .. import __package__ as addon_pkg
 
-Path = unified_path.Path
+Path = core.Path
+InteractEvent = core.InteractEvent
 
+# Time in seconds of reading of objects arrays for warm-up on each timer event
+WARMUP_STEP_TIME = 0.02
 
-class InteractEvent(Enum):
-    """Control element interaction mode"""
-    ADD = 1
-    ADD_NEW_PATH = 2
-    REMOVE = 3
-    DRAG = 6
-    CLOSE = 7
-    CHDIR = 8
-    RELEASE = 9
+# Mesh ID property of stored pathes for edge and face selection modes
+MESH_PROPERTY_NAMES = {False: "path_tool_edges", True: "path_tool_faces"}
 
 
-class PathUtils:
-    @property
-    def active_path(self):
-        if (self._active_path_index is not None) and (self._active_path_index <= len(self.path_seq) - 1):
-            return self.path_seq[self._active_path_index]
+def _build_object_data(args, is_faces):
+    """
+    Return's tuple (mesh arrays, adjacency graph) of arrays read by MeshArrays.read_object. Runs in warm-up thread,
+    so does not access Blender data, graph and islands are built by NumPy operations which release GIL.
+    """
+    mesh = graph.MeshArrays(*args)
+    if is_faces:
+        elem_graph = graph.FaceGraph(mesh)
+        elem_graph.face_island
+    else:
+        elem_graph = graph.VertGraph(mesh)
+        elem_graph.vert_island
+    return mesh, elem_graph
 
-    @active_path.setter
-    def active_path(self, value: Path):
-        if value not in self.path_seq:
-            self.path_seq.append(value)
-        self._active_path_index = self.path_seq.index(value)
 
+class PathUtils(core.PathCore):
     @staticmethod
     def set_selection_state(elem_seq, state=True):
         for elem in elem_seq:
@@ -62,18 +78,120 @@ class PathUtils:
             bm = bmesh.from_edit_mesh(ob.data)
             for elem_seq in (bm.verts, bm.edges, bm.faces):
                 elem_seq.ensure_lookup_table()
+                elem_seq.index_update()
             self.bm_seq.append((ob, bm))
 
+    def get_bmesh(self, ob):
+        for other_ob, bm in self.bm_seq:
+            if other_ob == ob:
+                return bm
+
+    def start_warmup(self, context):
+        """
+        Queue objects to build their mesh arrays and graphs in background threads. Arrays are read from Blender data
+        by warmup_step on the main thread, a few objects at a time, so interaction is not blocked.
+        Data of an object is collected on first request, so objects which are ready can be used before the rest.
+        """
+        self.warmup_queue = [ob for ob, _bm in self.bm_seq if ob.as_pointer() not in self.mesh_seq]
+        self.warmup_total = len(self.warmup_queue)
+
+    def warmup_step(self, context):
+        """Read arrays of queued objects during WARMUP_STEP_TIME (at least one) and submit them to thread pool"""
+        if not self.warmup_queue:
+            return
+        if self.warmup_executor is None:
+            self.warmup_executor = ThreadPoolExecutor(max_workers=min(self.warmup_total, os.cpu_count() or 1))
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        time_start = perf_counter()
+        while self.warmup_queue and (perf_counter() - time_start) < WARMUP_STEP_TIME:
+            ob = self.warmup_queue.pop(0)
+            args = graph.MeshArrays.read_object(ob, is_faces)
+            self.warmup_seq[ob.as_pointer()] = self.warmup_executor.submit(_build_object_data, args, is_faces)
+
+    def get_warmup_progress(self):
+        """Return's tuple (count of objects which data is ready, count of objects), or None if warm-up is finished"""
+        pending = len(self.warmup_queue) + sum(1 for future in self.warmup_seq.values() if not future.done())
+        if not pending:
+            return None
+        return self.warmup_total - pending, self.warmup_total
+
+    def end_warmup(self):
+        """Stop warm-up, objects which data is not collected are read on request as without warm-up"""
+        self.warmup_queue.clear()
+        self.warmup_seq.clear()
+        if self.warmup_executor is not None:
+            self.warmup_executor.shutdown(wait=False)
+            self.warmup_executor = None
+
+    def collect_warmup(self, ob):
+        """
+        Wait for warm-up data of object, if it is not collected yet. Object which is not read yet is removed from
+        queue, it is read on request.
+        """
+        if ob in self.warmup_queue:
+            self.warmup_queue.remove(ob)
+            self.warmup_total -= 1
+        future = self.warmup_seq.pop(ob.as_pointer(), None)
+        if future is not None:
+            mesh, elem_graph = future.result()
+            self.mesh_seq[ob.as_pointer()] = mesh
+            self.graph_seq[ob.as_pointer()] = mesh_graph.BMeshGraph(ob, self.get_bmesh(ob), elem_graph)
+        if not (self.warmup_queue or self.warmup_seq):
+            self.end_warmup()
+
+    def get_mesh_arrays(self, context, ob):
+        """Mesh elements arrays of object, read on first request. Loop triangles are read in face selection mode"""
+        ptr = ob.as_pointer()
+        self.collect_warmup(ob)
+        mesh = self.mesh_seq.get(ptr, None)
+        if mesh is None:
+            mesh = graph.MeshArrays.from_object(ob, context.scene.tool_settings.mesh_select_mode[2])
+            self.mesh_seq[ptr] = mesh
+        return mesh
+
+    def get_mesh_graph(self, context, ob):
+        """Mesh graph of object in edit mode, face adjacency graph in face selection mode, vertex graph otherwise"""
+        ptr = ob.as_pointer()
+        self.collect_warmup(ob)
+        ob_graph = self.graph_seq.get(ptr, None)
+        if ob_graph is None:
+            mesh = self.get_mesh_arrays(context, ob)
+            if context.scene.tool_settings.mesh_select_mode[2]:
+                elem_graph = graph.FaceGraph(mesh)
+            else:
+                elem_graph = graph.VertGraph(mesh)
+            ob_graph = mesh_graph.BMeshGraph(ob, self.get_bmesh(ob), elem_graph)
+            self.graph_seq[ptr] = ob_graph
+        return ob_graph
+
+    @timing.timed("PICK")
     def get_element_by_mouse(self, context, event):
         """Methon for element selection by mouse.
         For edges are selected verts (they used as control elements), for faces selected faces
         Return's tuple (BMElement, bpy.types.Object)"""
+        mouse_location = (event.mouse_region_x, event.mouse_region_y)
+
+        # Existing control elements are checked first, without mesh picking
+        control_index = self.control_index
+        if control_index.is_dirty:
+            control_index.rebuild(self.path_seq)
+        preferences = context.preferences.addons[addon_pkg].preferences
+        # Elements behind geometry are not picked, the same way as by mesh picking without X-Ray
+        is_visible = None
+        if not spatial.is_xray(context):
+            def is_visible(co):
+                return not spatial.is_occluded(context, co)
+        elem, ob = control_index.find(
+            context.region, context.region_data, mouse_location, preferences.snap_radius, exclude=self._drag_elem,
+            is_visible=is_visible)
+        if elem:
+            return elem, ob
+
         tool_settings = context.scene.tool_settings
         initial_select_mode = tuple(tool_settings.mesh_select_mode)
         if initial_select_mode[1]:  # Change select mode for edges path (select verts)
             tool_settings.mesh_select_mode = (True, False, False)
         bpy.ops.mesh.select_all(action='DESELECT')
-        mouse_location = (event.mouse_region_x, event.mouse_region_y)
         bpy.ops.view3d.select(location=mouse_location)
 
         elem = None
@@ -85,66 +203,151 @@ class PathUtils:
         tool_settings.mesh_select_mode = initial_select_mode
         return elem, ob
 
-    def get_linked_island_index(self, context, elem):
-        for i, linked_island in enumerate(self.mesh_islands):
-            if elem in linked_island:
-                return i
+    @timing.timed("UPDATE_MESHES")
+    def update_meshes(self, context):
+        for ob, bm in self.bm_seq:
+            bm.select_flush_mode()
+            bmesh.update_edit_mesh(ob.data, False, False)
 
-        tool_settings = context.scene.tool_settings
-        initial_select_mode = tuple(tool_settings.mesh_select_mode)
+    # Views of pathes
 
-        # https://developer.blender.org/T75128 (Resolved)
+    def tag_views_update(self):
+        self.control_index.tag_update()
+        self.draw_layer.tag_update()
 
-        mesh_elements = "faces"
-        if initial_select_mode[1]:  # Change select mode for edges path (select verts)
-            mesh_elements = "verts"
-            tool_settings.mesh_select_mode = (True, False, False)
+    def add_batch_control_element(self, path, elem):
+        path.batch_control_elements.add(elem)
 
-        bpy.ops.mesh.select_all(action='DESELECT')
-        elem.select_set(True)
-        bpy.ops.mesh.select_linked(delimit={'NORMAL'})
-        linked_island = self.get_selected_elements(mesh_elements)
-        tool_settings.mesh_select_mode = initial_select_mode
-        bpy.ops.mesh.select_all(action='DESELECT')
-        self.mesh_islands.append(linked_island)
-        return len(self.mesh_islands) - 1
+    def remove_batch_control_element(self, path, elem):
+        path.batch_control_elements.remove(elem)
 
-    def update_meshes(self, context):
-        for ob, bm in self.bm_seq:
-            bm.select_flush_mode()
-            bmesh.update_edit_mesh(ob.data, False, False)
+    def replace_batch_control_element(self, path, elem, new_elem):
+        self.control_index.move(elem, new_elem, path.ob)
+        path.batch_control_elements.replace(elem, new_elem)
 
-    def update_path_beetween(self, context, elem_0, elem_1):
-        tool_settings = context.scene.tool_settings
-        initial_select_mode = tuple(tool_settings.mesh_select_mode)
-        mesh_elements = "faces"
-        if initial_select_mode[1]:  # Change select mode for edges path (select verts)
-            mesh_elements = "edges"
-            tool_settings.mesh_select_mode = (True, False, False)
+    @timing.timed("BATCH")
+    def update_batch_fills(self, context, path, fill_index_seq):
+        mesh = self.get_mesh_arrays(context, path.ob)
+        for fill_index in fill_index_seq:
+            path.batch_seq_fills[fill_index] = draw.gen_fill_elements_pos(context, path.fill_elements[fill_index], mesh)
+        self.draw_layer.tag_update(path.ob)
 
-        bpy.ops.mesh.select_all(action='DESELECT')
-        self.set_selection_state((elem_0, elem_1), True)
-        bpy.ops.mesh.shortest_path_select()
-        self.set_selection_state((elem_0, elem_1), False)
-        fill_seq = self.get_selected_elements(mesh_elements)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        # Exception if control points in one edge
-        if (not fill_seq) and initial_select_mode[1]:
-            for edge in elem_0.link_edges:
-                if edge.other_vert(elem_0) == elem_1:
-                    fill_seq = [edge]
-        tool_settings.mesh_select_mode = initial_select_mode
-        return fill_seq
+    @timing.timed("BATCH")
+    def rebuild_batch_control_elements(self, context, path):
+        """New control elements buffer for path, other changes of control elements are applied to existing one"""
+        mesh = self.get_mesh_arrays(context, path.ob)
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        path.batch_control_elements = draw.ControlElementsBuffer(mesh, is_faces, path.control_elements)  # Draw
+
+    # Progress is shown by cursor of window manager
+
+    def progress_begin(self, context, total):
+        context.window_manager.progress_begin(0, total)
 
-    def update_fills_by_element_index(self, context, path, elem_index):
-        pairs_items = path.get_pairs_items(elem_index)
-        for item in pairs_items:
-            elem_0, elem_1, fill_index = item
-            fill_seq = self.update_path_beetween(context, elem_0, elem_1)
+    def progress_update(self, context, value):
+        context.window_manager.progress_update(value)
+
+    def progress_end(self, context):
+        context.window_manager.progress_end()
+
+    # Session files
+
+    @staticmethod
+    def get_session_filepath(directory, ob):
+        """File of object pathes, short hash of object name keeps names which are the same after cleaning apart"""
+        name_hash = hashlib.sha1(ob.name.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(directory, "%s_%s.npz" % (bpy.path.clean_name(ob.name), name_hash))
+
+    def save_session(self, context, directory, use_fills=True):
+        """Save pathes of each object to it's own file in directory. Return's number of saved pathes"""
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for ob, _bm in self.bm_seq:
+            path_seq = [n for n in self.path_seq if n.ob == ob]
+            if path_seq:
+                mesh = self.get_mesh_arrays(context, ob)
+                session_io.save_pathes(self.get_session_filepath(directory, ob), path_seq, mesh, is_faces, use_fills)
+                count += len(path_seq)
+        return count
+
+    def add_pathes_records(self, context, ob, bm, record_seq, is_topology_matched):
+        """Add pathes of object from records (utils.session_io.PathRecord). Return's number of added pathes"""
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        if not is_topology_matched:
+            total = sum(len(n.control_indices) for n in record_seq)
+            count = sum(
+                len(n.control_indices) if n.fill_seq_seq is None else sum(m is None for m in n.fill_seq_seq)
+                for n in record_seq)
+            self.report(
+                {'WARNING'}, message="Mesh of %s is changed, %d of %d path segments are routed again" % (
+                    ob.name, count, total))
+        control_elem_seq = bm.faces if is_faces else bm.verts
+        fill_elem_seq = bm.faces if is_faces else bm.edges
+        return len(self.load_pathes(context, ob, record_seq, control_elem_seq, fill_elem_seq, is_topology_matched))
+
+    def load_session(self, context, directory):
+        """Add pathes of objects from their files in directory, if there are any. Return's number of loaded pathes"""
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        count = 0
+        for ob, bm in self.bm_seq:
+            filepath = self.get_session_filepath(directory, ob)
+            if not os.path.isfile(filepath):
+                continue
+            try:
+                record_seq, is_topology_matched = session_io.load_pathes(
+                    filepath, self.get_mesh_arrays(context, ob), is_faces)
+            except (OSError, ValueError, KeyError) as err:
+                self.report({'WARNING'}, message="Unable to load paths of %s: %s" % (ob.name, err))
+                continue
+            count += self.add_pathes_records(context, ob, bm, record_seq, is_topology_matched)
+        return count
+
+    # Pathes stored in meshes
+
+    def restore_pathes(self, context):
+        """
+        Add pathes stored in meshes of objects for current selection mode. Stored fills are used as is, so
+        pathes are not routed until they are changed. Return's number of restored pathes.
+        """
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        name = MESH_PROPERTY_NAMES[is_faces]
+        count = 0
+        # Pathes of mesh shared by several objects are restored for the first one
+        restored_meshes = set()
+        for ob, bm in self.bm_seq:
+            props = ob.data.get(name, None)
+            if props is None or ob.data in restored_meshes:
+                continue
+            restored_meshes.add(ob.data)
+            try:
+                record_seq, is_topology_matched = session_io.unpack_pathes(
+                    props.to_dict(), self.get_mesh_arrays(context, ob), is_faces)
+            except (ValueError, KeyError, TypeError) as err:
+                self.report({'WARNING'}, message="Unable to restore paths of %s: %s" % (ob.name, err))
+                continue
+            count += self.add_pathes_records(context, ob, bm, record_seq, is_topology_matched)
+        return count
+
+    def gen_stored_pathes_seq(self, context):
+        """Packed pathes (ID properties values) of each object to store in it's mesh, None if there are no pathes"""
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        self.stored_pathes_seq = {}
+        for ob, _bm in self.bm_seq:
+            props = None
+            path_seq = [n for n in self.path_seq if n.ob == ob]
+            if path_seq:
+                mesh = self.get_mesh_arrays(context, ob)
+                props = session_io.pack_properties(session_io.pack_pathes(path_seq, mesh, is_faces))
+            self.stored_pathes_seq[ob.as_pointer()] = props
 
-            path.fill_elements[fill_index] = fill_seq
-            batch = draw.gen_batch_fill_elements(context, fill_seq)
-            path.batch_seq_fills[fill_index] = batch
+    @staticmethod
+    def store_pathes(ob, is_faces, props):
+        name = MESH_PROPERTY_NAMES[is_faces]
+        if props is not None:
+            ob.data[name] = props
+        elif name in ob.data:
+            del ob.data[name]
 
     def gen_final_elements_seq(self, context):
         tool_settings = context.scene.tool_settings
@@ -166,225 +369,50 @@ class PathUtils:
                 if select_mode[2]:  # Faces
                     # For face selection mode control elements are required too
                     index_select_seq.extend([face.index for face in path.control_elements])
-                    tmp = path.fill_elements
-                    tmp.append(path.control_elements)
-                    for fill_seq in tmp:
-                        for face in fill_seq:
-                            index_markup_seq.extend([e.index for e in face.edges])
+
+            if select_mode[2]:
+                # Edges of all path faces, fills and control elements
+                mesh = self.get_mesh_arrays(context, ob)
+                index_markup_seq = mesh.get_faces_edges(index_select_seq).tolist()
             # Remove duplicates
             self.select_only_seq[ob.as_pointer()] = list(dict.fromkeys(index_select_seq))
             self.markup_seq[ob.as_pointer()] = list(dict.fromkeys(index_markup_seq))
 
-    def remove_path_doubles(self, context, path):
-        for i, control_element in enumerate(path.control_elements):
-            if path.control_elements.count(control_element) > 1:
-                for j, other_control_element in enumerate(path.control_elements):
-                    if i == j:  # Skip current control element
-                        continue
-                    if other_control_element == control_element:
-                        # First-last control element same path
-                        if i == 0 and j == len(path.control_elements) - 1:
-                            path.pop_control_element(-1)
-                            if not path.close:
-                                path.close = True
-                                self.update_fills_by_element_index(context, path, 0)
-
-                                message = "Closed path"
-                                if path == self.active_path:
-                                    self._just_closed_path = True
-                                    message = "Closed active path"
-                                self.report(type={'INFO'}, message=message)
-                            else:
-                                self.update_fills_by_element_index(context, path, 0)
-                        # Adjacent control elements
-                        elif i in (j - 1, j + 1):
-                            path.pop_control_element(j)
-                            batch, _ = draw.gen_batch_control_elements(context, path == self.active_path, path)  # Draw
-                            path.batch_control_elements = batch
-                            self.report(type={'INFO'}, message="Merged adjacent control elements")
-                        else:
-                            # Maybe, undo here?
-                            pass
-
-    def check_join_pathes(self, context):
-        for i, path in enumerate(self.path_seq):
-            for other_path in self.path_seq:
-                if path == other_path:
-                    continue
-
-                # Join two pathes
-                if (
-                    (not path.close) and (not other_path.close) and
-                    (
-                        (path.control_elements[0] == other_path.control_elements[0]) or
-                        (path.control_elements[-1] == other_path.control_elements[-1]) or
-                        (path.control_elements[-1] == other_path.control_elements[0]) or
-                        (path.control_elements[0] == other_path.control_elements[-1])
-                    )
-                ):
-                    path += other_path
-                    self.path_seq.remove(other_path)
-                    self._active_path_index = i
-
-                    batch, _ = draw.gen_batch_control_elements(context, path == self.active_path, path)  # Draw
-                    path.batch_control_elements = batch
-                    self.report(type={'INFO'}, message="Joined two paths")
-
-    def interact_control_element(self, context, elem, ob, interact_event):
-        """Main method of interacting with all pathes"""
-        if elem and interact_event is InteractEvent.ADD:
-            # Only the first click
-            if not self.path_seq:
-                self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
-                return
-
-            new_elem_index = None
-
-            elem_index = self.active_path.is_in_control_elements(elem)
-            if elem_index is None:
-                new_elem_index = len(self.active_path.control_elements)
-
-                fill_index = self.active_path.is_in_fill_elements(elem)
-                if fill_index is None:
-                    is_found_in_other_path = False
-                    for path in self.path_seq:
-                        if path == self.active_path:
-                            continue
-                        other_elem_index = path.is_in_control_elements(elem)
-                        if other_elem_index is None:
-                            other_fill_index = path.is_in_fill_elements(elem)
-                            if other_fill_index is not None:
-                                is_found_in_other_path = True
-                        else:
-                            is_found_in_other_path = True
-
-                        if is_found_in_other_path:
-                            self.active_path = path
-                            self._just_closed_path = False
-                            self.interact_control_element(context, elem, ob, InteractEvent.ADD)
-                            return
-                else:
-                    new_elem_index = fill_index + 1
-                    self._just_closed_path = False
-
-            elif len(self.active_path.control_elements) == 1:
-                batch, self.active_index = draw.gen_batch_control_elements(context, True, self.active_path)  # Draw
-                self.active_path.batch_control_elements = batch
-
-            if elem_index is not None:
-                self.drag_elem_indices = [path.is_in_control_elements(elem) for path in self.path_seq]
-                self._just_closed_path = False
-            self._drag_elem = elem
-
-            if self._just_closed_path:
-                self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
-                return
-
-            if new_elem_index is not None:
-                # Add a new control element to active path
-                linked_island_index = self.get_linked_island_index(context, elem)
-                if self.active_path.island_index != linked_island_index:
-                    self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
-                    return
-
-                self.active_path.insert_control_element(new_elem_index, elem)
-                self.update_fills_by_element_index(context, self.active_path, new_elem_index)
-
-                batch, self.active_index = draw.gen_batch_control_elements(context, True, self.active_path)  # Draw
-                self.active_path.batch_control_elements = batch
-
-                self.drag_elem_indices = [path.is_in_control_elements(elem) for path in self.path_seq]
-
-        elif elem and interact_event is InteractEvent.ADD_NEW_PATH:
-            # Adding new path
-            linked_island_index = self.get_linked_island_index(context, elem)
-            self.active_path = Path(elem, linked_island_index, ob)
-            # Recursion used to add new control element to newly created path
-            self._just_closed_path = False
-            self.interact_control_element(context, elem, ob, InteractEvent.ADD)
-            self.report(type={'INFO'}, message="Created new path")
-            return
-
-        elif elem and interact_event is InteractEvent.REMOVE:
-            # Remove control element
-            self._just_closed_path = False
-
-            elem_index = self.active_path.is_in_control_elements(elem)
-            if elem_index is None:
-                for path in self.path_seq:
-                    other_elem_index = path.is_in_control_elements(elem)
-                    if other_elem_index is not None:
-                        self.active_path = path
-                        self.interact_control_element(context, elem, ob, InteractEvent.REMOVE)
-                        return
-            else:
-                self.active_path.pop_control_element(elem_index)
-
-                # Remove the last control element from path
-                if not len(self.active_path.control_elements):
-                    self.path_seq.remove(self.active_path)
-                    if len(self.path_seq):
-                        self.active_path = self.path_seq[-1]
-                else:
-                    self.update_fills_by_element_index(context, self.active_path, elem_index)
-                    batch, self.active_index = draw.gen_batch_control_elements(context, True, self.active_path)  # Draw
-                    self.active_path.batch_control_elements = batch
-
-        elif elem and interact_event is InteractEvent.DRAG:
-            # Drag control element
-            if (not self._drag_elem) or (len(self.drag_elem_indices) != len(self.path_seq)):
-                return
-            self._just_closed_path = False
-
-            linked_island_index = self.get_linked_island_index(context, elem)
-            if self.active_path.island_index == linked_island_index:
-                self._drag_elem = elem
-
-                for i, path in enumerate(self.path_seq):
-                    j = self.drag_elem_indices[i]
-                    if j is not None:
-                        path.control_elements[j] = elem
-
-                        self.update_fills_by_element_index(context, path, j)
-                        batch, self.active_index = draw.gen_batch_control_elements(
-                            context, path == self.active_path, path)  # Draw
-                        path.batch_control_elements = batch
-
-        # Switch active path direction
-        elif interact_event is InteractEvent.CHDIR:
-            self.active_path.reverse()
-            batch, self.active_index = draw.gen_batch_control_elements(context, True, self.active_path)  # Draw
-            self.active_path.batch_control_elements = batch
-            self._just_closed_path = False
-
-        # Close active path
-        elif interact_event is InteractEvent.CLOSE:
-            self.active_path.close = not self.active_path.close
-
-            if self.active_path.close:
-                self.update_fills_by_element_index(context, self.active_path, 0)
-                if len(self.active_path.control_elements) > 2:
-                    self._just_closed_path = True
-            else:
-                self.active_path.fill_elements[-1] = []
-                self.active_path.batch_seq_fills[-1] = None
-                self._just_closed_path = False
-                self.check_join_pathes(context)
-
-        # Release interact event event
-        elif interact_event is InteractEvent.RELEASE:
-            self.drag_elem_indices = []
-            self._drag_elem = None
-
-            # Remove doubles from every existing path
-            for path in self.path_seq:
-                self.remove_path_doubles(context, path)
-            # Join any end-end pathes
-            self.check_join_pathes(context)
-
-            # # Register current state after adding new, dragging or removing control elements, pathes
-            # # or when toggle open/close path or changed path direction
-            redo.register_undo_step(self)
 
-        # Uncomment line to see formatted path in the console
-        # print(self.active_path)
+def mark_elements(bm, is_faces, index_select_seq, index_markup_seq, mark_select, mark_seam, mark_sharp):
+    """
+    Apply select, seam and sharp options (utils.props) to bmesh elements. Selected elements are faces in face
+    selection mode and edges otherwise, seams and sharpness are marked on edges.
+    """
+    if mark_select != 'NONE':
+        elem_seq = bm.faces if is_faces else bm.edges
+        if mark_select == 'EXTEND':
+            for i in index_select_seq:
+                elem_seq[i].select_set(True)
+        elif mark_select == 'SUBTRACT':
+            for i in index_select_seq:
+                elem_seq[i].select_set(False)
+        elif mark_select == 'INVERT':
+            for i in index_select_seq:
+                elem_seq[i].select_set(not elem_seq[i].select)
+
+    elem_seq = bm.edges
+    if mark_seam == 'MARK':
+        for i in index_markup_seq:
+            elem_seq[i].seam = True
+    elif mark_seam == 'CLEAR':
+        for i in index_markup_seq:
+            elem_seq[i].seam = False
+    elif mark_seam == 'TOGGLE':
+        for i in index_markup_seq:
+            elem_seq[i].seam = not elem_seq[i].seam
+
+    if mark_sharp == 'MARK':
+        for i in index_markup_seq:
+            elem_seq[i].smooth = False
+    elif mark_sharp == 'CLEAR':
+        for i in index_markup_seq:
+            elem_seq[i].smooth = True
+    elif mark_sharp == 'TOGGLE':
+        for i in index_markup_seq:
+            elem_seq[i].smooth = not elem_seq[i].smooth
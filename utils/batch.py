@@ -0,0 +1,240 @@
+"""
+Non-modal markup of pathes given by control element indices, for scripts and background mode. Segments are routed
+over mesh arrays graphs (utils.mesh_graph.ArrayMeshGraph), so neither viewport nor edit mode is required.
+Path spec is a dict in the same format as final state of pathes in replay report:
+
+{"object": object name, "control_elements": [vertex (edge selection mode) or face indices], "close": false}
+
+Spec file is a JSON file with pathes and mark options, options are optional:
+
+{"select_mode": "EDGE", "mark_select": "EXTEND", "mark_seam": "MARK", "mark_sharp": "NONE", "pathes": [...]}
+
+blender --background scene.blend --python-expr "from <addon>.utils import batch; batch.main()" -- spec.json [--save]
+
+Pathes may have "file" key with .blend file name, such pathes are used only for that file. Directories of .blend
+files are processed by multiple Blender processes with utils.batch_runner.
+"""
+
+if "bpy" in locals():
+    import importlib
+
+    if "graph" in locals():
+        importlib.reload(graph)
+    if "mesh_graph" in locals():
+        importlib.reload(mesh_graph)
+    if "base" in locals():
+        importlib.reload(base)
+
+import os
+import sys
+import json
+import argparse
+from time import perf_counter
+
+import bpy
+import bmesh
+
+from . import graph
+from . import mesh_graph
+from . import base
+
+# Spec option - default value
+SPEC_OPTIONS = {
+    "select_mode": 'EDGE',
+    "mark_select": 'EXTEND',
+    "mark_seam": 'NONE',
+    "mark_sharp": 'NONE',
+}
+
+
+def load_spec(filepath):
+    """Return's spec file data, missing options are set to defaults"""
+    with open(filepath, 'r') as file:
+        data = json.load(file)
+    if not isinstance(data.get("pathes"), list):
+        raise ValueError("Spec file should contain list of pathes")
+    for option, default in SPEC_OPTIONS.items():
+        data.setdefault(option, default)
+    return data
+
+
+def get_file_pathes(data):
+    """Return's path specs of spec data for current .blend file, pathes without "file" key are used for any file"""
+    name = os.path.basename(bpy.data.filepath)
+    return [n for n in data["pathes"] if n.get("file", name) == name]
+
+
+def route_path(ob_graph, control_seq, close):
+    """
+    Return's tuple (list of fill indices lists, list of indices of segments which control elements are not linked).
+    """
+    index_pairs = list(zip(control_seq, control_seq[1:]))
+    if close and len(control_seq) > 2:
+        index_pairs.append((control_seq[-1], control_seq[0]))
+
+    # Segments which share control elements are routed by shared searches
+    fill_seq_seq = ob_graph.get_fill_indices_seq(index_pairs)
+    unlinked_seq = []
+    for i, ((index_0, index_1), fill_seq) in enumerate(zip(index_pairs, fill_seq_seq)):
+        # Empty fill is valid for adjacent faces, islands are evaluated only for such rare cases
+        if not fill_seq and index_0 != index_1:
+            island_index_0 = ob_graph.get_island_index(None, ob_graph.get_control_element(index_0))
+            island_index_1 = ob_graph.get_island_index(None, ob_graph.get_control_element(index_1))
+            if island_index_0 != island_index_1:
+                unlinked_seq.append(i)
+    return fill_seq_seq, unlinked_seq
+
+
+def apply_marks(ob, is_faces, index_select_seq, index_markup_seq, mark_select, mark_seam, mark_sharp):
+    """Mark elements of object mesh, in edit mode edit mesh is changed"""
+    is_edit_mode = ob.mode == 'EDIT'
+    if is_edit_mode:
+        bm = bmesh.from_edit_mesh(ob.data)
+    else:
+        bm = bmesh.new()
+        bm.from_mesh(ob.data)
+    for elem_seq in (bm.edges, bm.faces):
+        elem_seq.ensure_lookup_table()
+
+    base.mark_elements(bm, is_faces, index_select_seq, index_markup_seq, mark_select, mark_seam, mark_sharp)
+
+    if is_edit_mode:
+        bmesh.update_edit_mesh(ob.data, False, False)
+    else:
+        bm.to_mesh(ob.data)
+        bm.free()
+        ob.data.update()
+
+
+def mark_pathes(context, path_spec_seq, select_mode='EDGE', mark_select='EXTEND', mark_seam='NONE', mark_sharp='NONE'):
+    """
+    Route all segments of given pathes (list of path specs) and mark elements of their objects meshes.
+    Return's dict report with counts of objects, pathes and segments, time and throughput, warning messages.
+    """
+    is_faces = select_mode == 'FACE'
+    time_start = perf_counter()
+
+    # Object name - list of it's path specs
+    ob_specs = {}
+    for spec in path_spec_seq:
+        ob_specs.setdefault(spec["object"], []).append(spec)
+
+    message_seq = []
+    objects_count = 0
+    pathes_count = 0
+    segments_count = 0
+
+    for ob_name, spec_seq in ob_specs.items():
+        ob = bpy.data.objects.get(ob_name)
+        if ob is None or ob.type != 'MESH':
+            message_seq.append("Not found mesh object \"%s\"" % ob_name)
+            continue
+
+        mesh = graph.MeshArrays.from_object(ob)
+        ob_graph = mesh_graph.ArrayMeshGraph(mesh, is_faces)
+        elem_count = (len(mesh.face_loop_offsets) - 1) if is_faces else len(mesh.vert_co)
+
+        index_select_seq = []
+        for spec in spec_seq:
+            control_seq = [int(n) for n in spec["control_elements"]]
+            if (not control_seq) or min(control_seq) < 0 or max(control_seq) >= elem_count:
+                message_seq.append("Invalid control elements of path on object \"%s\"" % ob_name)
+                continue
+
+            fill_seq_seq, unlinked_seq = route_path(ob_graph, control_seq, spec.get("close", False))
+            if unlinked_seq:
+                message_seq.append("Not linked control elements of %d segments of path on object \"%s\"" % (
+                    len(unlinked_seq), ob_name))
+
+            for fill_seq in fill_seq_seq:
+                index_select_seq.extend(fill_seq)
+            if is_faces:
+                # For face selection mode control elements are required too
+                index_select_seq.extend(control_seq)
+
+            pathes_count += 1
+            segments_count += len(fill_seq_seq)
+
+        if is_faces:
+            index_markup_seq = mesh.get_faces_edges(index_select_seq).tolist() if index_select_seq else []
+        else:
+            index_markup_seq = index_select_seq
+        # Remove duplicates
+        index_select_seq = list(dict.fromkeys(index_select_seq))
+        index_markup_seq = list(dict.fromkeys(index_markup_seq))
+
+        apply_marks(ob, is_faces, index_select_seq, index_markup_seq, mark_select, mark_seam, mark_sharp)
+        objects_count += 1
+
+    time_total = perf_counter() - time_start
+    return {
+        "objects": objects_count,
+        "pathes": pathes_count,
+        "segments": segments_count,
+        "time": time_total,
+        "segments_per_second": segments_count / time_total if time_total > 0.0 else 0.0,
+        "messages": message_seq,
+    }
+
+
+def format_report(report):
+    return "Marked %d pathes (%d segments) on %d objects in %.3f s, %.0f segments per second" % (
+        report["pathes"], report["segments"], report["objects"], report["time"], report["segments_per_second"])
+
+
+def mark_file(context, data, filepath=None, is_save=False):
+    """
+    Open .blend file (or use current one if filepath is None) and mark pathes of spec data. Pathes with "file" key
+    are used only for file of the same name. Return's report of mark_pathes with file path and error message.
+    """
+    time_start = perf_counter()
+    report = {"file": filepath or bpy.data.filepath, "error": None}
+    try:
+        if filepath is not None:
+            bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+            context = bpy.context
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        path_spec_seq = get_file_pathes(data)
+        report.update(mark_pathes(
+            context, path_spec_seq, data["select_mode"], data["mark_select"], data["mark_seam"], data["mark_sharp"]))
+
+        if is_save:
+            bpy.ops.wm.save_mainfile()
+    except Exception as err:
+        report["error"] = "%s: %s" % (err.__class__.__name__, err)
+    report["time"] = perf_counter() - time_start
+    return report
+
+
+def main():
+    """
+    Entry point for background mode, arguments after "--" are spec file path, optional .blend files to process one
+    by one (current file is used if there are no files), "--save" flag to save files after markup and "--report"
+    path of JSON file with list of per-file reports, which is rewritten after each file.
+    """
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="batch", description="Mark up pathes from spec file")
+    parser.add_argument("spec", help="Spec file path")
+    parser.add_argument("files", nargs='*', help=".blend files to process")
+    parser.add_argument("--save", action='store_true', help="Save files after markup")
+    parser.add_argument("--report", default=None, help="Report file path")
+    args = parser.parse_args(argv)
+
+    data = load_spec(args.spec)
+    report_seq = []
+    for filepath in (args.files or [None]):
+        report = mark_file(bpy.context, data, filepath, args.save)
+        report_seq.append(report)
+
+        for message in report.get("messages", ()):
+            print("Warning: %s" % message)
+        if report["error"] is not None:
+            print("Error: %s: %s" % (report["file"], report["error"]))
+        else:
+            print(format_report(report))
+
+        if args.report:
+            with open(args.report, 'w') as file:
+                json.dump(report_seq, file, indent=2)
@@ -0,0 +1,182 @@
+"""
+Multi-process markup of pathes (utils.batch) over directory of .blend files, works without Blender. Files are split
+into chunks, each chunk is processed by a separate "blender --background" worker process which opens files one by
+one, applies spec file and saves them. Run from addon directory:
+
+python -m utils.batch_runner <directory> <spec.json> [--blender path] [--jobs N] [--recursive] [--no-save]
+
+Per-file timings, failures and summary are printed and optionally written as JSON (--summary).
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter, strftime
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files opened by a single worker process, Blender startup time is shared by them
+FILES_PER_WORKER = 8
+
+
+def find_blend_files(directory, recursive=False):
+    """Return's sorted list of .blend files paths in directory"""
+    filepath_seq = []
+    if recursive:
+        for root, _dirs, files in os.walk(directory):
+            filepath_seq.extend(os.path.join(root, n) for n in files if n.lower().endswith(".blend"))
+    else:
+        filepath_seq = [
+            os.path.join(directory, n) for n in os.listdir(directory) if n.lower().endswith(".blend")]
+    return sorted(filepath_seq)
+
+
+def get_chunks(filepath_seq, jobs, files_per_worker=FILES_PER_WORKER):
+    """Files split into chunks, there are at least as many chunks as jobs, if there are enough files"""
+    size = max(1, min(files_per_worker, -(-len(filepath_seq) // max(jobs, 1))))
+    return [filepath_seq[i:i + size] for i in range(0, len(filepath_seq), size)]
+
+
+def gen_worker_command(blender, spec_filepath, report_filepath, filepath_seq, is_save):
+    # Addon is imported by directory name, so it does not have to be installed in worker's Blender
+    expr = "import sys, importlib; sys.path.insert(0, %r); importlib.import_module(%r).main()" % (
+        os.path.dirname(ADDON_DIRECTORY), os.path.basename(ADDON_DIRECTORY) + ".utils.batch")
+    command = [
+        blender, "--background", "--factory-startup", "--python-exit-code", "1", "--python-expr", expr,
+        "--", spec_filepath, "--report", report_filepath,
+    ]
+    if is_save:
+        command.append("--save")
+    return command + filepath_seq
+
+
+def run_process(blender, spec_filepath, filepath_seq, is_save, timeout, directory):
+    """
+    Process files in a single worker process. Return's tuple (list of per-file reports, error message or None),
+    reports are written by worker after each file, so files which are not reported are not processed.
+    """
+    fd, report_filepath = tempfile.mkstemp(suffix=".json", dir=directory)
+    os.close(fd)
+    command = gen_worker_command(blender, spec_filepath, report_filepath, filepath_seq, is_save)
+
+    error = None
+    try:
+        proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        if proc.returncode != 0:
+            output = proc.stdout.decode(errors='replace').strip().splitlines()
+            error = "Worker exit code %d: %s" % (proc.returncode, output[-1] if output else "")
+    except subprocess.TimeoutExpired:
+        error = "Worker timeout (%d s)" % timeout
+    except OSError as err:
+        error = "Unable to start worker: %s" % err
+
+    report_seq = []
+    try:
+        with open(report_filepath, 'r') as file:
+            report_seq = json.load(file)
+    except (OSError, ValueError):
+        pass
+    os.remove(report_filepath)
+    return report_seq, error
+
+
+def run_worker(blender, spec_filepath, filepath_seq, is_save, timeout, directory):
+    """
+    Process chunk of files in worker processes. Return's list of per-file reports. If worker crashes or times out,
+    only the file it was processing is reported as failed, the rest of files are processed by a new worker.
+    """
+    report_seq = []
+    while len(report_seq) < len(filepath_seq):
+        process_report_seq, error = run_process(
+            blender, spec_filepath, filepath_seq[len(report_seq):], is_save, timeout, directory)
+        report_seq.extend(process_report_seq)
+        if len(report_seq) < len(filepath_seq):
+            report_seq.append({"file": filepath_seq[len(report_seq)], "error": error or "No report", "time": 0.0})
+    return report_seq
+
+
+def get_summary(report_seq, time_total):
+    failed_seq = [n for n in report_seq if n.get("error") is not None]
+    time_serial = sum(n.get("time", 0.0) for n in report_seq)
+    segments = sum(n.get("segments", 0) for n in report_seq)
+    return {
+        "files": len(report_seq),
+        "failed": len(failed_seq),
+        "pathes": sum(n.get("pathes", 0) for n in report_seq),
+        "segments": segments,
+        "time": time_total,
+        # Sum of per-file times, without startup of workers
+        "time_files": time_serial,
+        "segments_per_second": segments / time_total if time_total > 0.0 else 0.0,
+    }
+
+
+def run(filepath_seq, spec_filepath, blender="blender", jobs=None, is_save=True, timeout=3600):
+    """Process files in parallel worker processes. Return's dict with summary and per-file reports"""
+    jobs = jobs or os.cpu_count() or 1
+    spec_filepath = os.path.abspath(spec_filepath)
+    chunk_seq = get_chunks([os.path.abspath(n) for n in filepath_seq], jobs)
+
+    time_start = perf_counter()
+    report_seq = []
+    with tempfile.TemporaryDirectory() as directory:
+        # Threads only wait for worker processes
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            future_seq = [
+                executor.submit(run_worker, blender, spec_filepath, chunk, is_save, timeout, directory)
+                for chunk in chunk_seq
+            ]
+            for future in as_completed(future_seq):
+                for report in future.result():
+                    report_seq.append(report)
+                    if report.get("error") is not None:
+                        status = "FAILED (%s)" % report["error"]
+                    else:
+                        status = "%d segments, %d warnings" % (report.get("segments", 0), len(report["messages"]))
+                    print("[%d/%d] %s: %.2f s, %s" % (
+                        len(report_seq), len(filepath_seq), report["file"], report.get("time", 0.0), status))
+
+    return {
+        "time": strftime("%Y-%m-%d %H:%M:%S"),
+        "spec": spec_filepath,
+        "jobs": jobs,
+        "summary": get_summary(report_seq, perf_counter() - time_start),
+        "files": sorted(report_seq, key=lambda n: n["file"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mark up pathes from spec file in directory of .blend files")
+    parser.add_argument("directory", help="Directory of .blend files")
+    parser.add_argument("spec", help="Spec file path (see utils.batch)")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--recursive", action='store_true', help="Search .blend files in subdirectories")
+    parser.add_argument("--no-save", action='store_true', help="Do not save files after markup")
+    parser.add_argument("--timeout", type=int, default=3600, help="Timeout of each worker process in seconds")
+    parser.add_argument("--summary", default=None, help="JSON file for summary and per-file reports")
+    args = parser.parse_args(argv)
+
+    filepath_seq = find_blend_files(args.directory, args.recursive)
+    if not filepath_seq:
+        print("No .blend files found in %s" % args.directory)
+        return 1
+
+    result = run(filepath_seq, args.spec, args.blender, args.jobs, not args.no_save, args.timeout)
+    summary = result["summary"]
+    print("Processed %d files (%d failed), %d segments in %.1f s (%.1f s of files time), %.0f segments per second" % (
+        summary["files"], summary["failed"], summary["segments"], summary["time"], summary["time_files"],
+        summary["segments_per_second"]))
+
+    if args.summary:
+        with open(args.summary, 'w') as file:
+            json.dump(result, file, indent=2)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Scaling benchmark of the tool in background mode. Meshes of increasing size are generated, scripted workloads
+are replayed through PathUtils (see replay module) and latency of each operation and peak memory are reported:
+
+blender --background --python-expr "from <addon>.utils import benchmark; benchmark.main()" -- result.json [--quick]
+"""
+
+if "bpy" in locals():
+    import importlib
+
+    if "replay" in locals():
+        importlib.reload(replay)
+
+import sys
+import json
+import tracemalloc
+from time import strftime
+
+import bpy
+import bmesh
+import numpy as np
+from mathutils import Matrix
+
+from . import replay
+from .. import bl_info
+
+# Mesh kind - sizes. Size is grid segments, icosphere subdivisions, islands or objects count
+MESH_SIZES = {
+    "GRID": (16, 32, 64, 128, 256),
+    "SPHERE": (3, 4, 5, 6, 7),
+    "ISLANDS": (4, 16, 64),
+    "OBJECTS": (2, 4, 8),
+}
+
+MESH_SIZES_QUICK = {
+    "GRID": (16, 32),
+    "SPHERE": (3, 4),
+    "ISLANDS": (4,),
+    "OBJECTS": (2,),
+}
+
+WORKLOADS = ("ADD", "DRAG", "CLOSE", "JOIN", "UNDO", "APPLY")
+
+# Number of picked elements in each workload
+POINTS_COUNT = 16
+
+# Mark options of APPLY workload, both seams and sharpness are marked so markup step is measured too
+APPLY_MARK_OPTIONS = {"mark_select": 'EXTEND', "mark_seam": 'MARK', "mark_sharp": 'MARK'}
+
+
+def _create_icosphere(bm, subdivisions, matrix):
+    # Radius argument was renamed in Blender 3.0
+    if bpy.app.version >= (3, 0, 0):
+        bmesh.ops.create_icosphere(bm, subdivisions=subdivisions, radius=1.0, matrix=matrix)
+    else:
+        bmesh.ops.create_icosphere(bm, subdivisions=subdivisions, diameter=1.0, matrix=matrix)
+
+
+def gen_meshes(mesh_kind, size):
+    """Return's list of new objects linked to scene for mesh kind and size"""
+    bm_seq = []
+    if mesh_kind == "GRID":
+        bm = bmesh.new()
+        bmesh.ops.create_grid(bm, x_segments=size, y_segments=size, size=1.0)
+        bm_seq.append(bm)
+    elif mesh_kind == "SPHERE":
+        bm = bmesh.new()
+        _create_icosphere(bm, size, Matrix())
+        bm_seq.append(bm)
+    elif mesh_kind == "ISLANDS":
+        bm = bmesh.new()
+        for i in range(size):
+            bmesh.ops.create_grid(bm, x_segments=16, y_segments=16, size=1.0,
+                                  matrix=Matrix.Translation((i * 2.5, 0.0, 0.0)))
+        bm_seq.append(bm)
+    elif mesh_kind == "OBJECTS":
+        for _ in range(size):
+            bm = bmesh.new()
+            bmesh.ops.create_grid(bm, x_segments=64, y_segments=64, size=1.0)
+            bm_seq.append(bm)
+
+    ob_seq = []
+    for i, bm in enumerate(bm_seq):
+        mesh = bpy.data.meshes.new("benchmark_%s_%d" % (mesh_kind.lower(), i))
+        bm.to_mesh(mesh)
+        bm.free()
+        ob = bpy.data.objects.new(mesh.name, mesh)
+        ob.matrix_world = Matrix.Translation((0.0, i * 2.5, 0.0))
+        bpy.context.scene.collection.objects.link(ob)
+        ob_seq.append(ob)
+    return ob_seq
+
+
+def remove_meshes(ob_seq):
+    for ob in ob_seq:
+        mesh = ob.data
+        bpy.data.objects.remove(ob)
+        bpy.data.meshes.remove(mesh)
+
+
+def set_edit_mode(context, ob_seq):
+    if context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for ob in context.view_layer.objects:
+        ob.select_set(ob in ob_seq)
+    if ob_seq:
+        context.view_layer.objects.active = ob_seq[0]
+        bpy.ops.object.mode_set(mode='EDIT')
+
+
+def get_point_runs(elem_count_seq, count):
+    """
+    List of runs of points (object index, element index), one run for each object. Points of a run are evenly
+    distributed over elements of it's object, so consecutive points of a run are routed as a single path.
+    """
+    run_count = max(count // len(elem_count_seq), 2)
+    run_seq = []
+    for ob_index, elem_count in enumerate(elem_count_seq):
+        run_seq.append([
+            (ob_index, int(i * (elem_count - 1) / (run_count - 1))) for i in range(run_count)
+        ])
+    return run_seq
+
+
+def gen_workload_events(workload, elem_count_seq, count=POINTS_COUNT):
+    """List of events in recording format of scripted workload"""
+    def event(kind, point=(-1, -1)):
+        return (0.0, kind, point[0], point[1], 0)
+
+    run_seq = get_point_runs(elem_count_seq, count)
+    # Runs of objects follow each other, the first point of each run starts a new path on it's object
+    points = [point for run in run_seq for point in run]
+    event_seq = []
+
+    def add(point_seq):
+        for point in point_seq:
+            event_seq.append(event('ADD', point))
+            event_seq.append(event('RELEASE', point))
+
+    if workload == 'ADD':
+        add(points)
+    elif workload == 'DRAG':
+        # The second control element is dragged over all other points of the first object, each step
+        # re-routes the segment
+        run = run_seq[0]
+        add(run[:1])
+        event_seq.append(event('ADD', run[1]))
+        for point in run[2:]:
+            event_seq.append(event('DRAG', point))
+        event_seq.append(event('RELEASE', run[-1]))
+    elif workload == 'CLOSE':
+        add(points)
+        event_seq.append(event('CLOSE'))
+    elif workload == 'JOIN':
+        # Two routed pathes on the first object. The first control element of the second path is dragged
+        # to the end of the first path, so they are joined on release
+        run = run_seq[0]
+        half = len(run) // 2
+        add(run[:half])
+        event_seq.append(event('ADD_NEW_PATH', run[half]))
+        event_seq.append(event('RELEASE', run[half]))
+        add(run[half + 1:])
+        event_seq.append(event('ADD', run[half]))
+        event_seq.append(event('DRAG', run[half - 1]))
+        event_seq.append(event('RELEASE', run[half - 1]))
+    elif workload == 'UNDO':
+        add(points)
+        for _ in range(len(points) // 2):
+            event_seq.append(event('UNDO'))
+        for _ in range(len(points) // 2):
+            event_seq.append(event('REDO'))
+    elif workload == 'APPLY':
+        add(points)
+        event_seq.append(event('APPLY'))
+    return event_seq
+
+
+def get_latency_stats(event_timings):
+    """Dict {event kind: {count, mean, p95, max}} of per-event timings (milliseconds)"""
+    kind_timings = {}
+    for kind, value in event_timings:
+        kind_timings.setdefault(kind, []).append(value)
+    ret = {}
+    for kind, value_seq in kind_timings.items():
+        arr = np.array(value_seq, dtype=np.float64)
+        ret[kind] = {
+            "count": len(arr),
+            "mean": float(arr.mean()),
+            "p95": float(np.percentile(arr, 95)),
+            "max": float(arr.max()),
+        }
+    return ret
+
+
+def run_case(context, mesh_kind, size, select_mode):
+    """Return's list of results of all workloads for generated mesh"""
+    ob_seq = gen_meshes(mesh_kind, size)
+    is_faces = select_mode == 'FACE'
+    elem_count_seq = [len(ob.data.polygons) if is_faces else len(ob.data.vertices) for ob in ob_seq]
+    mesh_info = {
+        "mesh": mesh_kind,
+        "size": size,
+        "select_mode": select_mode,
+        "objects": len(ob_seq),
+        "verts": sum(len(ob.data.vertices) for ob in ob_seq),
+        "edges": sum(len(ob.data.edges) for ob in ob_seq),
+        "faces": sum(len(ob.data.polygons) for ob in ob_seq),
+    }
+
+    result_seq = []
+    try:
+        for workload in WORKLOADS:
+            data = {
+                "version": replay.RECORDING_VERSION,
+                "select_mode": select_mode,
+                "objects": [ob.name for ob in ob_seq],
+                "events": gen_workload_events(workload, elem_count_seq),
+                "mark": APPLY_MARK_OPTIONS,
+            }
+            # Each workload starts from a clean edit mode session. Memory tracing slows down execution,
+            # so latency and peak memory are measured by separate runs
+            set_edit_mode(context, ob_seq)
+            report = replay.replay(context, data)
+
+            set_edit_mode(context, ob_seq)
+            tracemalloc.start()
+            replay.replay(context, data)
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            result = dict(mesh_info)
+            result.update({
+                "workload": workload,
+                "total": report["total"],
+                "latency": get_latency_stats(report["events"]),
+                "stages": report["stages"],
+                "peak_memory_kb": peak / 1024.0,
+            })
+            result_seq.append(result)
+            print("%s %s %d %s: %.2f ms, %.0f KB" % (
+                workload, mesh_kind, size, select_mode, report["total"], peak / 1024.0))
+    finally:
+        set_edit_mode(context, [])
+        remove_meshes(ob_seq)
+    return result_seq
+
+
+def run(context, mesh_sizes=MESH_SIZES):
+    result_seq = []
+    for mesh_kind, size_seq in mesh_sizes.items():
+        for size in size_seq:
+            for select_mode in ('EDGE', 'FACE'):
+                result_seq.extend(run_case(context, mesh_kind, size, select_mode))
+    return {
+        "addon_version": bl_info["version"],
+        "blender_version": bpy.app.version_string,
+        "time": strftime("%Y-%m-%d %H:%M:%S"),
+        "results": result_seq,
+    }
+
+
+def main():
+    """Entry point for background mode, arguments after "--" are result path and optional "--quick" flag"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    mesh_sizes = MESH_SIZES_QUICK if "--quick" in argv else MESH_SIZES
+    argv = [n for n in argv if n != "--quick"]
+
+    result = run(bpy.context, mesh_sizes)
+
+    if argv:
+        with open(argv[0], 'w') as file:
+            json.dump(result, file, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
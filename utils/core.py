@@ -0,0 +1,494 @@
+"""
+Core of the tool: pathes interaction, routing and islands over mesh graphs (utils.mesh_graph).
+Module does not depend on Blender, operator (utils.base.PathUtils) adds views of pathes (batches
+for drawing and spatial index of control elements) and bmesh based mesh graphs.
+"""
+
+if "timing" in locals():
+    import importlib
+
+    importlib.reload(timing)
+    if "mesh_graph" in locals():
+        importlib.reload(mesh_graph)
+    if "unified_path" in locals():
+        importlib.reload(unified_path)
+    if "redo" in locals():
+        importlib.reload(redo)
+
+from collections import deque
+from enum import Enum
+
+from . import timing
+from . import mesh_graph
+from . import unified_path
+from . import redo
+
+Path = unified_path.Path
+ArrayPath = unified_path.ArrayPath
+
+
+class InteractEvent(Enum):
+    """Control element interaction mode"""
+    ADD = 1
+    ADD_NEW_PATH = 2
+    REMOVE = 3
+    DRAG = 6
+    CLOSE = 7
+    CHDIR = 8
+    RELEASE = 9
+
+
+class PathCore:
+    """
+    Pathes interaction state machine. Mesh graphs of objects are provided by get_mesh_graph, views of pathes
+    are updated by methods which do nothing here and are implemented by operator.
+    """
+
+    # New pathes are backed by element indices arrays (utils.unified_path.ArrayPath)
+    use_compact_pathes = False
+
+    @property
+    def active_path(self):
+        if (self._active_path_index is not None) and (self._active_path_index <= len(self.path_seq) - 1):
+            return self.path_seq[self._active_path_index]
+
+    @active_path.setter
+    def active_path(self, value: Path):
+        if value not in self.path_seq:
+            self.path_seq.append(value)
+        self._active_path_index = self.path_seq.index(value)
+
+    def get_mesh_graph(self, context, ob):
+        """Mesh graph (utils.mesh_graph.MeshGraph) of object"""
+        raise NotImplementedError
+
+    def new_path(self, context, elem, island_index, ob):
+        """New path of object, with the first control element if elem is not None"""
+        if not self.use_compact_pathes:
+            return Path(elem, island_index, ob)
+        control_elem_seq, fill_elem_seq = self.get_mesh_graph(context, ob).get_element_seqs()
+        return ArrayPath(elem, island_index, ob, control_elem_seq, fill_elem_seq)
+
+    def report(self, type, message):
+        pass
+
+    def cancel(self, context):
+        pass
+
+    # Views of pathes
+
+    def tag_views_update(self):
+        pass
+
+    def rebuild_batch_control_elements(self, context, path):
+        pass
+
+    def add_batch_control_element(self, path, elem):
+        pass
+
+    def remove_batch_control_element(self, path, elem):
+        pass
+
+    def replace_batch_control_element(self, path, elem, new_elem):
+        pass
+
+    def update_batch_fills(self, context, path, fill_index_seq):
+        pass
+
+    # Progress of long operations
+
+    def progress_begin(self, context, total):
+        pass
+
+    def progress_update(self, context, value):
+        pass
+
+    def progress_end(self, context):
+        pass
+
+    # Islands and routing
+
+    @timing.timed("ISLAND")
+    def get_linked_island_index(self, context, ob, elem):
+        return self.get_mesh_graph(context, ob).get_island_index(context, elem)
+
+    @timing.timed("ROUTE")
+    def update_path_beetween(self, context, ob, elem_0, elem_1):
+        return self.get_mesh_graph(context, ob).get_fill_elements(context, elem_0, elem_1)
+
+    @timing.timed("ROUTE")
+    def update_pathes_beetween(self, context, ob, pair_seq):
+        """Return's list of fill elements lists for each pair of control elements, routed in one batch"""
+        return self.get_mesh_graph(context, ob).get_fill_elements_seq(context, pair_seq)
+
+    def update_fills_by_element_index(self, context, path, elem_index):
+        self.update_fills_by_elements_indices(context, ((path, elem_index),))
+
+    def update_fills_by_elements_indices(self, context, path_elem_index_seq):
+        """
+        Update fills from and to control elements of pathes given by (path, element index) pairs.
+        Segments of all pathes of each object are routed in one batch.
+        """
+        # Object - list of (path, pairs items)
+        ob_items = {}
+        for path, elem_index in path_elem_index_seq:
+            ob_items.setdefault(path.ob, []).append((path, path.get_pairs_items(elem_index)))
+
+        for ob, items in ob_items.items():
+            pair_seq = [(item[0], item[1]) for _path, pairs_items in items for item in pairs_items]
+            fill_seq_iter = iter(self.update_pathes_beetween(context, ob, pair_seq))
+            for path, pairs_items in items:
+                for item in pairs_items:
+                    path.fill_elements[item[2]] = next(fill_seq_iter)
+                self.update_batch_fills(context, path, [item[2] for item in pairs_items])
+
+    @staticmethod
+    def get_fill_pair(path, fill_index):
+        """Return's pair of control elements of fill of path or None for open path close fill"""
+        control_elements = path.control_elements
+        count = len(control_elements)
+        if fill_index < count - 1:
+            return control_elements[fill_index], control_elements[fill_index + 1]
+        # The last fill is from the last control element to the first one
+        if path.close and count > 2:
+            return control_elements[-1], control_elements[0]
+
+    def route_fills(self, context, path, fill_index_seq):
+        """Return's list of fill elements lists of fills of path, routed in one batch"""
+        pair_seq = [self.get_fill_pair(path, i) for i in fill_index_seq]
+        routed_seq = iter(self.update_pathes_beetween(context, path.ob, [n for n in pair_seq if n is not None]))
+        return [[] if pair is None else next(routed_seq) for pair in pair_seq]
+
+    def update_fills(self, context, path):
+        """Route all segments of path"""
+        fill_seq_seq = self.route_fills(context, path, range(len(path.control_elements)))
+        path.fill_elements = fill_seq_seq
+        self.update_batch_fills(context, path, range(len(fill_seq_seq)))
+
+    def load_pathes(self, context, ob, record_seq, control_elem_seq, fill_elem_seq, is_topology_matched):
+        """
+        Add pathes of object from records (utils.session_io.PathRecord), indices of records are resolved
+        by element sequences. Segments without fills are routed in a single pass with progress.
+        Return's list of added pathes.
+        """
+        route_total = 0
+        for record in record_seq:
+            if record.fill_seq_seq is None:
+                route_total += len(record.control_indices)
+            else:
+                route_total += sum(n is None for n in record.fill_seq_seq)
+        if route_total:
+            self.progress_begin(context, route_total)
+        route_count = 0
+
+        # Saved island - island index. If topology is unchanged, islands are evaluated once for pathes of each island
+        island_indices = {}
+        path_seq = []
+        for record in record_seq:
+            if not record.control_indices:
+                continue
+            control_elements = [control_elem_seq[i] for i in record.control_indices]
+
+            island_index = island_indices.get(record.island, None) if is_topology_matched else None
+            if island_index is None:
+                island_index = self.get_linked_island_index(context, ob, control_elements[0])
+                island_indices[record.island] = island_index
+
+            path = self.new_path(context, None, island_index, ob)
+            path.control_elements = control_elements
+            path.close = record.close
+            path.direction = record.direction
+            self.rebuild_batch_control_elements(context, path)
+
+            saved_fill_seq_seq = record.fill_seq_seq
+            if saved_fill_seq_seq is None:
+                saved_fill_seq_seq = [None] * len(control_elements)
+            route_index_seq = [i for i, n in enumerate(saved_fill_seq_seq) if n is None]
+            routed_seq = iter(self.route_fills(context, path, route_index_seq))
+            fill_seq_seq = [
+                next(routed_seq) if fill_indices is None else [fill_elem_seq[j] for j in fill_indices]
+                for fill_indices in saved_fill_seq_seq
+            ]
+            if route_index_seq:
+                route_count += len(route_index_seq)
+                self.progress_update(context, route_count)
+            path.fill_elements = fill_seq_seq
+            self.update_batch_fills(context, path, range(len(fill_seq_seq)))
+            path_seq.append(path)
+
+        if route_total:
+            self.progress_end(context)
+
+        if path_seq:
+            self.path_seq.extend(path_seq)
+            self.active_path = path_seq[-1]
+            self._just_closed_path = False
+            redo.register_undo_step(self)
+            self.tag_views_update()
+        return path_seq
+
+    def remove_path_doubles(self, context, path):
+        # Control element -> it's indices in path
+        elem_indices = {}
+        for i, control_element in enumerate(path.control_elements):
+            elem_indices.setdefault(control_element, []).append(i)
+
+        # Adjacent control elements, the later one of each adjacent pair is removed
+        merge_indices = []
+        for indices in elem_indices.values():
+            for i, j in zip(indices, indices[1:]):
+                if j == i + 1:
+                    merge_indices.append(j)
+
+        if merge_indices:
+            for j in sorted(merge_indices, reverse=True):
+                self.remove_batch_control_element(path, path.pop_control_element(j))
+            self.report(type={'INFO'}, message="Merged adjacent control elements")
+
+        # First-last control element same path
+        control_elements_count = len(path.control_elements)
+        if control_elements_count > 2 and path.control_elements[0] == path.control_elements[-1]:
+            self.remove_batch_control_element(path, path.pop_control_element(-1))
+            if not path.close:
+                path.close = True
+                self.update_fills_by_element_index(context, path, 0)
+
+                message = "Closed path"
+                if path == self.active_path:
+                    self._just_closed_path = True
+                    message = "Closed active path"
+                self.report(type={'INFO'}, message=message)
+            else:
+                self.update_fills_by_element_index(context, path, 0)
+
+        # Other doubles are not adjacent, they are kept. Maybe, undo here?
+
+    def check_join_pathes(self, context):
+        # Endpoint control element -> open pathes which start or end with it, in order of pathes
+        endpoint_pathes = {}
+        for path in self.path_seq:
+            if not path.close:
+                for elem in (path.control_elements[0], path.control_elements[-1]):
+                    endpoint_pathes.setdefault(elem, []).append(path)
+
+        joined_pathes = []
+        removed_pathes = set()
+        for path in self.path_seq:
+            if path.close or path in removed_pathes:
+                continue
+
+            # Join end-end pathes while there is one, so chains of pathes are joined in a single pass
+            while True:
+                other_path = None
+                for elem in (path.control_elements[0], path.control_elements[-1]):
+                    for other in endpoint_pathes.get(elem, ()):
+                        # Items are not removed from lists, so endpoints are checked again
+                        if (
+                            other is not path and other not in removed_pathes and
+                            elem in (other.control_elements[0], other.control_elements[-1])
+                        ):
+                            other_path = other
+                            break
+                    if other_path is not None:
+                        break
+
+                if other_path is None:
+                    break
+
+                path += other_path
+                removed_pathes.add(other_path)
+                for elem in (path.control_elements[0], path.control_elements[-1]):
+                    endpoint_pathes.setdefault(elem, []).append(path)
+                if path not in joined_pathes:
+                    joined_pathes.append(path)
+                self.report(type={'INFO'}, message="Joined two paths")
+
+        if joined_pathes:
+            self.path_seq = [n for n in self.path_seq if n not in removed_pathes]
+            joined_pathes = [n for n in joined_pathes if n not in removed_pathes]
+            self.active_path = joined_pathes[-1]
+            for path in joined_pathes:
+                self.rebuild_batch_control_elements(context, path)
+
+    def interact_control_element(self, context, elem, ob, interact_event):
+        """Main method of interacting with all pathes"""
+        if elem and interact_event is InteractEvent.ADD:
+            # Only the first click
+            if not self.path_seq:
+                self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
+                return
+
+            new_elem_index = None
+
+            elem_index = self.active_path.is_in_control_elements(elem)
+            if elem_index is None:
+                new_elem_index = len(self.active_path.control_elements)
+
+                fill_index = self.active_path.is_in_fill_elements(elem)
+                if fill_index is None:
+                    is_found_in_other_path = False
+                    for path in self.path_seq:
+                        if path == self.active_path:
+                            continue
+                        other_elem_index = path.is_in_control_elements(elem)
+                        if other_elem_index is None:
+                            other_fill_index = path.is_in_fill_elements(elem)
+                            if other_fill_index is not None:
+                                is_found_in_other_path = True
+                        else:
+                            is_found_in_other_path = True
+
+                        if is_found_in_other_path:
+                            self.active_path = path
+                            self._just_closed_path = False
+                            self.interact_control_element(context, elem, ob, InteractEvent.ADD)
+                            return
+                else:
+                    new_elem_index = fill_index + 1
+                    self._just_closed_path = False
+
+            if elem_index is not None:
+                self.drag_elem_indices = [path.is_in_control_elements(elem) for path in self.path_seq]
+                self._just_closed_path = False
+            self._drag_elem = elem
+
+            if self._just_closed_path:
+                self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
+                return
+
+            if new_elem_index is not None:
+                # Add a new control element to active path
+                linked_island_index = self.get_linked_island_index(context, ob, elem)
+                if self.active_path.island_index != linked_island_index:
+                    self.interact_control_element(context, elem, ob, InteractEvent.ADD_NEW_PATH)
+                    return
+
+                self.active_path.insert_control_element(new_elem_index, elem)
+                self.update_fills_by_element_index(context, self.active_path, new_elem_index)
+                self.add_batch_control_element(self.active_path, elem)
+
+                self.drag_elem_indices = [path.is_in_control_elements(elem) for path in self.path_seq]
+
+        elif elem and interact_event is InteractEvent.ADD_NEW_PATH:
+            # Adding new path
+            linked_island_index = self.get_linked_island_index(context, ob, elem)
+            self.active_path = self.new_path(context, elem, linked_island_index, ob)
+            self.rebuild_batch_control_elements(context, self.active_path)
+            # Recursion used to add new control element to newly created path
+            self._just_closed_path = False
+            self.interact_control_element(context, elem, ob, InteractEvent.ADD)
+            self.report(type={'INFO'}, message="Created new path")
+            return
+
+        elif elem and interact_event is InteractEvent.REMOVE:
+            # Remove control element
+            self._just_closed_path = False
+
+            elem_index = self.active_path.is_in_control_elements(elem)
+            if elem_index is None:
+                for path in self.path_seq:
+                    other_elem_index = path.is_in_control_elements(elem)
+                    if other_elem_index is not None:
+                        self.active_path = path
+                        self.interact_control_element(context, elem, ob, InteractEvent.REMOVE)
+                        return
+            else:
+                self.remove_batch_control_element(self.active_path, self.active_path.pop_control_element(elem_index))
+
+                # Remove the last control element from path
+                if not len(self.active_path.control_elements):
+                    self.path_seq.remove(self.active_path)
+                    if len(self.path_seq):
+                        self.active_path = self.path_seq[-1]
+                else:
+                    self.update_fills_by_element_index(context, self.active_path, elem_index)
+
+        elif elem and interact_event is InteractEvent.DRAG:
+            # Drag control element
+            if (not self._drag_elem) or (len(self.drag_elem_indices) != len(self.path_seq)):
+                return
+            self._just_closed_path = False
+
+            linked_island_index = self.get_linked_island_index(context, ob, elem)
+            if self.active_path.island_index == linked_island_index:
+                self._drag_elem = elem
+
+                path_elem_index_seq = []
+                for i, path in enumerate(self.path_seq):
+                    j = self.drag_elem_indices[i]
+                    if j is not None:
+                        self.replace_batch_control_element(path, path.control_elements[j], elem)
+                        path.control_elements[j] = elem
+                        path_elem_index_seq.append((path, j))
+
+                # Segments of all pathes with dragged element are routed from it by shared searches
+                self.update_fills_by_elements_indices(context, path_elem_index_seq)
+
+        # Switch active path direction
+        elif interact_event is InteractEvent.CHDIR:
+            # Active control element is the last one, views should take it into account when drawn
+            self.active_path.reverse()
+            self._just_closed_path = False
+
+        # Close active path
+        elif interact_event is InteractEvent.CLOSE:
+            self.active_path.close = not self.active_path.close
+
+            if self.active_path.close:
+                self.update_fills_by_element_index(context, self.active_path, 0)
+                if len(self.active_path.control_elements) > 2:
+                    self._just_closed_path = True
+            else:
+                self.active_path.fill_elements[-1] = []
+                self.active_path.batch_seq_fills[-1] = None
+                self._just_closed_path = False
+                self.check_join_pathes(context)
+
+        # Release interact event event
+        elif interact_event is InteractEvent.RELEASE:
+            self.drag_elem_indices = []
+            self._drag_elem = None
+
+            # Remove doubles from every existing path
+            for path in self.path_seq:
+                self.remove_path_doubles(context, path)
+            # Join any end-end pathes
+            self.check_join_pathes(context)
+
+            # # Register current state after adding new, dragging or removing control elements, pathes
+            # # or when toggle open/close path or changed path direction
+            redo.register_undo_step(self)
+
+        if interact_event is not InteractEvent.DRAG:
+            # Active path or pathes list could be changed
+            self.tag_views_update()
+
+        # Uncomment line to see formatted path in the console
+        # print(self.active_path)
+
+
+class ArrayPathCore(PathCore):
+    """
+    Pathes core over array mesh graphs (utils.mesh_graph.ArrayMeshGraph), works without Blender.
+    Objects are any hashable keys of graph_seq.
+    """
+
+    def __init__(self, graph_seq, undo_steps=32, use_compact_pathes=False):
+        # Object - ArrayMeshGraph
+        self.graph_seq = graph_seq
+        self.use_compact_pathes = use_compact_pathes
+        self.timer = timing.StageTimer()
+        self.path_seq = []
+        self.drag_elem_indices = []
+        self._active_path_index = None
+        self._drag_elem = None
+        self._just_closed_path = False
+        self.undo_history = deque(maxlen=undo_steps)
+        self.redo_history = deque(maxlen=undo_steps)
+        self.message_seq = []
+
+    def get_mesh_graph(self, context, ob):
+        return self.graph_seq[ob]
+
+    def report(self, type, message):
+        self.message_seq.append(message)
@@ -3,87 +3,363 @@ if "bpy" in locals():
 
     if "shaders" in locals():
         importlib.reload(shaders)
+    if "timing" in locals():
+        importlib.reload(timing)
+
+from collections import deque
+from time import perf_counter
 
 import bpy
 import bgl
-import bmesh
-from gpu_extras.batch import batch_for_shader
+import blf
+import gpu
+import numpy as np
 
+from . import timing
 from .. import shaders
 from .. import __package__ as addon_pkg
 
-def gen_batch_faces_seq(fill_seq, is_active, shader):
-    temp_bmesh = bmesh.new()
-    for face in fill_seq:
-        temp_bmesh.faces.new((temp_bmesh.verts.new(v.co, v) for v in face.verts), face)
-    temp_bmesh.verts.index_update()
-    temp_bmesh.faces.ensure_lookup_table()
-
-    pos = [v.co for v in temp_bmesh.verts]
-    loop_triangles = temp_bmesh.calc_loop_triangles()
-    indices = [(loop.vert.index for loop in looptris) for looptris in loop_triangles]
-
-    batch = batch_for_shader(shader, 'TRIS', {"pos": pos}, indices=indices)
-
-    active_face_tri_start_index = None
-
-    if is_active:
-        active_face_tri_start_index = len(loop_triangles)
-        temp_bmesh = bmesh.new()
-        face = fill_seq[-1]
-        temp_bmesh.faces.new((temp_bmesh.verts.new(v.co, v) for v in face.verts), face)
-        loop_triangles = temp_bmesh.calc_loop_triangles()
-        active_face_tri_start_index -= len(loop_triangles)
-
-    return batch, active_face_tri_start_index
-
-
-def gen_batch_control_elements(context, is_active, path):
-    shader = shaders.shader.vert_uniform_color
-    tool_settings = context.scene.tool_settings
-    select_mode = tuple(tool_settings.mesh_select_mode)
-
-    batch = None
-    active_elem_start_index = None
-
-    if select_mode[1]:
-        pos = [v.co for v in path.control_elements]
-        batch = batch_for_shader(shader, 'POINTS', {"pos": pos})
-        if is_active:
-            active_elem_start_index = len(path.control_elements) - 1
-    elif select_mode[2]:
-        batch, active_elem_start_index = gen_batch_faces_seq(path.control_elements, is_active, shader)
-
-    return batch, active_elem_start_index
 
-
-def gen_batch_fill_elements(context, fill_seq):
-    shader = shaders.shader.path_uniform_color
+_vert_formats = {}
+
+# Incremented on every change of addon preferences, cached draw settings of older version are outdated
+_preferences_version = 0
+
+
+def tag_preferences_update(_self=None, _context=None):
+    """Update callback of addon preferences properties"""
+    global _preferences_version
+    _preferences_version += 1
+
+
+def get_vert_format(attributes):
+    """Format of vertex buffers with given float attributes {name: array}"""
+    key = tuple((name, 1 if data.ndim == 1 else data.shape[1]) for name, data in attributes.items())
+    vert_format = _vert_formats.get(key, None)
+    if vert_format is None:
+        vert_format = gpu.types.GPUVertFormat()
+        for name, comp_len in key:
+            vert_format.attr_add(id=name, comp_type='F32', len=comp_len, fetch_mode='FLOAT')
+        _vert_formats[key] = vert_format
+    return vert_format
+
+
+def gen_batch_from_arrays(batch_type, attributes, indices=None):
+    """
+    Batch from contiguous float32 arrays of vertex attributes {name: array} (and optional int32 indices array),
+    arrays are passed to buffers without creating Python objects for every vertex
+    """
+    vbo = gpu.types.GPUVertBuf(len=len(attributes["pos"]), format=get_vert_format(attributes))
+    for name, data in attributes.items():
+        vbo.attr_fill(id=name, data=data)
+    ibo = None
+    if indices is not None:
+        ibo = gpu.types.GPUIndexBuf(type=batch_type, seq=indices)
+    return gpu.types.GPUBatch(type=batch_type, buf=vbo, elem=ibo)
+
+
+def get_indices(elem_seq):
+    return np.fromiter((n.index for n in elem_seq), dtype=np.int32, count=len(elem_seq))
+
+
+class ControlElementsBuffer:
+    """
+    Growable vertex buffer of path control elements. Each control element has it's own slot (single point for
+    vertices, triangles of face for faces), slot_offsets[slot]:slot_offsets[slot + 1] is vertices range of slot.
+    Adding, removing or moving element rewrites only it's slot, following slots are shifted only if size of slot
+    changes. Slots are kept dense, removed slot is replaced by the last one. Active element is drawn by it's
+    primitives range uniform, order of slots does not matter.
+    """
+
+    __slots__ = (
+        "mesh",
+        "is_faces",
+        "pos",
+        "slot_elems",
+        "slot_offsets",
+        "elem_slots",
+        "batch",
+    )
+
+    def __init__(self, mesh, is_faces, elem_seq=()):
+        self.mesh = mesh
+        self.is_faces = is_faces
+        self.pos = np.zeros((16 * 3 if is_faces else 16, 3), dtype=np.float32)
+        # Slot index - element and element - slot indices
+        self.slot_elems = []
+        self.slot_offsets = [0]
+        self.elem_slots = {}
+        self.batch = None
+
+        for elem in elem_seq:
+            self.add(elem)
+
+    def _get_size(self, elem):
+        """Number of vertices of element slot"""
+        if self.is_faces:
+            face_tri_offsets = self.mesh.face_tri_offsets
+            return int(face_tri_offsets[elem.index + 1] - face_tri_offsets[elem.index]) * 3
+        return 1
+
+    def _reserve(self, count):
+        if count > len(self.pos):
+            pos = np.zeros((max(len(self.pos) * 2, count), 3), dtype=np.float32)
+            pos[:len(self.pos)] = self.pos
+            self.pos = pos
+
+    def _set_slot_size(self, slot, size):
+        """Change vertices count of slot, vertices of following slots are shifted"""
+        slot_offsets = self.slot_offsets
+        end = slot_offsets[slot + 1]
+        delta = size - (end - slot_offsets[slot])
+        if not delta:
+            return
+        total = slot_offsets[-1]
+        self._reserve(total + delta)
+        self.pos[end + delta:total + delta] = self.pos[end:total]
+        for i in range(slot + 1, len(slot_offsets)):
+            slot_offsets[i] += delta
+
+    def _write(self, slot, elem):
+        start = self.slot_offsets[slot]
+        if self.is_faces:
+            pos = self.mesh.vert_co[self.mesh.get_faces_tris((elem.index,)).ravel()]
+            self.pos[start:start + len(pos)] = pos
+        else:
+            self.pos[start] = self.mesh.vert_co[elem.index]
+        self.batch = None
+
+    def add(self, elem):
+        slot = len(self.slot_elems)
+        end = self.slot_offsets[-1] + self._get_size(elem)
+        self._reserve(end)
+        self.slot_elems.append(elem)
+        self.slot_offsets.append(end)
+        self.elem_slots.setdefault(elem, []).append(slot)
+        self._write(slot, elem)
+
+    def remove(self, elem):
+        slots = self.elem_slots[elem]
+        slot = slots.pop()
+        if not slots:
+            del self.elem_slots[elem]
+
+        last_slot = len(self.slot_elems) - 1
+        last_elem = self.slot_elems.pop()
+        last_start = self.slot_offsets[last_slot]
+        last_pos = self.pos[last_start:self.slot_offsets.pop()].copy()
+        if slot != last_slot:
+            # The last slot takes place of removed one
+            self._set_slot_size(slot, len(last_pos))
+            start = self.slot_offsets[slot]
+            self.pos[start:start + len(last_pos)] = last_pos
+            self.slot_elems[slot] = last_elem
+            last_elem_slots = self.elem_slots[last_elem]
+            last_elem_slots[last_elem_slots.index(last_slot)] = slot
+        self.batch = None
+
+    def replace(self, elem, new_elem):
+        if elem == new_elem:
+            return
+        slots = self.elem_slots[elem]
+        slot = slots.pop()
+        if not slots:
+            del self.elem_slots[elem]
+        self.slot_elems[slot] = new_elem
+        self.elem_slots.setdefault(new_elem, []).append(slot)
+        self._set_slot_size(slot, self._get_size(new_elem))
+        self._write(slot, new_elem)
+
+    def get_primitive_range(self, elem):
+        """Return's tuple (first primitive index, primitives count) of element"""
+        slots = self.elem_slots.get(elem, None)
+        if not slots:
+            return 0, 0
+        start, end = self.slot_offsets[slots[0]], self.slot_offsets[slots[0] + 1]
+        if self.is_faces:
+            return start // 3, (end - start) // 3
+        return start, 1
+
+    def get_batch(self):
+        """Batch is created only after buffer changes"""
+        if self.batch is None and self.slot_elems:
+            self.batch = gen_batch_from_arrays(
+                'TRIS' if self.is_faces else 'POINTS', {"pos": self.pos[:self.slot_offsets[-1]]})
+        return self.batch
+
+
+def gen_fill_elements_pos(context, fill_seq, mesh):
+    """
+    Vertex positions array of fill elements (edges as lines or faces as triangles), which is stored in path
+    and merged with all other fills of object by DrawLayer
+    """
     tool_settings = context.scene.tool_settings
     select_mode = tuple(tool_settings.mesh_select_mode)
-    batch = None
+    pos = None
+    if not fill_seq:
+        return pos
     if select_mode[1]:
-        pos = []
-        for edge in fill_seq:
-            pos.extend([vert.co for vert in edge.verts])
-        batch = batch_for_shader(shader, 'LINES', {"pos": pos})
+        # Positions of both vertices of every edge
+        pos = mesh.vert_co[mesh.edge_verts[get_indices(fill_seq)].ravel()]
     elif select_mode[2]:
-        batch, _ = gen_batch_faces_seq(fill_seq, False, shader)
-
-    return batch
-
-
+        pos = mesh.vert_co[mesh.get_faces_tris(get_indices(fill_seq)).ravel()]
+
+    return pos
+
+
+def get_visible_objects(context, ob_seq):
+    """
+    Return's set of pointers of objects which are not hidden and which bounding box is at least partially
+    inside view frustum of current region
+    """
+    visible_seq = set()
+    rv3d = context.region_data
+    if rv3d is None:
+        return set(ob.as_pointer() for ob in ob_seq)
+
+    perspective_matrix = np.array(rv3d.perspective_matrix, dtype=np.float32)
+    co = np.ones((8, 4), dtype=np.float32)
+    for ob in ob_seq:
+        if not ob.visible_get():
+            continue
+        co[:, :3] = ob.bound_box
+        clip = co @ (perspective_matrix @ np.array(ob.matrix_world, dtype=np.float32)).T
+        w = clip[:, 3:]
+        # Object is culled if all corners are outside of the same clipping plane
+        if np.any(np.all(clip[:, :3] > w, axis=0) | np.all(clip[:, :3] < -w, axis=0)):
+            continue
+        visible_seq.add(ob.as_pointer())
+    return visible_seq
+
+
+class DrawSettings:
+    """Draw settings resolved from addon preferences, which are reused until preferences are changed"""
+
+    __slots__ = (
+        "version",
+        "point_size",
+        "line_width",
+        "color_control_element",
+        "color_active_path_control_element",
+        "color_active_control_element",
+        "color_path",
+        "color_active_path",
+    )
+
+    def __init__(self, preferences):
+        self.version = _preferences_version
+        self.point_size = preferences.point_size
+        self.line_width = preferences.line_width
+        self.color_control_element = tuple(preferences.color_control_element)
+        self.color_active_path_control_element = tuple(preferences.color_active_path_control_element)
+        self.color_active_control_element = tuple(preferences.color_active_control_element)
+        self.color_path = tuple(preferences.color_path)
+        self.color_active_path = tuple(preferences.color_active_path)
+
+
+class DrawLayer:
+    """
+    Merged batches of all fills of each object. Batch has per-vertex "active" attribute, so all pathes
+    of object are drawn by single draw call. Batches are rebuilt from vertex positions arrays stored in pathes
+    only for objects tagged for update, batches of objects out of view are rebuilt when they become visible.
+    """
+
+    __slots__ = (
+        "fills_batch_seq",
+        "update_seq",
+        "is_update_all",
+        "settings",
+        "frame_time_seq",
+    )
+
+    def __init__(self):
+        # Object pointer - (bpy.types.Object, GPUBatch)
+        self.fills_batch_seq = {}
+        self.update_seq = set()
+        self.is_update_all = True
+        self.settings = None
+        # CPU time of the latest redraws, in seconds
+        self.frame_time_seq = deque(maxlen=120)
+
+    def get_settings(self, context):
+        if self.settings is None or self.settings.version != _preferences_version:
+            self.settings = DrawSettings(context.preferences.addons[addon_pkg].preferences)
+        return self.settings
+
+    @property
+    def frame_time(self):
+        """Average CPU time of the latest redraws, in seconds"""
+        if not self.frame_time_seq:
+            return 0.0
+        return sum(self.frame_time_seq) / len(self.frame_time_seq)
+
+    def tag_update(self, ob=None):
+        """Tag object (or all objects if not given) fills batch for update"""
+        if ob is None:
+            self.is_update_all = True
+        else:
+            self.update_seq.add(ob.as_pointer())
+
+    def get_fills_batches(self, ob_seq, path_seq, active_path, batch_type, visible_seq):
+        """
+        Return's list of (bpy.types.Object, GPUBatch) pairs of visible objects.
+        ob_seq is {object pointer: object} of all pathes, visible_seq is set of visible objects pointers
+        """
+        for ptr in tuple(self.fills_batch_seq.keys()):
+            if ptr not in ob_seq:
+                del self.fills_batch_seq[ptr]
+
+        if self.is_update_all:
+            self.update_seq.update(self.fills_batch_seq.keys())
+            self.is_update_all = False
+
+        ret = []
+        for ptr, ob in ob_seq.items():
+            if ptr not in visible_seq:
+                continue
+            if (ptr in self.update_seq) or (ptr not in self.fills_batch_seq):
+                self.fills_batch_seq[ptr] = ob, self._gen_fills_batch(ob, path_seq, active_path, batch_type)
+                self.update_seq.discard(ptr)
+            item = self.fills_batch_seq[ptr]
+            if item[1] is not None:
+                ret.append(item)
+        return ret
+
+    @staticmethod
+    def _gen_fills_batch(ob, path_seq, active_path, batch_type):
+        pos_seq = []
+        active_seq = []
+        # Active path fills are the last ones, so they are drawn on top of others
+        for path in sorted((n for n in path_seq if n.ob == ob), key=lambda n: n == active_path):
+            is_active = float(path == active_path)
+            for pos in path.batch_seq_fills:
+                if pos is not None and len(pos):
+                    pos_seq.append(pos)
+                    active_seq.append(np.full(len(pos), is_active, dtype=np.float32))
+
+        if not pos_seq:
+            return None
+        return gen_batch_from_arrays(batch_type, {"pos": np.concatenate(pos_seq), "active": np.concatenate(active_seq)})
+
+
+@timing.timed("DRAW")
 def draw_callback_3d(self):
+    time_start = perf_counter()
     context = bpy.context
-    preferences = context.preferences.addons[addon_pkg].preferences
+    draw_layer = self.draw_layer
+    settings = draw_layer.get_settings(context)
 
-    # tool_settings = context.scene.tool_settings
-    # select_mode = tuple(tool_settings.mesh_select_mode)
+    ob_seq = {}
+    for path in self.path_seq:
+        ob_seq[path.ob.as_pointer()] = path.ob
+    visible_seq = get_visible_objects(context, ob_seq.values())
+    if not visible_seq:
+        draw_layer.frame_time_seq.append(perf_counter() - time_start)
+        return
 
-    bgl.glPointSize(preferences.point_size)
-    bgl.glLineWidth(preferences.line_width)
-
-    # bgl.glEnable(bgl.GL_PROGRAM_POINT_SIZE)
+    # OpenGL state is shared with all other drawing of Blender, so it is set on every redraw
+    bgl.glPointSize(settings.point_size)
+    bgl.glLineWidth(settings.line_width)
 
     bgl.glEnable(bgl.GL_MULTISAMPLE)
     bgl.glEnable(bgl.GL_LINE_SMOOTH)
@@ -92,54 +368,72 @@ def draw_callback_3d(self):
     bgl.glBlendFunc(bgl.GL_SRC_ALPHA, bgl.GL_ONE_MINUS_SRC_ALPHA)
     bgl.glEnable(bgl.GL_BLEND)
 
-    # bgl.glEnable(bgl.GL_POLYGON_SMOOTH)
-    bgl.glHint(bgl.GL_POLYGON_SMOOTH_HINT, bgl.GL_NICEST)
-
     bgl.glEnable(bgl.GL_DEPTH_TEST)
     bgl.glDepthFunc(bgl.GL_LEQUAL)
-    #bgl.glDepthRange(0.001, 0.999)
 
-    bgl.glDisable(bgl.GL_POLYGON_OFFSET_FILL)
-    bgl.glPolygonOffset(1.0, 0.0)
+    # All fills of each object are drawn at once
+    batch_type = 'TRIS' if context.scene.tool_settings.mesh_select_mode[2] else 'LINES'
+    shader_path = shaders.shader.path_uniform_color
+    shader_path.bind()
+    shader_path.uniform_float("color", settings.color_path)
+    shader_path.uniform_float("color_active", settings.color_active_path)
 
-    draw_list = [n for n in self.path_seq if n != self.active_path]
-    draw_list.append(self.active_path)
+    for ob, batch in draw_layer.get_fills_batches(ob_seq, self.path_seq, self.active_path, batch_type, visible_seq):
+        shader_path.uniform_float("ModelMatrix", ob.matrix_world)
+        batch.draw(shader_path)
 
-    for path in draw_list:
-        active_index = 0
-        color = preferences.color_control_element
-        color_active = color
-        color_path = preferences.color_path
+    shader_ce = shaders.shader.vert_uniform_color
+    shader_ce.bind()
 
-        if path == self.active_path:
-            #if path.direction:
-            active_index = self.active_index
+    active_path = self.active_path
+    # Active path is drawn the last one
+    draw_list = [n for n in self.path_seq if n != active_path]
+    draw_list.append(active_path)
 
-            color = preferences.color_active_path_control_element
-            color_active = preferences.color_active_control_element
-            color_path = preferences.color_active_path
-
-        shader_path = shaders.shader.path_uniform_color
-        shader_path.bind()
+    for path in draw_list:
+        if path.batch_control_elements is None or path.ob.as_pointer() not in visible_seq:
+            continue
+        batch = path.batch_control_elements.get_batch()
+        if batch is None:
+            continue
+
+        active_index, active_count = 0, 0
+        color = settings.color_control_element
+        color_active = color
 
-        for batch in path.batch_seq_fills:
-            if batch:
-                shader_path.uniform_float("ModelMatrix", path.ob.matrix_world)
-                shader_path.uniform_float("color", color_path)
-                batch.draw(shader_path)
+        if path == active_path:
+            # Last control element is active
+            active_index, active_count = path.batch_control_elements.get_primitive_range(path.control_elements[-1])
 
-        shader_ce = shaders.shader.vert_uniform_color
-        shader_ce.bind()
+            color = settings.color_active_path_control_element
+            color_active = settings.color_active_control_element
 
-        if path.batch_control_elements:
-            shader_ce.uniform_float("ModelMatrix", path.ob.matrix_world)
-            shader_ce.uniform_float("color", color)
-            shader_ce.uniform_float("color_active", color_active)
-            shader_ce.uniform_int("active_index", (active_index,))
+        shader_ce.uniform_float("ModelMatrix", path.ob.matrix_world)
+        shader_ce.uniform_float("color", color)
+        shader_ce.uniform_float("color_active", color_active)
+        shader_ce.uniform_int("active_index", (active_index,))
+        shader_ce.uniform_int("active_count", (active_count,))
 
-            path.batch_control_elements.draw(shader_ce)
+        batch.draw(shader_ce)
 
     bgl.glDisable(bgl.GL_BLEND)
-    # bgl.glDisable(bgl.GL_DEPTH_TEST)
     bgl.glPointSize(1.0)
     bgl.glLineWidth(1.0)
+
+    draw_layer.frame_time_seq.append(perf_counter() - time_start)
+
+
+def draw_callback_2d(self):
+    """Overlay with timings of modal session stages (p50 / p95 / max)"""
+    context = bpy.context
+    ui_scale = context.preferences.view.ui_scale
+    font_id = 0
+    blf.size(font_id, int(11 * ui_scale), 72)
+    blf.color(font_id, 1.0, 1.0, 1.0, 1.0)
+    line_height = int(14 * ui_scale)
+    x = int(20 * ui_scale)
+    y = int(20 * ui_scale)
+    for text in reversed(self.timer.format_stats()):
+        blf.position(font_id, x, y, 0)
+        blf.draw(font_id, text)
+        y += line_height
@@ -0,0 +1,449 @@
+from bisect import bisect_right
+from heapq import heappush, heappop
+
+import numpy as np
+
+
+def get_ranges_indices(offsets, indices):
+    """Return's concatenated ranges offsets[i]:offsets[i + 1] of all given indices"""
+    indices = np.asarray(indices, dtype=np.int32)
+    start = offsets[indices]
+    total = offsets[indices + 1] - start
+    return np.repeat(start - np.cumsum(total) + total, total) + np.arange(total.sum(), dtype=np.int32)
+
+
+class MeshArrays:
+    """
+    Mesh elements arrays of a single object, read once with foreach_get.
+    Structure:
+
+    vert_co[i]                                                  - vertex location in object space
+    edge_verts[i]                                               - vertex indices of edge i
+    face_verts[face_loop_offsets[i]:face_loop_offsets[i + 1]]   - vertex indices of face i
+    face_edges[face_loop_offsets[i]:face_loop_offsets[i + 1]]   - edge indices of face i
+    loop_tris[face_tri_offsets[i]:face_tri_offsets[i + 1]]      - triangles (vertex indices) of face i
+
+    Note:
+        Mesh topology and vertex locations should not be changed while arrays are in use.
+    """
+
+    __slots__ = (
+        "vert_co",
+        "edge_verts",
+        "face_loop_offsets",
+        "face_verts",
+        "face_edges",
+        "loop_tris",
+        "face_tri_offsets",
+    )
+
+    def __init__(self, vert_co, edge_verts, face_loop_offsets, face_verts, face_edges,
+                 loop_tris=None, loop_tri_faces=None):
+        self.vert_co = vert_co
+        self.edge_verts = edge_verts
+        self.face_loop_offsets = face_loop_offsets
+        self.face_verts = face_verts
+        self.face_edges = face_edges
+
+        # Loop triangles are used only to draw faces
+        self.loop_tris = None
+        self.face_tri_offsets = None
+        if loop_tris is not None:
+            order = np.argsort(loop_tri_faces, kind='stable')
+            self.loop_tris = loop_tris[order]
+            self.face_tri_offsets = np.zeros(len(face_loop_offsets), dtype=np.int32)
+            np.cumsum(
+                np.bincount(loop_tri_faces, minlength=len(face_loop_offsets) - 1), out=self.face_tri_offsets[1:])
+
+    @classmethod
+    def from_object(cls, ob, use_loop_triangles=False):
+        """Read mesh arrays of object in edit mode, loop triangles are read only if required"""
+        return cls(*cls.read_object(ob, use_loop_triangles))
+
+    @staticmethod
+    def read_object(ob, use_loop_triangles=False):
+        """
+        Return's tuple of arrays of object in edit mode, which are arguments of constructor. Blender data is
+        accessed only here, so it should be called from the main thread, while constructor can be called
+        from any other one.
+        """
+        ob.update_from_editmode()
+        mesh = ob.data
+
+        vert_co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vert_co)
+
+        edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edge_verts)
+
+        loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+        loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        mesh.polygons.foreach_get("loop_total", loop_total)
+
+        loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+        loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_verts)
+        mesh.loops.foreach_get("edge_index", loop_edges)
+
+        # Loops in polygons order
+        face_loop_offsets = np.zeros(len(loop_total) + 1, dtype=np.int32)
+        np.cumsum(loop_total, out=face_loop_offsets[1:])
+        loop_order = np.repeat(loop_start - face_loop_offsets[:-1], loop_total) + np.arange(
+            face_loop_offsets[-1], dtype=np.int32)
+
+        loop_tris = None
+        loop_tri_faces = None
+        if use_loop_triangles:
+            mesh.calc_loop_triangles()
+            loop_tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+            loop_tri_faces = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+            mesh.loop_triangles.foreach_get("vertices", loop_tris)
+            mesh.loop_triangles.foreach_get("polygon_index", loop_tri_faces)
+            loop_tris = loop_tris.reshape(-1, 3)
+
+        return (
+            vert_co.reshape(-1, 3),
+            edge_verts.reshape(-1, 2),
+            face_loop_offsets,
+            loop_verts[loop_order],
+            loop_edges[loop_order],
+            loop_tris,
+            loop_tri_faces
+        )
+
+    def get_face_verts(self, face_index):
+        return self.face_verts[self.face_loop_offsets[face_index]:self.face_loop_offsets[face_index + 1]]
+
+    def get_face_edges(self, face_index):
+        return self.face_edges[self.face_loop_offsets[face_index]:self.face_loop_offsets[face_index + 1]]
+
+    def get_faces_edges(self, face_indices):
+        """Return's edge indices of all given faces"""
+        return self.face_edges[get_ranges_indices(self.face_loop_offsets, face_indices)]
+
+    def get_faces_tris(self, face_indices):
+        """Return's triangles (vertex indices) of all given faces"""
+        return self.loop_tris[get_ranges_indices(self.face_tri_offsets, face_indices)]
+
+    def get_face_centers(self):
+        """Return's median of vertices of each face"""
+        loop_total = np.diff(self.face_loop_offsets)
+        loop_face = np.repeat(np.arange(len(loop_total), dtype=np.int32), loop_total)
+        face_center = np.zeros((len(loop_total), 3), dtype=np.float32)
+        np.add.at(face_center, loop_face, self.vert_co[self.face_verts])
+        face_center /= np.maximum(loop_total, 1)[:, np.newaxis]
+        return face_center
+
+    def get_edge_centers(self):
+        return self.vert_co[self.edge_verts].mean(axis=1)
+
+    def get_face_tri_count(self, face_index):
+        return int(self.face_tri_offsets[face_index + 1] - self.face_tri_offsets[face_index])
+
+
+def get_islands(offsets, targets):
+    """
+    Return's int32 array of island index of each node of graph given by adjacency arrays. Islands are numbered
+    in order of their first nodes. Labels are propagated by NumPy operations only (minimal label hooking and
+    pointer jumping), so search does not hold GIL and can run in background thread.
+    """
+    node_count = len(offsets) - 1
+    src = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(offsets))
+    targets = np.asarray(targets, dtype=np.int32)
+    labels = np.arange(node_count, dtype=np.int32)
+    while len(src):
+        # Root of each link source takes the minimal root of link targets
+        root_src = labels[src]
+        root_dst = labels[targets]
+        order = np.argsort(root_src, kind='stable')
+        root_src = root_src[order]
+        starts = np.flatnonzero(np.diff(root_src, prepend=-1))
+        roots = root_src[starts]
+        new_labels = labels.copy()
+        new_labels[roots] = np.minimum(labels[roots], np.minimum.reduceat(root_dst[order], starts))
+        # Pointer jumping until each node points to it's root
+        while True:
+            jumped = new_labels[new_labels]
+            if np.array_equal(jumped, new_labels):
+                break
+            new_labels = jumped
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    # Roots are the first nodes of islands, so sorted roots give islands order
+    return np.unique(labels, return_inverse=True)[1].astype(np.int32)
+
+
+def get_shortest_pathes_links(offsets, targets, costs, node_index_0, node_index_seq):
+    """
+    Return's list of adjacency indices (positions in targets) lists of shortest pathes from node_index_0 to each of
+    nodes of node_index_seq by single Dijkstra search over adjacency lists (Python lists). Search stops when all
+    nodes are reached, list is empty for the same node and for nodes which are not linked.
+    """
+    remaining = set(node_index_seq)
+    remaining.discard(node_index_0)
+    dist = {node_index_0: 0.0}
+    prev = {}
+    heap = [(0.0, node_index_0)]
+    while heap and remaining:
+        d, i = heappop(heap)
+        if d > dist[i]:
+            continue
+        remaining.discard(i)
+        if not remaining:
+            break
+        for k in range(offsets[i], offsets[i + 1]):
+            j = targets[k]
+            nd = d + costs[k]
+            if nd < dist.get(j, float("inf")):
+                dist[j] = nd
+                prev[j] = k
+                heappush(heap, (nd, j))
+
+    ret = []
+    for node_index_1 in node_index_seq:
+        links = []
+        if node_index_1 != node_index_0 and node_index_1 not in remaining:
+            # Node from which adjacency k starts is found by offsets
+            i = node_index_1
+            while i != node_index_0:
+                k = prev[i]
+                links.append(k)
+                i = bisect_right(offsets, k) - 1
+            links.reverse()
+        ret.append(links)
+    return ret
+
+
+def get_shortest_path_links(offsets, targets, costs, node_index_0, node_index_1):
+    """
+    Return's list of adjacency indices (positions in targets) of shortest path from node_index_0
+    to node_index_1 by Dijkstra search over adjacency lists (Python lists), empty list if nodes are not linked.
+    """
+    return get_shortest_pathes_links(offsets, targets, costs, node_index_0, (node_index_1,))[0]
+
+
+def get_shared_sources(pair_seq):
+    """
+    Return's list of (source node, [(pair index, target node, is reversed), ...]) of pairs of nodes, pairs are
+    grouped by nodes shared by the most of them, so all pairs of a group are routed by a single search from source.
+    """
+    # Node - indices of pairs with it
+    node_pairs = {}
+    for i, (node_0, node_1) in enumerate(pair_seq):
+        node_pairs.setdefault(node_0, []).append(i)
+        if node_1 != node_0:
+            node_pairs.setdefault(node_1, []).append(i)
+
+    is_grouped = [False] * len(pair_seq)
+    ret = []
+    for node in sorted(node_pairs.keys(), key=lambda n: len(node_pairs[n]), reverse=True):
+        items = []
+        for i in node_pairs[node]:
+            if not is_grouped[i]:
+                is_grouped[i] = True
+                node_0, node_1 = pair_seq[i]
+                items.append((i, node_1, False) if node_0 == node else (i, node_0, True))
+        if items:
+            ret.append((node, items))
+    return ret
+
+
+def route_pairs(route_func, pair_seq):
+    """
+    Return's list of results of route_func for each pair of nodes, route_func(source, targets) should return
+    list of element lists from source to each target. Pathes of reversed pairs are reversed.
+    """
+    ret = [None] * len(pair_seq)
+    for source, items in get_shared_sources(pair_seq):
+        for (i, _target, is_reversed), elem_seq in zip(items, route_func(source, [n[1] for n in items])):
+            ret[i] = elem_seq[::-1] if is_reversed else elem_seq
+    return ret
+
+
+class FaceGraph:
+    """
+    Face adjacency (dual) graph of a single mesh object, stored as NumPy arrays.
+    Structure:
+
+    face_faces[face_faces_offsets[i]:face_faces_offsets[i + 1]] - faces adjacent to face i across shared edges
+    face_faces_cost[...]                                        - cost of each step (center-edge-center distance)
+    face_island[i]                                              - index of linked faces island of face i
+
+    Face-vert and face-edge tables are in MeshArrays (graph.mesh) the graph is built from.
+    """
+
+    __slots__ = (
+        "mesh",
+        "face_center",
+        "face_faces_offsets",
+        "face_faces",
+        "face_faces_cost",
+        "_face_island",
+        "_adjacency",
+    )
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        vert_co = mesh.vert_co
+        face_loop_offsets = mesh.face_loop_offsets
+        face_edges = mesh.face_edges
+
+        face_count = len(face_loop_offsets) - 1
+        loop_total = np.diff(face_loop_offsets)
+        loop_face = np.repeat(np.arange(face_count, dtype=np.int32), loop_total)
+
+        self.face_center = mesh.get_face_centers()
+
+        # Pairs of faces which share an edge. Consecutive faces in edge-sorted loops order are linked,
+        # for non-manifold edges it gives a chain which keeps all faces connected
+        order = np.argsort(face_edges, kind='stable')
+        edge_sorted = face_edges[order]
+        face_sorted = loop_face[order]
+        shared = (edge_sorted[1:] == edge_sorted[:-1]) & (face_sorted[1:] != face_sorted[:-1])
+        face_a = face_sorted[:-1][shared]
+        face_b = face_sorted[1:][shared]
+        shared_edge = edge_sorted[1:][shared]
+
+        # Step cost is distance from face center to shared edge middle and to the other face center
+        edge_mid = vert_co[mesh.edge_verts[shared_edge]].mean(axis=1)
+        cost = (
+            np.linalg.norm(self.face_center[face_a] - edge_mid, axis=1) +
+            np.linalg.norm(self.face_center[face_b] - edge_mid, axis=1)
+        )
+
+        src = np.concatenate((face_a, face_b))
+        dst = np.concatenate((face_b, face_a))
+        cost = np.concatenate((cost, cost))
+
+        order = np.argsort(src, kind='stable')
+        self.face_faces = dst[order].astype(np.int32)
+        self.face_faces_cost = cost[order].astype(np.float32)
+        self.face_faces_offsets = np.zeros(face_count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=face_count), out=self.face_faces_offsets[1:])
+
+        self._face_island = None
+        self._adjacency = None
+
+    @property
+    def face_island(self):
+        """Linked faces island index for each face, evaluated on first access"""
+        if self._face_island is None:
+            self._face_island = get_islands(self.face_faces_offsets, self.face_faces)
+        return self._face_island
+
+    def _get_adjacency(self):
+        # Python lists are much faster than NumPy arrays for item access in search loops
+        if self._adjacency is None:
+            self._adjacency = (
+                self.face_faces_offsets.tolist(),
+                self.face_faces.tolist(),
+                self.face_faces_cost.tolist(),
+            )
+        return self._adjacency
+
+    def shortest_path(self, face_index_0, face_index_1):
+        """
+        Return's list of face indices between two given faces (both are excluded) along shortest path,
+        empty list if faces are adjacent or not linked.
+        """
+        if face_index_0 == face_index_1:
+            return []
+        return self.shortest_pathes(face_index_0, (face_index_1,))[0]
+
+    def shortest_pathes(self, face_index_0, face_index_seq):
+        """The same as shortest_path from one face to each of faces, by single search"""
+        offsets, faces, costs = self._get_adjacency()
+        # Faces where links end, except of the last one
+        return [
+            [faces[k] for k in links[:-1]]
+            for links in get_shortest_pathes_links(offsets, faces, costs, face_index_0, face_index_seq)
+        ]
+
+    def shortest_path_pairs(self, index_pair_seq):
+        """Return's list of shortest_path of each pair of face indices, pairs with shared faces share searches"""
+        return route_pairs(self.shortest_pathes, index_pair_seq)
+
+
+class VertGraph:
+    """
+    Vertex adjacency graph of a single mesh object, stored as NumPy arrays.
+    Structure:
+
+    vert_verts[vert_verts_offsets[i]:vert_verts_offsets[i + 1]] - vertices linked to vertex i by edges
+    vert_verts_edge[...]                                        - index of edge of each link
+    vert_verts_cost[...]                                        - edge length
+    vert_island[i]                                              - index of linked vertices island of vertex i
+    """
+
+    __slots__ = (
+        "mesh",
+        "vert_verts_offsets",
+        "vert_verts",
+        "vert_verts_edge",
+        "vert_verts_cost",
+        "_vert_island",
+        "_adjacency",
+    )
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        vert_co = mesh.vert_co
+        edge_verts = mesh.edge_verts
+        vert_count = len(vert_co)
+        edge_count = len(edge_verts)
+
+        edge_index = np.arange(edge_count, dtype=np.int32)
+        cost = np.linalg.norm(vert_co[edge_verts[:, 0]] - vert_co[edge_verts[:, 1]], axis=1)
+
+        src = np.concatenate((edge_verts[:, 0], edge_verts[:, 1]))
+        dst = np.concatenate((edge_verts[:, 1], edge_verts[:, 0]))
+        edge_index = np.concatenate((edge_index, edge_index))
+        cost = np.concatenate((cost, cost))
+
+        order = np.argsort(src, kind='stable')
+        self.vert_verts = dst[order].astype(np.int32)
+        self.vert_verts_edge = edge_index[order]
+        self.vert_verts_cost = cost[order].astype(np.float32)
+        self.vert_verts_offsets = np.zeros(vert_count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=vert_count), out=self.vert_verts_offsets[1:])
+
+        self._vert_island = None
+        self._adjacency = None
+
+    @property
+    def vert_island(self):
+        """Linked vertices island index for each vertex, evaluated on first access"""
+        if self._vert_island is None:
+            self._vert_island = get_islands(self.vert_verts_offsets, self.vert_verts)
+        return self._vert_island
+
+    def _get_adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = (
+                self.vert_verts_offsets.tolist(),
+                self.vert_verts.tolist(),
+                self.vert_verts_cost.tolist(),
+            )
+        return self._adjacency
+
+    def shortest_path_edges(self, vert_index_0, vert_index_1):
+        """
+        Return's list of edge indices along shortest path between two given vertices,
+        empty list if vertices are the same or not linked.
+        """
+        return self.shortest_pathes_edges(vert_index_0, (vert_index_1,))[0]
+
+    def shortest_pathes_edges(self, vert_index_0, vert_index_seq):
+        """The same as shortest_path_edges from one vertex to each of vertices, by single search"""
+        offsets, verts, costs = self._get_adjacency()
+        vert_verts_edge = self.vert_verts_edge
+        return [
+            vert_verts_edge[links].tolist()
+            for links in get_shortest_pathes_links(offsets, verts, costs, vert_index_0, vert_index_seq)
+        ]
+
+    def shortest_path_edges_pairs(self, index_pair_seq):
+        """Return's list of shortest_path_edges of each pair of vertex indices, shared vertices share searches"""
+        return route_pairs(self.shortest_pathes_edges, index_pair_seq)
@@ -20,6 +20,13 @@ NAVIGATION_IDNAMES = (
     # TODO: Add all navigation operators here
 )
 
+# Cached modal events table {evkey: modal action} and signature of keyconfigs it was compiled from
+_modal_evkeys = None
+_modal_evkeys_signature = None
+
+# Owner of message bus subscription to keymap items changes
+_msgbus_owner = object()
+
 
 def get_evkey(item):
     """Formatted item (event or keymap item) attributes"""
@@ -85,3 +92,87 @@ def get_navigation_evkeys(kc: bpy.types.KeyConfigurations):
             navigation_evkeys.append(tuple(evkey))
 
     return navigation_evkeys
+
+
+def get_keyconfigs_signature(wm: bpy.types.WindowManager):
+    """
+    Cheap signature of keyconfigs state used by modal operator, changes if user keyconfig changed, keymap items
+    were added or removed, keymaps were modified by user or select mouse button changed. Changes of keymap items
+    properties are handled by message bus subscription (subscribe_keymap_changes).
+    """
+    kc = wm.keyconfigs.user
+    signature = [kc.as_pointer(), get_mouse_buttons(wm)]
+    for km_name in ("Standard Modal Map", "Screen", "3D View"):
+        km = kc.keymaps[km_name]
+        signature.append((km.as_pointer(), km.is_user_modified, len(km.keymap_items)))
+    return tuple(signature)
+
+
+def tag_modal_evkeys_update():
+    """Message bus callback, modal events table would be compiled again on next request"""
+    global _modal_evkeys
+    _modal_evkeys = None
+
+
+def subscribe_keymap_changes():
+    """Subscribe to changes of properties of all keymap items, such as type, modifiers or active state"""
+    bpy.msgbus.subscribe_rna(
+        key=bpy.types.KeyMapItem,
+        owner=_msgbus_owner,
+        args=(),
+        notify=tag_modal_evkeys_update,
+        options={'PERSISTENT'},
+    )
+
+
+def unsubscribe_keymap_changes():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    tag_modal_evkeys_update()
+
+
+def compile_modal_evkeys(wm: bpy.types.WindowManager):
+    """
+    Dict {evkey: modal action} of all events which are handled by modal operator.
+    Events are written from the lowest priority to the highest one, so actions with higher priority override
+    others with the same evkey.
+    """
+    kc = wm.keyconfigs.user
+    select_mb, context_mb = get_mouse_buttons(wm)
+
+    modal_evkeys = {
+        (select_mb, 'RELEASE', False, False, False): 'RELEASE',
+        (select_mb, 'RELEASE', False, True, False): 'RELEASE',
+        (select_mb, 'RELEASE', False, False, True): 'RELEASE',
+        (select_mb, 'PRESS', False, True, False): 'REMOVE',
+        (select_mb, 'PRESS', False, False, True): 'ADD_NEW_PATH',
+        (select_mb, 'PRESS', False, False, False): 'ADD',
+        (context_mb, 'PRESS', False, False, False): 'CONTEXT_MENU',
+    }
+
+    undo_redo_evkeys = get_undo_redo_evkeys(kc)
+    for action in ('REDO', 'UNDO'):
+        for evkey, value in undo_redo_evkeys.items():
+            if value == action:
+                modal_evkeys[evkey] = action
+
+    modal_action_evkeys = get_modal_action_evkeys(kc)
+    for action in ('APPLY', 'CANCEL'):
+        for evkey, value in modal_action_evkeys.items():
+            if value == action:
+                modal_evkeys[evkey] = action
+
+    for evkey in get_navigation_evkeys(kc):
+        modal_evkeys[evkey] = 'NAVIGATION'
+
+    return modal_evkeys
+
+
+def get_modal_evkeys(wm: bpy.types.WindowManager):
+    """Cached modal events table, compiled again only after keyconfigs change"""
+    global _modal_evkeys, _modal_evkeys_signature
+
+    signature = get_keyconfigs_signature(wm)
+    if _modal_evkeys is None or signature != _modal_evkeys_signature:
+        _modal_evkeys = compile_modal_evkeys(wm)
+        _modal_evkeys_signature = signature
+    return _modal_evkeys
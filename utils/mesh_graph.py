@@ -0,0 +1,242 @@
+"""
+Mesh graph interface used by path core (utils.core) for islands and routing between control elements,
+with adapters for edit mode bmesh (production) and for mesh arrays (works without Blender).
+"""
+
+if "bpy" in locals():
+    import importlib
+
+    if "graph" in locals():
+        importlib.reload(graph)
+
+try:
+    import bpy
+    import bmesh
+except ImportError:  # Outside of Blender only array based mesh graphs are available
+    bpy = None
+    bmesh = None
+
+from . import graph
+
+
+class ArrayElement:
+    """Mesh element of ArrayMeshGraph, elements are equal if they have the same type, graph and index"""
+
+    __slots__ = ("mesh_graph", "index")
+
+    def __init__(self, mesh_graph, index):
+        self.mesh_graph = mesh_graph
+        self.index = index
+
+    def __eq__(self, other):
+        return (
+            other.__class__ is self.__class__ and other.index == self.index and other.mesh_graph is self.mesh_graph
+        )
+
+    def __hash__(self):
+        return hash((self.__class__, self.index))
+
+    def __repr__(self):
+        return "%s(%d)" % (self.__class__.__name__, self.index)
+
+
+class ArrayVert(ArrayElement):
+    __slots__ = ()
+
+    @property
+    def link_edges(self):
+        return [self.mesh_graph.get_edge(i) for i in self.mesh_graph.get_vert_edges(self.index)]
+
+
+class ArrayEdge(ArrayElement):
+    __slots__ = ()
+
+    @property
+    def verts(self):
+        vert_index_0, vert_index_1 = self.mesh_graph.mesh.edge_verts[self.index].tolist()
+        return self.mesh_graph.get_vert(vert_index_0), self.mesh_graph.get_vert(vert_index_1)
+
+    def other_vert(self, vert):
+        vert_0, vert_1 = self.verts
+        if vert == vert_0:
+            return vert_1
+        elif vert == vert_1:
+            return vert_0
+
+
+class ArrayFace(ArrayElement):
+    __slots__ = ()
+
+
+class ArrayElementSeq:
+    """Sequence of elements of given type of ArrayMeshGraph, elements are created on access"""
+
+    __slots__ = ("mesh_graph", "elem_type")
+
+    def __init__(self, mesh_graph, elem_type):
+        self.mesh_graph = mesh_graph
+        self.elem_type = elem_type
+
+    def __getitem__(self, index):
+        return self.elem_type(self.mesh_graph, index)
+
+
+VERT_TYPES = (ArrayVert,)
+FACE_TYPES = (ArrayFace,)
+if bmesh is not None:
+    VERT_TYPES += (bmesh.types.BMVert,)
+    FACE_TYPES += (bmesh.types.BMFace,)
+
+
+def is_vert(elem):
+    return isinstance(elem, VERT_TYPES)
+
+
+def is_face(elem):
+    return isinstance(elem, FACE_TYPES)
+
+
+class MeshGraph:
+    """
+    Interface of mesh graph of a single object. Control elements are vertices (edges mode) or faces,
+    fill elements are edges or faces.
+    """
+
+    def get_island_index(self, context, elem):
+        """Return's hashable index of linked elements island of element, unique for all objects"""
+        raise NotImplementedError
+
+    def get_fill_elements(self, context, elem_0, elem_1):
+        """Return's list of fill elements along shortest path between control elements"""
+        raise NotImplementedError
+
+    def get_fill_elements_seq(self, context, pair_seq):
+        """
+        Return's list of fill elements lists for each pair of control elements. Graphs which can search
+        from one element to many at once share searches of pairs with the same elements.
+        """
+        return [self.get_fill_elements(context, elem_0, elem_1) for elem_0, elem_1 in pair_seq]
+
+    def get_element_seqs(self):
+        """Return's tuple (control elements sequence, fill elements sequence), indexed by element index"""
+        raise NotImplementedError
+
+
+class ArrayMeshGraph(MeshGraph):
+    """Mesh graph over mesh arrays (utils.graph.MeshArrays), elements are ArrayVert, ArrayEdge and ArrayFace"""
+
+    __slots__ = (
+        "mesh",
+        "is_faces",
+        "_graph",
+        "_vert_edges",
+    )
+
+    def __init__(self, mesh, is_faces):
+        self.mesh = mesh
+        self.is_faces = is_faces
+        self._graph = None
+        self._vert_edges = None
+
+    def get_graph(self):
+        """Adjacency graph of control elements, built on first request"""
+        if self._graph is None:
+            if self.is_faces:
+                self._graph = graph.FaceGraph(self.mesh)
+            else:
+                self._graph = graph.VertGraph(self.mesh)
+        return self._graph
+
+    def get_vert(self, index):
+        return ArrayVert(self, index)
+
+    def get_edge(self, index):
+        return ArrayEdge(self, index)
+
+    def get_face(self, index):
+        return ArrayFace(self, index)
+
+    def get_control_element(self, index):
+        return ArrayFace(self, index) if self.is_faces else ArrayVert(self, index)
+
+    def get_vert_edges(self, index):
+        if self._vert_edges is None:
+            vert_graph = self.get_graph() if not self.is_faces else graph.VertGraph(self.mesh)
+            self._vert_edges = vert_graph.vert_verts_offsets, vert_graph.vert_verts_edge
+        offsets, vert_edges = self._vert_edges
+        return vert_edges[offsets[index]:offsets[index + 1]].tolist()
+
+    def get_island_index(self, context, elem):
+        face_graph = self.get_graph()
+        island = face_graph.face_island if self.is_faces else face_graph.vert_island
+        return id(self), int(island[elem.index])
+
+    def get_fill_indices(self, index_0, index_1):
+        """Return's list of fill element indices along shortest path between control elements given by indices"""
+        if self.is_faces:
+            return self.get_graph().shortest_path(index_0, index_1)
+        return self.get_graph().shortest_path_edges(index_0, index_1)
+
+    def get_fill_indices_seq(self, index_pair_seq):
+        """Return's list of get_fill_indices for each pair of control element indices, with shared searches"""
+        if self.is_faces:
+            return self.get_graph().shortest_path_pairs(index_pair_seq)
+        return self.get_graph().shortest_path_edges_pairs(index_pair_seq)
+
+    def get_element_seqs(self):
+        if self.is_faces:
+            return ArrayElementSeq(self, ArrayFace), ArrayElementSeq(self, ArrayFace)
+        return ArrayElementSeq(self, ArrayVert), ArrayElementSeq(self, ArrayEdge)
+
+    def get_fill_elements(self, context, elem_0, elem_1):
+        elem_type = ArrayFace if self.is_faces else ArrayEdge
+        return [elem_type(self, i) for i in self.get_fill_indices(elem_0.index, elem_1.index)]
+
+    def get_fill_elements_seq(self, context, pair_seq):
+        elem_type = ArrayFace if self.is_faces else ArrayEdge
+        return [
+            [elem_type(self, i) for i in fill_indices]
+            for fill_indices in self.get_fill_indices_seq([(n[0].index, n[1].index) for n in pair_seq])
+        ]
+
+
+class BMeshGraph(MeshGraph):
+    """
+    Mesh graph of object in edit mode. Islands and routing use adjacency graph built from mesh arrays, face
+    adjacency graph (utils.graph.FaceGraph) in faces mode and vertex graph (utils.graph.VertGraph) in edges mode.
+    """
+
+    __slots__ = (
+        "ob",
+        "bm",
+        "elem_graph",
+        "is_faces",
+    )
+
+    def __init__(self, ob, bm, elem_graph):
+        self.ob = ob
+        self.bm = bm
+        self.elem_graph = elem_graph
+        self.is_faces = isinstance(elem_graph, graph.FaceGraph)
+
+    def get_island_index(self, context, elem):
+        island = self.elem_graph.face_island if self.is_faces else self.elem_graph.vert_island
+        return self.ob.as_pointer(), int(island[elem.index])
+
+    def get_element_seqs(self):
+        if self.is_faces:
+            return self.bm.faces, self.bm.faces
+        return self.bm.verts, self.bm.edges
+
+    def get_fill_elements(self, context, elem_0, elem_1):
+        return self.get_fill_elements_seq(context, ((elem_0, elem_1),))[0]
+
+    def get_fill_elements_seq(self, context, pair_seq):
+        index_pair_seq = [(n[0].index, n[1].index) for n in pair_seq]
+        if self.is_faces:
+            elem_seq = self.bm.faces
+            fill_indices_seq = self.elem_graph.shortest_path_pairs(index_pair_seq)
+        else:
+            elem_seq = self.bm.edges
+            fill_indices_seq = self.elem_graph.shortest_path_edges_pairs(index_pair_seq)
+        return [[elem_seq[i] for i in fill_indices] for fill_indices in fill_indices_seq]
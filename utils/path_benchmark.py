@@ -0,0 +1,166 @@
+"""
+Micro-benchmark of Path operations with stand-in control elements, works without Blender.
+Timings are normalized by calibration loop time, so baseline can be compared on other machines.
+Run from addon directory:
+
+python -m utils.path_benchmark                      - compare with baseline, exit code 1 on regression
+python -m utils.path_benchmark --update-baseline    - write new baseline
+
+Besides of baseline comparison, operations which should not depend on path size (all of them are O(log n)
+or O(1)) are checked for growth of time from the smallest to the largest size.
+"""
+
+if "unified_path" in locals():
+    import importlib
+
+    importlib.reload(unified_path)
+
+import os
+import sys
+import json
+import argparse
+from time import perf_counter
+
+from . import unified_path
+
+SIZES = (10, 100, 1000, 10000, 100000)
+
+BASELINE_FILEPATH = os.path.join(os.path.dirname(__file__), "path_benchmark_baseline.json")
+
+# Allowed ratio of normalized time to baseline
+THRESHOLD = 2.0
+# Allowed ratio of time at the largest size to time at the smallest size. Tree depth of the largest path
+# is about 5 times of the smallest one, linear operations would grow 10000 times
+GROWTH_LIMIT = 20.0
+
+REPEAT = 200
+
+
+class StandInElement:
+    """Control element without mesh, only index is used"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+
+def gen_path(elem_seq):
+    path = unified_path.Path()
+    path.control_elements = elem_seq
+    path.fill_elements = [[] for _ in range(len(elem_seq))]
+    return path
+
+
+def gen_join_pathes(size, case):
+    """Two pathes of given size which have common endpoint for join case (self endpoint, other endpoint)"""
+    elem_seq = [StandInElement(i) for i in range(size * 2)]
+    elem_seq_0 = elem_seq[:size]
+    elem_seq_1 = elem_seq[size:]
+    i, j = case
+    elem_seq_1[j] = elem_seq_0[i]
+    return gen_path(elem_seq_0), gen_path(elem_seq_1)
+
+
+def measure(func, setup, repeat=REPEAT):
+    """
+    Minimal time of func(setup()) in seconds, setup time is not measured. Minimum is the least affected
+    by other processes and garbage collection, so it is more stable than mean or median.
+    """
+    time_seq = []
+    for _ in range(repeat):
+        args = setup()
+        time_start = perf_counter()
+        func(*args)
+        time_seq.append(perf_counter() - time_start)
+    return min(time_seq)
+
+
+def calibrate():
+    """Time of fixed pure Python workload, used as time unit"""
+    def workload():
+        value = 0
+        for i in range(1000):
+            value += i * i
+        return value
+    return measure(workload, tuple, repeat=REPEAT)
+
+
+def get_operations(size):
+    """Dict {operation name: (func, setup)}"""
+    elem_seq = [StandInElement(i) for i in range(size)]
+    path = gen_path(elem_seq)
+    middle = size // 2
+    new_elem = StandInElement(size)
+
+    operations = {
+        "insert_middle": (lambda p: p.insert_control_element(middle, new_elem), lambda: (path.copy(),)),
+        "insert_end": (lambda p: p.insert_control_element(size, new_elem), lambda: (path.copy(),)),
+        "pop_middle": (lambda p: p.pop_control_element(middle), lambda: (path.copy(),)),
+        "pop_end": (lambda p: p.pop_control_element(-1), lambda: (path.copy(),)),
+        "reverse": (lambda p: p.reverse(), lambda: (path.copy(),)),
+        "get_pairs_items": (lambda p: p.get_pairs_items(middle), lambda: (path,)),
+        "copy": (lambda p: p.copy(), lambda: (path,)),
+    }
+    for name, case in (("add_end_first", (-1, 0)), ("add_first_end", (0, -1)),
+                       ("add_first_first", (0, 0)), ("add_end_end", (-1, -1))):
+        path_0, path_1 = gen_join_pathes(size, case)
+        operations[name] = (lambda p0, p1: p0 + p1, lambda path_0=path_0, path_1=path_1: (path_0.copy(), path_1))
+    return operations
+
+
+def run(sizes=SIZES):
+    """Return's dict {operation name: {size: normalized time}}"""
+    result = {}
+    for size in sizes:
+        for name, (func, setup) in get_operations(size).items():
+            # Calibration next to each measurement compensates changes of CPU frequency and load
+            result.setdefault(name, {})[str(size)] = measure(func, setup) / calibrate()
+    return result
+
+
+def check(result, baseline, threshold=THRESHOLD, growth_limit=GROWTH_LIMIT):
+    """Return's list of regression messages"""
+    message_seq = []
+    for name, size_values in result.items():
+        for size, value in size_values.items():
+            base_value = baseline.get(name, {}).get(size, None)
+            if base_value is not None and value > base_value * threshold:
+                message_seq.append("%s at %s: %.2f, baseline %.2f" % (name, size, value, base_value))
+
+        values = [size_values[n] for n in sorted(size_values.keys(), key=int)]
+        if len(values) > 1 and values[-1] > values[0] * growth_limit:
+            message_seq.append("%s grows %.1f times with path size" % (name, values[-1] / values[0]))
+    return message_seq
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Path operations micro-benchmark")
+    parser.add_argument("--update-baseline", action='store_true', help="Write results as new baseline")
+    parser.add_argument("--baseline", default=BASELINE_FILEPATH, help="Baseline file path")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed ratio to baseline")
+    parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], default=SIZES)
+    args = parser.parse_args(argv)
+
+    result = run(args.sizes)
+    for name, size_values in result.items():
+        print("%-18s %s" % (name, "  ".join("%s: %.2f" % item for item in size_values.items())))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(result, file, indent=2)
+        print("Baseline written to %s" % args.baseline)
+        return 0
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+    message_seq = check(result, baseline, args.threshold)
+    for message in message_seq:
+        print("Regression: %s" % message)
+    return 1 if message_seq else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Memory use and timings of Path (ropes of element lists) against ArrayPath (int32 element indices) with stand-in
+elements, works without Blender. Run from addon directory:
+
+python -m utils.path_memory                                 - 100k and 1M fill elements
+python -m utils.path_memory --sizes 100000 --segment 10     - fill elements count, elements in each fill
+
+Fill elements are created on routing the same way as bmesh creates element wrappers on access, so memory of Path
+includes wrappers it keeps alive. History is memory of undo steps, after each step one fill is changed as on drag.
+"""
+
+if "unified_path" in locals():
+    import importlib
+
+    importlib.reload(unified_path)
+
+import gc
+import sys
+import argparse
+import tracemalloc
+from time import perf_counter
+
+from . import unified_path
+
+SIZES = (100000, 1000000)
+# Fill elements in each fill
+SEGMENT = 100
+# Undo steps of history
+UNDO_STEPS = 32
+
+
+class StandInElement:
+    """Mesh element without mesh, only index is used"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __eq__(self, other):
+        return other.__class__ is self.__class__ and other.index == self.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+
+class StandInElementSeq:
+    """Element sequence which creates new element on each access, as bmesh element sequences"""
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        return StandInElement(index)
+
+
+def gen_path(path_type, size, segment):
+    control_count = size // segment
+    if path_type is unified_path.Path:
+        path = unified_path.Path()
+    else:
+        path = unified_path.ArrayPath(None, 0, None, StandInElementSeq(), StandInElementSeq())
+    path.control_elements = [StandInElement(i * segment) for i in range(control_count)]
+    # Close fill of open path is empty
+    path.fill_elements = [
+        [StandInElement(j) for j in range(i * segment, (i + 1) * segment)] for i in range(control_count - 1)
+    ] + [[]]
+    return path
+
+
+def gen_history(path, segment):
+    history = [path.copy()]
+    for i in range(UNDO_STEPS - 1):
+        path = path.copy()
+        path.fill_elements[i] = [StandInElement(j) for j in range(segment)]
+        history.append(path)
+    return history
+
+
+def measure_memory(func, *args):
+    """Return's tuple (memory in bytes allocated by func and kept by its result, result)"""
+    gc.collect()
+    tracemalloc.start()
+    memory_start = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - memory_start
+    tracemalloc.stop()
+    return memory, result
+
+
+def measure_time(func, setup, repeat=5):
+    """Minimal time of func(setup()) in seconds, setup time is not measured"""
+    time_seq = []
+    for _ in range(repeat):
+        args = setup()
+        time_start = perf_counter()
+        func(*args)
+        time_seq.append(perf_counter() - time_start)
+    return min(time_seq)
+
+
+def run(path_type, size, segment):
+    """Return's dict {measure name: value}, memory in megabytes and time in milliseconds"""
+    memory, path = measure_memory(gen_path, path_type, size, segment)
+    history_memory, _history = measure_memory(gen_history, path, segment)
+    other = gen_path(path_type, size, segment)
+    # Other path starts at the end of path
+    other.control_elements[0] = path.control_elements[-1]
+
+    return {
+        "path": memory / 2 ** 20,
+        "history": history_memory / 2 ** 20,
+        "copy": measure_time(lambda p: p.copy(), lambda: (path,)) * 1000,
+        "reverse": measure_time(lambda p: p.reverse(), lambda: (path.copy(),)) * 1000,
+        "join": measure_time(lambda p0, p1: p0 + p1, lambda: (path.copy(), other)) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Path memory benchmark")
+    parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], default=SIZES)
+    parser.add_argument("--segment", type=int, default=SEGMENT, help="Fill elements in each fill")
+    args = parser.parse_args(argv)
+
+    print("%-10s %-10s %10s %12s %10s %12s %10s" % (
+        "size", "type", "path, MB", "history, MB", "copy, ms", "reverse, ms", "join, ms"))
+    for size in args.sizes:
+        for path_type in (unified_path.Path, unified_path.ArrayPath):
+            result = run(path_type, size, args.segment)
+            print("%-10d %-10s %10.2f %12.2f %10.3f %12.3f %10.3f" % (
+                size, path_type.__name__, result["path"], result["history"], result["copy"], result["reverse"],
+                result["join"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,8 @@ from bpy.props import BoolProperty, EnumProperty
 
 
 def _prop_update(self, context):
-    if self.apply_tool_settings:
+    # Operators which have no such option (batch markup) are skipped
+    if getattr(self, "apply_tool_settings", False):
         tool = context.workspace.tools.from_space_view3d_mode("EDIT_MESH", create=False)
         if not tool:
             return
@@ -25,6 +26,8 @@ context_action = EnumProperty(
         ('TCLPATH', "Toggle Close Path", "Close the path from the first to the last control point", '', 2),
         ('CHDIR', "Change direction", "Changes the direction of the path", '', 4),
         ('APPLY', "Apply All", "Apply all paths and make changes to the mesh", '', 8),
+        ('SAVE', "Save Paths", "Save paths of each object to session file", '', 16),
+        ('LOAD', "Load Paths", "Load saved paths of objects from session files", '', 32),
     ],
     options={'ENUM_FLAG'},
     default=set(),
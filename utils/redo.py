@@ -1,7 +1,22 @@
+from . import timing
+
+
 def get_current_state_copy(self):
     return [self._active_path_index, [n.copy() for n in self.path_seq]]
 
 
+@timing.timed("UNDO")
+def restore_state(self, context, step):
+    """Restore copy of history step, so further changes of pathes would not affect the history"""
+    active_path_index, path_seq = step
+    self._active_path_index = active_path_index
+    self.path_seq = [n.copy() for n in path_seq]
+    # Control elements buffers are changed in place, so copies share them with history steps
+    for path in self.path_seq:
+        self.rebuild_batch_control_elements(context, path)
+    self.tag_views_update()
+
+
 def undo(self, context):
     if len(self.undo_history) == 1:
         self.cancel(context)
@@ -10,10 +25,11 @@ def undo(self, context):
     elif len(self.undo_history) > 1:
         step = self.undo_history.pop()
         self.redo_history.append(step)
-        self._active_path_index, self.path_seq = self.undo_history[-1]
+        restore_state(self, context, self.undo_history[-1])
         self._just_closed_path = False
 
-    context.area.tag_redraw()
+    if getattr(context, "area", None):  # No area in background mode and outside of Blender
+        context.area.tag_redraw()
 
     return {'RUNNING_MODAL'}
 
@@ -22,12 +38,14 @@ def redo(self, context):
     if len(self.redo_history) > 0:
         step = self.redo_history.pop()
         self.undo_history.append(step)
-        self._active_path_index, self.path_seq = self.undo_history[-1]
-        context.area.tag_redraw()
+        restore_state(self, context, self.undo_history[-1])
+        if getattr(context, "area", None):
+            context.area.tag_redraw()
     else:
         self.report({'WARNING'}, message="Can not redo anymore")
 
 
+@timing.timed("UNDO")
 def register_undo_step(self):
     step = get_current_state_copy(self)
     self.undo_history.append(step)
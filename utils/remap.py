@@ -0,0 +1,72 @@
+"""
+Mapping of mesh elements of saved pathes (utils.session_io) to elements of changed mesh by positions.
+Elements are mapped to the nearest ones, element is "moved" if the nearest one is farther than tolerance.
+Inside Blender search uses mathutils.kdtree, outside of it NumPy brute force search is used.
+"""
+
+try:
+    from mathutils.kdtree import KDTree
+except ImportError:  # Outside of Blender
+    KDTree = None
+
+import numpy as np
+
+# Distance relative to mesh bounding box diagonal at which elements are considered to be at the same position
+TOLERANCE = 1e-5
+
+# Query points count of each brute force search step, limits size of distances matrix
+_CHUNK_SIZE = 64
+
+
+def get_tolerance(mesh):
+    """Return's absolute tolerance for mesh arrays (utils.graph.MeshArrays)"""
+    if not len(mesh.vert_co):
+        return TOLERANCE
+    diagonal = float(np.linalg.norm(mesh.vert_co.max(axis=0) - mesh.vert_co.min(axis=0)))
+    return max(diagonal, 1.0) * TOLERANCE
+
+
+def find_nearest(co, query_co):
+    """Return's tuple (indices of nearest points of co, distances to them) for each of query points"""
+    count = len(query_co)
+    indices = np.zeros(count, dtype=np.int32)
+    distances = np.full(count, np.inf, dtype=np.float64)
+    if not (len(co) and count):
+        return indices, distances
+
+    if KDTree is not None:
+        tree = KDTree(len(co))
+        for i, value in enumerate(co.tolist()):
+            tree.insert(value, i)
+        tree.balance()
+        for i, value in enumerate(query_co.tolist()):
+            _co, indices[i], distances[i] = tree.find(value)
+        return indices, distances
+
+    co = np.asarray(co, dtype=np.float64)
+    co_sq = np.einsum('ij,ij->i', co, co)
+    for start in range(0, count, _CHUNK_SIZE):
+        chunk = np.asarray(query_co[start:start + _CHUNK_SIZE], dtype=np.float64)
+        # Squared distances |a - b|^2 = |a|^2 - 2ab + |b|^2
+        dist_sq = co_sq[np.newaxis, :] - 2.0 * (chunk @ co.T) + np.einsum('ij,ij->i', chunk, chunk)[:, np.newaxis]
+        nearest = np.argmin(dist_sq, axis=1)
+        indices[start:start + len(chunk)] = nearest
+        distances[start:start + len(chunk)] = np.sqrt(np.maximum(dist_sq[np.arange(len(chunk)), nearest], 0.0))
+    return indices, distances
+
+
+def remap_elements(saved_co, co, tolerance):
+    """
+    Return's tuple (indices of nearest elements, moved flags) for saved element positions. co are positions
+    of elements of changed mesh (vertices, edge or face centers).
+    """
+    indices, distances = find_nearest(co, saved_co)
+    return indices, distances > tolerance
+
+
+def get_changed_ranges(offsets, moved):
+    """Return's flag for each range offsets[k]:offsets[k + 1] if it has any moved element"""
+    moved_count = np.zeros(len(moved) + 1, dtype=np.int32)
+    np.cumsum(moved, out=moved_count[1:])
+    offsets = np.asarray(offsets, dtype=np.int32)
+    return moved_count[offsets[1:]] > moved_count[offsets[:-1]]
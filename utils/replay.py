@@ -0,0 +1,295 @@
+"""
+Record and replay of tool sessions. Recording is written by operator if "Record Sessions" preference is enabled,
+it can be replayed without UI against the same .blend file:
+
+blender --background scene.blend --python-expr "from <addon>.utils import replay; replay.main()" -- session.json
+
+Report with per-event timings, stages timings and final state of pathes is printed or written to the file
+given as the second argument after "--".
+"""
+
+if "bpy" in locals():
+    import importlib
+
+    if "timing" in locals():
+        importlib.reload(timing)
+    if "spatial" in locals():
+        importlib.reload(spatial)
+    if "draw" in locals():
+        importlib.reload(draw)
+    if "redo" in locals():
+        importlib.reload(redo)
+    if "base" in locals():
+        importlib.reload(base)
+
+import os
+import sys
+import json
+from collections import deque
+from time import perf_counter, strftime
+
+import bpy
+
+from . import timing
+from . import spatial
+from . import draw
+from . import redo
+from . import base
+
+RECORDING_VERSION = 1
+
+# Session events which are not interactions with control elements
+SESSION_EVENTS = ('UNDO', 'REDO', 'APPLY', 'CANCEL', 'SAVE', 'LOAD')
+
+# Operator properties used on apply - default value, stored in recording as "mark"
+MARK_OPTIONS = {
+    "mark_select": 'EXTEND',
+    "mark_seam": 'NONE',
+    "mark_sharp": 'NONE',
+}
+
+
+class SessionRecorder:
+    """
+    Interaction stream of modal session.
+    Structure of each event:
+
+    (time in milliseconds from session start, event kind, object index, element index, modifiers)
+
+    Event kind is name of InteractEvent or one of SESSION_EVENTS, object index is index in ob_names,
+    element index is index of vertex (edges mode) or face (faces mode), both are -1 if nothing was picked.
+    Modifiers are bit flags of pressed alt (1), ctrl (2) and shift (4) keys.
+    SAVE and LOAD events use session directory and fills option, which are stored in recording as "session".
+    If pathes stored in meshes were restored at session start, recording has "use_mesh_storage" flag.
+    """
+
+    __slots__ = (
+        "time_start",
+        "select_mode",
+        "ob_names",
+        "event_seq",
+        "session_options",
+        "use_mesh_storage",
+    )
+
+    def __init__(self, context, session_directory="", use_session_fills=True, use_mesh_storage=False):
+        self.time_start = perf_counter()
+        self.select_mode = 'FACE' if context.scene.tool_settings.mesh_select_mode[2] else 'EDGE'
+        self.ob_names = [ob.name for ob in context.objects_in_mode]
+        self.event_seq = []
+        self.session_options = {"directory": session_directory, "use_fills": use_session_fills}
+        self.use_mesh_storage = use_mesh_storage
+
+    def add(self, kind, ob=None, elem=None, event=None):
+        ob_index = -1
+        elem_index = -1
+        if (ob is not None) and (elem is not None):
+            ob_index = self.ob_names.index(ob.name)
+            elem_index = elem.index
+        modifiers = 0
+        if event is not None:
+            modifiers = int(event.alt) | (int(event.ctrl) << 1) | (int(event.shift) << 2)
+        time = round((perf_counter() - self.time_start) * 1000.0, 3)
+        self.event_seq.append((time, kind, ob_index, elem_index, modifiers))
+
+    def save(self, directory, name, mark_options=None):
+        """
+        Write recording to directory, file is named by current time and given name. Mark options are dict of
+        operator properties (mark_select, mark_seam, mark_sharp) used on apply. Return's file path.
+        """
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, "%s_%s.json" % (strftime("%Y%m%d_%H%M%S"), name))
+        data = {
+            "version": RECORDING_VERSION,
+            "filepath": bpy.data.filepath,
+            "select_mode": self.select_mode,
+            "objects": self.ob_names,
+            "events": self.event_seq,
+            "session": self.session_options,
+            "use_mesh_storage": self.use_mesh_storage,
+        }
+        if mark_options is not None:
+            data["mark"] = mark_options
+        with open(filepath, 'w') as file:
+            json.dump(data, file, separators=(',', ':'))
+        return filepath
+
+
+class ReplaySession(base.PathUtils):
+    """State of modal operator without UI, recorded events are applied directly to control elements"""
+
+    def __init__(self, context, mark_options=None, session_options=None):
+        # Operator properties used on apply, defaults are the same as operator's ones
+        self.mark_options = dict(MARK_OPTIONS)
+        self.mark_options.update(mark_options or {})
+        # Session directory and fills option of SAVE and LOAD events, None if they were not recorded
+        self.session_options = session_options
+        self.bm_seq = []
+        self.mesh_seq = {}
+        self.graph_seq = {}
+        self.warmup_seq = {}
+        self.warmup_queue = []
+        self.warmup_executor = None
+        self.warmup_total = 0
+        self.control_index = spatial.ControlElementsIndex()
+        self.draw_layer = draw.DrawLayer()
+        self.timer = timing.StageTimer(is_enabled=True)
+        self.use_compact_pathes = context.preferences.addons[base.addon_pkg].preferences.use_compact_pathes
+        self.gen_bmeshes(context)
+
+        mesh_elements = "faces" if context.scene.tool_settings.mesh_select_mode[2] else "edges"
+        self.initial_select = self.get_selected_elements(mesh_elements)
+
+        self.path_seq = []
+        self.drag_elem_indices = []
+        self._active_path_index = None
+        self._drag_elem = None
+        self._just_closed_path = False
+
+        undo_steps = context.preferences.edit.undo_steps
+        self.undo_history = deque(maxlen=undo_steps)
+        self.redo_history = deque(maxlen=undo_steps)
+
+        self.select_only_seq = {}
+        self.markup_seq = {}
+        self.message_seq = []
+
+    def report(self, type, message):
+        self.message_seq.append(message)
+
+    def cancel(self, context):
+        self.set_selection_state(self.initial_select, True)
+        self.update_meshes(context)
+
+    def apply(self, context):
+        """Mark final elements of pathes the same way as operator's execute does"""
+        self.gen_final_elements_seq(context)
+        is_faces = context.scene.tool_settings.mesh_select_mode[2]
+        for ob, bm in self.bm_seq:
+            ptr = ob.as_pointer()
+            if ptr in self.select_only_seq and ptr in self.markup_seq:
+                base.mark_elements(
+                    bm, is_faces, self.select_only_seq[ptr], self.markup_seq[ptr], self.mark_options["mark_select"],
+                    self.mark_options["mark_seam"], self.mark_options["mark_sharp"])
+        self.update_meshes(context)
+
+    def replay_event(self, context, kind, ob, elem):
+        """Apply recorded event the same way as modal operator does. Return's False if session is finished"""
+        if kind == 'CANCEL':
+            self.cancel(context)
+            return False
+        elif kind == 'APPLY':
+            self.apply(context)
+            return False
+        elif kind == 'UNDO':
+            if redo.undo(self, context) == {'CANCELLED'}:
+                return False
+        elif kind == 'REDO':
+            redo.redo(self, context)
+        elif kind in ('SAVE', 'LOAD'):
+            if not (self.session_options and self.session_options["directory"]):
+                raise ValueError("Recording has no session directory for %s event" % kind)
+            directory = self.session_options["directory"]
+            if kind == 'SAVE':
+                self.save_session(context, directory, self.session_options["use_fills"])
+            else:
+                self.load_session(context, directory)
+        else:
+            self.interact_control_element(context, elem, ob, base.InteractEvent[kind])
+            self.set_selection_state(self.initial_select, True)
+            self.update_meshes(context)
+
+        if not len(self.path_seq):
+            self.cancel(context)
+            return False
+        return True
+
+    def get_state(self):
+        """Final state of pathes"""
+        return [{
+            "object": path.ob.name,
+            "control_elements": [n.index for n in path.control_elements],
+            "close": path.close,
+            "fill_elements_count": sum(len(n) for n in path.fill_elements),
+        } for path in self.path_seq]
+
+
+def load_recording(filepath):
+    with open(filepath, 'r') as file:
+        data = json.load(file)
+    if data.get("version") != RECORDING_VERSION:
+        raise ValueError("Unsupported recording version %s" % data.get("version"))
+    return data
+
+
+def replay(context, data):
+    """
+    Replay recording (loaded by load_recording) for recorded objects, which should be in edit mode.
+    Return's dict report with per-event timings (milliseconds), stages timings and final state of pathes.
+    """
+    tool_settings = context.scene.tool_settings
+    initial_select_mode = tuple(tool_settings.mesh_select_mode)
+    is_faces = data["select_mode"] == 'FACE'
+    tool_settings.mesh_select_mode = (False, False, True) if is_faces else (False, True, False)
+
+    session = ReplaySession(context, data.get("mark"), data.get("session"))
+    if data.get("use_mesh_storage", False) and session.restore_pathes(context):
+        # The same as operator's invoke, the first click starts a new path
+        session._just_closed_path = True
+    elem_seq_seq = []
+    for ob_name in data["objects"]:
+        ob = bpy.data.objects[ob_name]
+        bm = session.get_bmesh(ob)
+        elem_seq_seq.append((ob, bm.faces if is_faces else bm.verts))
+
+    event_timings = []
+    for _time, kind, ob_index, elem_index, _modifiers in data["events"]:
+        ob = elem = None
+        if ob_index != -1:
+            ob, elem_seq = elem_seq_seq[ob_index]
+            elem = elem_seq[elem_index]
+
+        time_start = perf_counter()
+        is_running = session.replay_event(context, kind, ob, elem)
+        event_timings.append((kind, (perf_counter() - time_start) * 1000.0))
+        if not is_running:
+            break
+
+    tool_settings.mesh_select_mode = initial_select_mode
+
+    return {
+        "events": event_timings,
+        "total": sum(n[1] for n in event_timings),
+        "stages": [
+            {"stage": label, "count": count, "p50": p50, "p95": p95, "max": max_value}
+            for label, count, p50, p95, max_value in session.timer.get_stats()
+        ],
+        "messages": session.message_seq,
+        "pathes": session.get_state(),
+    }
+
+
+def main():
+    """Entry point for background mode, arguments after "--" are recording path and optional report path"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if not argv:
+        raise SystemExit("Recording file path is required after \"--\"")
+
+    data = load_recording(argv[0])
+    context = bpy.context
+
+    if context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    ob_seq = [bpy.data.objects[n] for n in data["objects"]]
+    for ob in context.view_layer.objects:
+        ob.select_set(ob in ob_seq)
+    context.view_layer.objects.active = ob_seq[0]
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    report = replay(context, data)
+
+    if len(argv) > 1:
+        with open(argv[1], 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,207 @@
+from random import random
+
+
+class _Node:
+    """
+    Node of implicit treap. Nodes are never changed after creation, so any number of ropes can share them.
+    Lazy "rev" flag means that node subtree is stored in reversed order.
+    """
+
+    __slots__ = ("item", "prio", "size", "left", "right", "rev")
+
+    def __init__(self, item, prio, left, right, rev=False):
+        self.item = item
+        self.prio = prio
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+        self.left = left
+        self.right = right
+        self.rev = rev
+
+
+def _toggled(node):
+    if node is None:
+        return None
+    return _Node(node.item, node.prio, node.left, node.right, not node.rev)
+
+
+def _pushed(node):
+    # Apply lazy reversal to the node children
+    if not node.rev:
+        return node
+    return _Node(node.item, node.prio, _toggled(node.right), _toggled(node.left))
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prio > b.prio:
+        a = _pushed(a)
+        return _Node(a.item, a.prio, a.left, _merge(a.right, b))
+    b = _pushed(b)
+    return _Node(b.item, b.prio, _merge(a, b.left), b.right)
+
+
+def _split(node, index):
+    """Split node into first "index" items and the rest"""
+    if node is None:
+        return None, None
+    node = _pushed(node)
+    left_size = node.left.size if node.left else 0
+    if index <= left_size:
+        left, right = _split(node.left, index)
+        return left, _Node(node.item, node.prio, right, node.right)
+    left, right = _split(node.right, index - left_size - 1)
+    return _Node(node.item, node.prio, node.left, left), right
+
+
+def _replaced(node, index, item):
+    node = _pushed(node)
+    left_size = node.left.size if node.left else 0
+    if index < left_size:
+        return _Node(node.item, node.prio, _replaced(node.left, index, item), node.right)
+    elif index > left_size:
+        return _Node(node.item, node.prio, node.left, _replaced(node.right, index - left_size - 1, item))
+    return _Node(item, node.prio, node.left, node.right)
+
+
+def _build(items):
+    # Cartesian tree from items with random priorities, O(n).
+    # Entries are [item, prio, left, right] while tree is built
+    stack = []
+    for item in items:
+        entry = [item, random(), None, None]
+        while stack and stack[-1][1] < entry[1]:
+            entry[2] = stack.pop()
+        if stack:
+            stack[-1][3] = entry
+        stack.append(entry)
+
+    def finalize(entry):
+        if entry is None:
+            return None
+        return _Node(entry[0], entry[1], finalize(entry[2]), finalize(entry[3]))
+
+    if stack:
+        return finalize(stack[0])
+
+
+class Rope:
+    """
+    List-like sequence on top of persistent implicit treap.
+    Structure:
+
+    insert, pop, item access and concatenation  - O(log n)
+    reverse and copy                            - O(1)
+    iteration, index, count                     - O(n)
+
+    Note:
+        Reverse only toggles direction flag of the root node, which is respected by index arithmetic
+        of all operations. Copies share all nodes.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, items=()):
+        if isinstance(items, Rope):
+            self._root = items._root
+        else:
+            self._root = _build(items)
+
+    def __len__(self):
+        return self._root.size if self._root else 0
+
+    def __bool__(self):
+        return self._root is not None
+
+    def _normalize_index(self, index):
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("rope index out of range")
+        return index
+
+    def __getitem__(self, index):
+        index = self._normalize_index(index)
+        node = self._root
+        rev = False
+        while True:
+            rev ^= node.rev
+            left, right = (node.right, node.left) if rev else (node.left, node.right)
+            left_size = left.size if left else 0
+            if index < left_size:
+                node = left
+            elif index > left_size:
+                index -= left_size + 1
+                node = right
+            else:
+                return node.item
+
+    def __setitem__(self, index, item):
+        self._root = _replaced(self._root, self._normalize_index(index), item)
+
+    def __iter__(self):
+        stack = []
+        node = self._root
+        rev = False
+        while stack or node is not None:
+            while node is not None:
+                rev ^= node.rev
+                stack.append((node, rev))
+                node = node.right if rev else node.left
+            node, rev = stack.pop()
+            yield node.item
+            node = node.left if rev else node.right
+
+    def __contains__(self, item):
+        return any(n == item for n in self)
+
+    def __repr__(self):
+        return "Rope(%s)" % list(self)
+
+    def copy(self):
+        return Rope(self)
+
+    def index(self, item):
+        for i, n in enumerate(self):
+            if n == item:
+                return i
+        raise ValueError("%r is not in rope" % (item,))
+
+    def count(self, item):
+        return sum(1 for n in self if n == item)
+
+    def insert(self, index, item):
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        index = min(index, size)
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(item, random(), None, None)), right)
+
+    def append(self, item):
+        self._root = _merge(self._root, _Node(item, random(), None, None))
+
+    def pop(self, index=-1):
+        index = self._normalize_index(index)
+        left, right = _split(self._root, index)
+        item, right = _split(right, 1)
+        self._root = _merge(left, right)
+        return item.item
+
+    def extend(self, other):
+        """Append items of other rope (O(log n)) or iterable"""
+        if not isinstance(other, Rope):
+            other = Rope(other)
+        self._root = _merge(self._root, other._root)
+
+    def extendleft(self, other):
+        """Prepend items of other rope (O(log n)) or iterable, order of items is kept"""
+        if not isinstance(other, Rope):
+            other = Rope(other)
+        self._root = _merge(other._root, self._root)
+
+    def reverse(self):
+        self._root = _toggled(self._root)
@@ -0,0 +1,226 @@
+"""
+Export and import of pathes of a single object as NumPy .npz files, works without Blender.
+Structure of file:
+
+version                                                         - SESSION_VERSION
+select_mode                                                     - 'EDGE' or 'FACE'
+topology_hash                                                   - get_topology_hash of mesh arrays
+control_indices[control_offsets[i]:control_offsets[i + 1]]      - control element indices of path i
+flags[i]                                                        - FLAG_CLOSE | FLAG_DIRECTION of path i
+islands[i]                                                      - island index of path i in it's object
+fill_indices[fill_offsets[k]:fill_offsets[k + 1]]               - fill element indices of fill k
+path_fill_offsets[i]:path_fill_offsets[i + 1]                   - range of fills of path i
+control_co, fill_co                                             - flat arrays of positions of elements
+
+Fill arrays are optional (empty path_fill_offsets), in that case pathes are routed again on import. If topology of
+mesh is changed, elements are mapped by positions (utils.remap) and only segments which are changed are routed.
+The same packed arrays are stored in meshes as ID properties (pack_properties).
+"""
+
+if "remap" in locals():
+    import importlib
+
+    importlib.reload(remap)
+
+import hashlib
+
+import numpy as np
+
+from . import remap
+
+SESSION_VERSION = 1
+
+FLAG_CLOSE = 1
+FLAG_DIRECTION = 2
+
+
+def get_topology_hash(mesh):
+    """Return's hex digest of mesh arrays (utils.graph.MeshArrays) topology, vertex locations are not used"""
+    hasher = hashlib.sha1()
+    hasher.update(np.array((len(mesh.vert_co), len(mesh.edge_verts)), dtype=np.int64).tobytes())
+    for arr in (mesh.edge_verts, mesh.face_loop_offsets, mesh.face_verts):
+        hasher.update(np.ascontiguousarray(arr, dtype=np.int32).tobytes())
+    return hasher.hexdigest()
+
+
+def _concatenate(index_seq_seq):
+    """Return's tuple (concatenated int32 indices, offsets) of list of index sequences"""
+    offsets = np.zeros(len(index_seq_seq) + 1, dtype=np.int32)
+    np.cumsum([len(n) for n in index_seq_seq], out=offsets[1:])
+    indices = np.fromiter(
+        (i for index_seq in index_seq_seq for i in index_seq), dtype=np.int32, count=int(offsets[-1]))
+    return indices, offsets
+
+
+def pack_pathes(path_seq, mesh, is_faces, use_fills=True):
+    """Return's dict of arrays of pathes of a single object"""
+    control_indices, control_offsets = _concatenate([[n.index for n in path.control_elements] for path in path_seq])
+
+    flags = np.array([
+        (FLAG_CLOSE if path.close else 0) | (FLAG_DIRECTION if path.direction else 0) for path in path_seq
+    ], dtype=np.uint8)
+    islands = np.array([path.island_index[1] for path in path_seq], dtype=np.int32)
+
+    fill_seq_seq = []
+    path_fill_counts = []
+    if use_fills:
+        for path in path_seq:
+            path_fill_seq = [[n.index for n in fill_seq] for fill_seq in path.fill_elements]
+            fill_seq_seq.extend(path_fill_seq)
+            path_fill_counts.append(len(path_fill_seq))
+    fill_indices, fill_offsets = _concatenate(fill_seq_seq)
+    path_fill_offsets = np.zeros(len(path_fill_counts) + 1 if use_fills else 0, dtype=np.int32)
+    if use_fills:
+        np.cumsum(path_fill_counts, out=path_fill_offsets[1:])
+
+    # Positions of vertices (edge selection mode) or face and edge centers
+    face_center = mesh.get_face_centers() if is_faces else None
+    control_co = (face_center if is_faces else mesh.vert_co)[control_indices]
+    fill_co = (face_center if is_faces else mesh.get_edge_centers())[fill_indices]
+
+    return {
+        "version": np.array(SESSION_VERSION, dtype=np.int32),
+        "select_mode": np.array('FACE' if is_faces else 'EDGE'),
+        "topology_hash": np.array(get_topology_hash(mesh)),
+        "control_indices": control_indices,
+        "control_offsets": control_offsets,
+        "flags": flags,
+        "islands": islands,
+        "fill_indices": fill_indices,
+        "fill_offsets": fill_offsets,
+        "path_fill_offsets": path_fill_offsets,
+        "control_co": control_co.astype(np.float32).ravel(),
+        "fill_co": fill_co.astype(np.float32).ravel(),
+    }
+
+
+def save_pathes(filepath, path_seq, mesh, is_faces, use_fills=True):
+    np.savez_compressed(filepath, **pack_pathes(path_seq, mesh, is_faces, use_fills))
+
+
+class PathRecord:
+    """
+    Path data read from file or mesh. fill_seq_seq is list of fill indices lists or None if all segments should
+    be routed, items of list are None for segments which should be routed.
+    """
+
+    __slots__ = (
+        "control_indices",
+        "fill_seq_seq",
+        "close",
+        "direction",
+        "island",
+    )
+
+    def __init__(self, control_indices, fill_seq_seq, close, direction, island):
+        self.control_indices = control_indices
+        self.fill_seq_seq = fill_seq_seq
+        self.close = close
+        self.direction = direction
+        self.island = island
+
+
+def pack_properties(data):
+    """
+    Return's packed pathes (pack_pathes) as Python values which can be stored as ID properties,
+    empty arrays are skipped because ID property arrays can not be empty.
+    """
+    return {key: value.tolist() for key, value in data.items() if value.ndim == 0 or len(value)}
+
+
+def _get_remapped_fills(fill_seq_seq, control_moved, fill_changed):
+    """
+    Fills of path with None for segments which should be routed again. Path has a fill for each control element,
+    if saved fills do not match them, all segments are routed.
+    """
+    count = len(control_moved)
+    if len(fill_seq_seq) != count:
+        return [None] * count
+    # The last fill is the close one, from the last control element to the first
+    return [
+        None if (fill_changed[j] or control_moved[j] or control_moved[(j + 1) % count]) else fill_seq
+        for j, fill_seq in enumerate(fill_seq_seq)
+    ]
+
+
+def unpack_pathes(data, mesh, is_faces):
+    """
+    Return's tuple (list of PathRecord, topology matched) of packed pathes (mapping of arrays or lists, missing
+    arrays are empty). Fills are used as is if mesh topology matches the saved one. Otherwise elements are mapped
+    by positions, fills of segments which are changed are None, or, if positions were not saved, control element
+    indices are checked to be in range of mesh elements and all segments are routed.
+    """
+    def get_array(key, dtype=np.int32):
+        return np.asarray(data.get(key, ()), dtype=dtype)
+
+    if int(data["version"]) != SESSION_VERSION:
+        raise ValueError("Unsupported session version %d" % int(data["version"]))
+    if str(data["select_mode"]) != ('FACE' if is_faces else 'EDGE'):
+        raise ValueError("Pathes were saved in %s selection mode" % str(data["select_mode"]).lower())
+
+    is_topology_matched = str(data["topology_hash"]) == get_topology_hash(mesh)
+    is_remapped = (not is_topology_matched) and ("control_co" in data)
+
+    control_offsets = get_array("control_offsets").tolist()
+    fill_offsets = get_array("fill_offsets").tolist()
+    path_fill_offsets = get_array("path_fill_offsets").tolist()
+    use_fills = (is_topology_matched or is_remapped) and bool(path_fill_offsets)
+
+    control_indices = get_array("control_indices")
+    fill_indices = get_array("fill_indices")
+    control_moved = fill_changed = None
+    if is_remapped:
+        tolerance = remap.get_tolerance(mesh)
+        face_center = mesh.get_face_centers() if is_faces else None
+        control_indices, control_moved = remap.remap_elements(
+            get_array("control_co", np.float32).reshape(-1, 3), face_center if is_faces else mesh.vert_co, tolerance)
+        control_moved = control_moved.tolist()
+        if use_fills:
+            fill_indices, fill_moved = remap.remap_elements(
+                get_array("fill_co", np.float32).reshape(-1, 3),
+                face_center if is_faces else mesh.get_edge_centers(), tolerance)
+            fill_changed = remap.get_changed_ranges(fill_offsets, fill_moved).tolist()
+    elif not is_topology_matched:
+        elem_count = (len(mesh.face_loop_offsets) - 1) if is_faces else len(mesh.vert_co)
+        if len(control_indices) and (control_indices.min() < 0 or control_indices.max() >= elem_count):
+            raise ValueError("Mesh topology is changed, control elements are out of range")
+
+    record_seq = []
+    flags_seq = get_array("flags", np.uint8).tolist()
+    for i, (flags, island) in enumerate(zip(flags_seq, get_array("islands").tolist())):
+        start, end = control_offsets[i], control_offsets[i + 1]
+        control_seq = control_indices[start:end].tolist()
+
+        fill_seq_seq = None
+        if use_fills:
+            fill_range = range(path_fill_offsets[i], path_fill_offsets[i + 1])
+            fill_seq_seq = [fill_indices[fill_offsets[k]:fill_offsets[k + 1]].tolist() for k in fill_range]
+            if is_remapped:
+                fill_seq_seq = _get_remapped_fills(
+                    fill_seq_seq, control_moved[start:end], fill_changed[fill_range.start:fill_range.stop])
+
+        is_close = bool(flags & FLAG_CLOSE)
+        if is_remapped and (
+                any(a == b for a, b in zip(control_seq, control_seq[1:])) or
+                (is_close and len(control_seq) > 1 and control_seq[0] == control_seq[-1])):
+            # Adjacent control elements are mapped to the same element, path is routed again without doubles.
+            # For closed path the last control element is adjacent to the first one too
+            control_seq = [n for j, n in enumerate(control_seq) if j == 0 or n != control_seq[j - 1]]
+            if is_close and len(control_seq) > 1 and control_seq[0] == control_seq[-1]:
+                control_seq.pop()
+            fill_seq_seq = None
+
+        record_seq.append(PathRecord(
+            control_seq,
+            fill_seq_seq,
+            is_close,
+            bool(flags & FLAG_DIRECTION),
+            island,
+        ))
+    return record_seq, is_topology_matched
+
+
+def load_pathes(filepath, mesh, is_faces):
+    """Return's tuple (list of PathRecord, topology matched) of file, see unpack_pathes"""
+    with np.load(filepath, allow_pickle=False) as data:
+        return unpack_pathes(dict(data), mesh, is_faces)
@@ -0,0 +1,162 @@
+import bmesh
+import numpy as np
+from bpy_extras import view3d_utils
+from mathutils import Vector
+
+# Part of distance from view to control element, occluding geometry should be closer than the rest of distance.
+# Surfaces which contain element itself are not counted as occluding ones
+OCCLUSION_TOLERANCE = 1e-3
+
+
+def get_elem_co(ob, elem):
+    """World space location of control element (vertex location or face center)"""
+    if isinstance(elem, bmesh.types.BMFace):
+        return ob.matrix_world @ elem.calc_center_median()
+    return ob.matrix_world @ elem.co
+
+
+def is_xray(context):
+    """Whether elements behind geometry can be picked in 3D View"""
+    shading = context.space_data.shading
+    if shading.type == 'WIREFRAME':
+        return shading.show_xray_wireframe
+    return shading.show_xray
+
+
+def is_occluded(context, co):
+    """Whether world space location is hidden from view by geometry of visible objects"""
+    region = context.region
+    rv3d = context.region_data
+    co_2d = view3d_utils.location_3d_to_region_2d(region, rv3d, co)
+    if co_2d is None:
+        return True
+    origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, co_2d)
+    direction = co - origin
+    distance = direction.length
+    if distance == 0.0:
+        return False
+    return context.scene.ray_cast(
+        context.evaluated_depsgraph_get(), origin, direction / distance,
+        distance=distance * (1.0 - OCCLUSION_TOLERANCE))[0]
+
+
+class ControlElementsIndex:
+    """
+    Array based index of control elements of all pathes in world space. Search projects all elements to region
+    at once with NumPy, because projection changes with every view change and count of control elements is small,
+    screen space structures are not used.
+    Structure:
+
+    co[slot]         - world space location of element
+    elem_seq[slot]   - element (None for free slots)
+    ob_seq[slot]     - object of element
+    count_seq[slot]  - number of element occurrences in pathes
+
+    Note:
+        Slots of moved elements are updated incrementally, after other changes of pathes index
+        should be tagged for update and it would be rebuilt on next search.
+    """
+
+    __slots__ = (
+        "co",
+        "elem_seq",
+        "ob_seq",
+        "count_seq",
+        "slot_map",
+        "free_slots",
+        "is_dirty",
+    )
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.co = np.full((64, 3), np.nan, dtype=np.float32)
+        self.elem_seq = []
+        self.ob_seq = []
+        self.count_seq = []
+        self.slot_map = {}
+        self.free_slots = []
+        self.is_dirty = False
+
+    def tag_update(self):
+        self.is_dirty = True
+
+    def rebuild(self, path_seq):
+        self.clear()
+        for path in path_seq:
+            for elem in path.control_elements:
+                self.add(elem, path.ob)
+
+    def add(self, elem, ob):
+        slot = self.slot_map.get(elem, None)
+        if slot is not None:
+            self.count_seq[slot] += 1
+            return
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.elem_seq[slot] = elem
+            self.ob_seq[slot] = ob
+            self.count_seq[slot] = 1
+        else:
+            slot = len(self.elem_seq)
+            if slot == len(self.co):
+                co = np.full((len(self.co) * 2, 3), np.nan, dtype=np.float32)
+                co[:slot] = self.co
+                self.co = co
+            self.elem_seq.append(elem)
+            self.ob_seq.append(ob)
+            self.count_seq.append(1)
+
+        self.co[slot] = get_elem_co(ob, elem)
+        self.slot_map[elem] = slot
+
+    def discard(self, elem):
+        slot = self.slot_map.get(elem, None)
+        if slot is None:
+            return
+        self.count_seq[slot] -= 1
+        if self.count_seq[slot] <= 0:
+            del self.slot_map[elem]
+            self.elem_seq[slot] = None
+            self.ob_seq[slot] = None
+            self.co[slot] = np.nan
+            self.free_slots.append(slot)
+
+    def move(self, elem, new_elem, ob):
+        """Control element occurrence moved to other mesh element"""
+        if elem != new_elem:
+            self.discard(elem)
+            self.add(new_elem, ob)
+
+    def find(self, region, rv3d, mouse, radius, exclude=None, is_visible=None):
+        """
+        Return's tuple (element, object) nearest to mouse region coordinates in given pixel radius,
+        otherwise (None, None). Elements for which is_visible(world space location) is False are skipped.
+        """
+        count = len(self.elem_seq)
+        if not count:
+            return None, None
+
+        co = np.ones((count, 4), dtype=np.float32)
+        co[:, :3] = self.co[:count]
+        clip = co @ np.array(rv3d.perspective_matrix, dtype=np.float32).T
+
+        w = clip[:, 3]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x = (clip[:, 0] / w * 0.5 + 0.5) * region.width - mouse[0]
+            y = (clip[:, 1] / w * 0.5 + 0.5) * region.height - mouse[1]
+            dist_sq = x * x + y * y
+            dist_sq[~(w > 0.0)] = np.inf  # Behind the view and free slots
+
+        if exclude is not None:
+            slot = self.slot_map.get(exclude, None)
+            if slot is not None:
+                dist_sq[slot] = np.inf
+
+        slots = np.flatnonzero(dist_sq <= radius * radius)
+        for slot in slots[np.argsort(dist_sq[slots], kind='stable')].tolist():
+            if (is_visible is None) or is_visible(Vector(self.co[slot].tolist())):
+                return self.elem_seq[slot], self.ob_seq[slot]
+        return None, None
@@ -0,0 +1,101 @@
+import os
+import cProfile
+import pstats
+from collections import deque
+from functools import wraps
+from time import perf_counter, strftime
+
+import numpy as np
+
+# Stage identifier - label
+STAGES = {
+    "PICK": "Pick",
+    "ISLAND": "Island",
+    "ROUTE": "Route",
+    "BATCH": "Batch",
+    "UPDATE_MESHES": "Update Meshes",
+    "UNDO": "Undo",
+    "DRAW": "Draw",
+}
+
+
+class StageTimer:
+    """
+    Rolling timings of hot path stages of modal session. For each stage only the latest measurements
+    are kept, statistics are evaluated only when they are displayed.
+
+    Note:
+        Stages can be nested (batches of fills are built while drawing), so their times are not additive.
+    """
+
+    __slots__ = (
+        "is_enabled",
+        "stage_seq",
+    )
+
+    def __init__(self, is_enabled=False, maxlen=256):
+        self.is_enabled = is_enabled
+        # Stage identifier - deque of times in seconds
+        self.stage_seq = {stage: deque(maxlen=maxlen) for stage in STAGES.keys()}
+
+    def add(self, stage, value):
+        self.stage_seq[stage].append(value)
+
+    def get_stats(self):
+        """Return's list of tuples (stage label, measurements count, p50, p95, max) in milliseconds"""
+        ret = []
+        for stage, label in STAGES.items():
+            time_seq = self.stage_seq[stage]
+            if not time_seq:
+                continue
+            arr = np.fromiter(time_seq, dtype=np.float64, count=len(time_seq)) * 1000.0
+            p50, p95 = np.percentile(arr, (50, 95))
+            ret.append((label, len(arr), float(p50), float(p95), float(arr.max())))
+        return ret
+
+    def format_stats(self):
+        """Return's list of text lines, one per measured stage"""
+        return ["%s: %.2f / %.2f / %.2f ms" % (label, p50, p95, max_value)
+                for label, _count, p50, p95, max_value in self.get_stats()]
+
+
+def timed(stage):
+    """
+    Decorator of operator methods (or functions which first argument is operator). Execution time is recorded
+    only if operator has enabled timer, otherwise the only overhead is a single attribute check.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            timer = getattr(self, "timer", None)
+            if timer is None or not timer.is_enabled:
+                return func(self, *args, **kwargs)
+            time_start = perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                timer.add(stage, perf_counter() - time_start)
+        return wrapper
+    return decorator
+
+
+def start_profile():
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def save_profile(profile, directory, name, limit=30):
+    """
+    Stop profile and write it's stats (.prof) and text summary of top functions sorted by cumulative time (.txt)
+    to directory, files are named by current time and given name. Return's path of stats file.
+    """
+    profile.disable()
+    os.makedirs(directory, exist_ok=True)
+    filepath = os.path.join(directory, "%s_%s" % (strftime("%Y%m%d_%H%M%S"), name))
+
+    profile.dump_stats(filepath + ".prof")
+    with open(filepath + ".txt", 'w') as file:
+        stats = pstats.Stats(profile, stream=file)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return filepath + ".prof"
@@ -1,4 +1,48 @@
-import bmesh
+import numpy as np
+
+from . import rope
+from . import mesh_graph
+
+
+class _FillsView:
+    """List-like access to one field (fill elements or fill batch) of Path fills, close fill is the last item"""
+
+    __slots__ = ("_path", "_field")
+
+    def __init__(self, path, field):
+        self._path = path
+        self._field = field
+
+    def __len__(self):
+        path = self._path
+        return len(path._fills) + (path._close_fill is not None)
+
+    def _replaced(self, fill, value):
+        if self._field == 0:
+            return value, fill[1]
+        return fill[0], value
+
+    def __getitem__(self, fill_index):
+        path = self._path
+        fill_index = range(len(self))[fill_index]
+        if fill_index == len(path._fills):
+            return path._close_fill[self._field]
+        return path._fills[fill_index][self._field]
+
+    def __setitem__(self, fill_index, value):
+        path = self._path
+        fill_index = range(len(self))[fill_index]
+        if fill_index == len(path._fills):
+            path._close_fill = self._replaced(path._close_fill, value)
+        else:
+            path._fills[fill_index] = self._replaced(path._fills[fill_index], value)
+
+    def __iter__(self):
+        path = self._path
+        for fill in path._fills:
+            yield fill[self._field]
+        if path._close_fill is not None:
+            yield path._close_fill[self._field]
 
 
 class Path:
@@ -14,6 +58,11 @@ class Path:
            |          |          |          |            |
         (fba_0)    (fba_0)    (fba_0)    (fba_0)    (fba_close)
 
+    Control elements and (fill, fill batch) pairs between them are stored in ropes (utils.rope.Rope), so
+    insert, pop and join are O(log n), reverse and copy are O(1). Fill elements and batches are always
+    stored together so they can not be misaligned. Pair of fill_close is stored separately because it
+    keeps it's place when path is reversed.
+
     Note:
         If elem parameter passed at instance initialization,
         will be added placeholders to fill_elements and batch_seq_fills.
@@ -23,9 +72,9 @@ class Path:
         "island_index",
         "ob",
         "batch_control_elements",
-        "control_elements",
-        "fill_elements",
-        "batch_seq_fills",
+        "_control_elements",
+        "_fills",
+        "_close_fill",
         "close",
         "direction",
     )
@@ -38,25 +87,57 @@ class Path:
         # One batch for all control elements
         self.batch_control_elements = None
 
-        self.control_elements = []
-        self.fill_elements = []
-        # And separate batches for each fill seq. self.batch_seq_fills[-1] reserved for
-        self.batch_seq_fills = []
+        self._control_elements = rope.Rope()
+        # (fill seq, batch) pairs from first to the last control element
+        self._fills = rope.Rope()
+        # (fill seq, batch) pair from the last to the first control element (if path.close)
+        self._close_fill = None
 
         if elem is not None:
-            self.control_elements.append(elem)
+            self._control_elements.append(elem)
             # Placeholders for fill seq and it's batch from first to the last control element(if path.close)
-            self.fill_elements.append([])
-            self.batch_seq_fills.append(None)
+            self._close_fill = ([], None)
 
         self.close = False
         self.direction = True
 
+    @property
+    def control_elements(self):
+        return self._control_elements
+
+    @control_elements.setter
+    def control_elements(self, value):
+        self._control_elements = rope.Rope(value)
+
+    @property
+    def fill_elements(self):
+        return _FillsView(self, 0)
+
+    @fill_elements.setter
+    def fill_elements(self, value):
+        self._set_fills(list(value), list(self.batch_seq_fills))
+
+    @property
+    def batch_seq_fills(self):
+        # And separate vertex positions arrays for each fill seq (merged into object batches by draw.DrawLayer).
+        # self.batch_seq_fills[-1] reserved for close fill
+        return _FillsView(self, 1)
+
+    @batch_seq_fills.setter
+    def batch_seq_fills(self, value):
+        self._set_fills(list(self.fill_elements), list(value))
+
+    def _set_fills(self, fill_elements, batch_seq_fills):
+        batch_seq_fills.extend(None for _ in range(len(fill_elements) - len(batch_seq_fills)))
+        fills = list(zip(fill_elements, batch_seq_fills))
+        self._fills = rope.Rope(fills[:-1])
+        self._close_fill = fills[-1] if fills else None
+
     def copy(self):
         new_path = Path()
-        new_path.control_elements = self.control_elements.copy()
-        new_path.fill_elements = self.fill_elements.copy()
-        new_path.batch_seq_fills = self.batch_seq_fills.copy()
+        new_path._control_elements = self._control_elements.copy()
+        new_path._fills = self._fills.copy()
+        new_path._close_fill = self._close_fill
 
         new_path.batch_control_elements = self.batch_control_elements
         new_path.island_index = self.island_index
@@ -70,12 +151,11 @@ class Path:
         # For development purposes only
         batch_seq_fills_formatted = []
         for i, batch in enumerate(self.batch_seq_fills):
-            if batch:
+            if batch is not None:
                 batch_seq_fills_formatted.append("fb_%d" % i)
                 continue
             batch_seq_fills_formatted.append(batch)
 
-        ["fb_%d" % i for i in range(len(self.batch_seq_fills))]
         return "\nPath[%d]:\n    ce: %s\n    fe: %s\n    fb: %s" % (
             id(self),
             str([n.index for n in self.control_elements]),
@@ -86,83 +166,54 @@ class Path:
     def __add__(self, other):
         assert self.island_index == other.island_index
 
-        is_found_merged_elements = False
         for i in (0, -1):
-            elem = self.control_elements[i]
+            elem = self._control_elements[i]
             for j in (0, -1):
-                other_elem = other.control_elements[j]
-                if elem == other_elem:
-                    is_found_merged_elements = True
-
-                    if i == -1 and j == 0:
-                        # End-First
-                        self.control_elements.pop(-1)
-                        self.fill_elements.pop(-1)
-                        self.batch_seq_fills.pop(-1)
-
-                        self.control_elements.extend(other.control_elements)
-                        self.fill_elements.extend(other.fill_elements)
-                        self.batch_seq_fills.extend(other.batch_seq_fills)
-
-                    elif i == 0 and j == -1:
-                        # First-End
-
-                        self.control_elements.pop(0)
-
-                        other.fill_elements.pop(-1)
-                        other.batch_seq_fills.pop(-1)
-
-                        other.control_elements.extend(self.control_elements)
-                        other.fill_elements.extend(self.fill_elements)
-                        other.batch_seq_fills.extend(self.batch_seq_fills)
-
-                        self.control_elements = other.control_elements
-                        self.fill_elements = other.fill_elements
-                        self.batch_seq_fills = other.batch_seq_fills
-
-                    elif i == 0 and j == 0:
-                        # First-First
-                        self.control_elements.pop(0)
-
-                        other.control_elements.reverse()
-                        other.fill_elements.reverse()
-                        other.batch_seq_fills.reverse()
-
-                        other.fill_elements.pop(0)
-                        other.batch_seq_fills.pop(0)
-
-                        other.control_elements.extend(self.control_elements)
-                        other.fill_elements.extend(self.fill_elements)
-                        other.batch_seq_fills.extend(self.batch_seq_fills)
-
-                        self.control_elements = other.control_elements
-                        self.fill_elements = other.fill_elements
-                        self.batch_seq_fills = other.batch_seq_fills
-
-                    elif i == -1 and j == -1:
-                        # End-End
-                        other.reverse()
-                        self.control_elements.pop(-1)
-                        self.fill_elements.pop(-1)
-                        self.batch_seq_fills.pop(-1)
-
-                        self.control_elements.extend(other.control_elements)
-                        self.fill_elements.extend(other.fill_elements)
-                        self.batch_seq_fills.extend(other.batch_seq_fills)
-
-            if is_found_merged_elements:
-                break
+                other_elem = other._control_elements[j]
+                if elem != other_elem:
+                    continue
+
+                other_control_elements = other._control_elements.copy()
+                other_fills = other._fills.copy()
+
+                if i == -1 and j == 0:
+                    # End-First
+                    self._control_elements.pop(-1)
+                    self._control_elements.extend(other_control_elements)
+                    self._fills.extend(other_fills)
+                    self._close_fill = other._close_fill
+
+                elif i == 0 and j == -1:
+                    # First-End
+                    self._control_elements.pop(0)
+                    self._control_elements.extendleft(other_control_elements)
+                    self._fills.extendleft(other_fills)
+
+                elif i == 0 and j == 0:
+                    # First-First
+                    self._control_elements.pop(0)
+                    other_control_elements.reverse()
+                    other_fills.reverse()
+                    self._control_elements.extendleft(other_control_elements)
+                    self._fills.extendleft(other_fills)
+
+                elif i == -1 and j == -1:
+                    # End-End
+                    self._control_elements.pop(-1)
+                    other_control_elements.reverse()
+                    other_fills.reverse()
+                    self._control_elements.extend(other_control_elements)
+                    self._fills.extend(other_fills)
+                    self._close_fill = other._close_fill
+
+                return self
 
         return self
 
     def reverse(self):
-        self.control_elements.reverse()
-        close_path_fill = self.fill_elements.pop(-1)
-        close_path_batch = self.batch_seq_fills.pop(-1)
-        self.fill_elements.reverse()
-        self.batch_seq_fills.reverse()
-        self.fill_elements.append(close_path_fill)
-        self.batch_seq_fills.append(close_path_batch)
+        self._control_elements.reverse()
+        # Close fill keeps it's place
+        self._fills.reverse()
         self.direction = not self.direction
         return self
 
@@ -170,20 +221,21 @@ class Path:
         """
         Return's element index in self.control_elements if exist, otherwise None
         """
-        if elem in self.control_elements:
-            return self.control_elements.index(elem)
+        for i, control_element in enumerate(self._control_elements):
+            if control_element == elem:
+                return i
 
     def is_in_fill_elements(self, elem):
         """
         Return's index of fill in self.fill_elements if element exist in any fill, otherwise None
         """
         for fill_index, fill_seq in enumerate(self.fill_elements):
-            if isinstance(elem, bmesh.types.BMVert):
+            if mesh_graph.is_vert(elem):
                 for edge in fill_seq:
                     for vert in edge.verts:
                         if elem == vert:
                             return fill_index
-            elif isinstance(elem, bmesh.types.BMFace):
+            elif mesh_graph.is_face(elem):
                 if elem in fill_seq:
                     return fill_index
 
@@ -194,21 +246,34 @@ class Path:
         - empty list for fill elements after this element
         - placeholder for fill batch
         """
-        self.control_elements.insert(elem_index, elem)
-        self.fill_elements.insert(elem_index, [])
-        self.batch_seq_fills.insert(elem_index, None)
+        control_elements_count = len(self._control_elements)
+        self._control_elements.insert(elem_index, elem)
+
+        if elem_index < 0:
+            elem_index = max(0, elem_index + control_elements_count)
+        if self._close_fill is None:
+            self._close_fill = ([], None)
+        elif elem_index >= control_elements_count:
+            # Previous close fill now is between previous last and new element
+            self._fills.append(self._close_fill)
+            self._close_fill = ([], None)
+        else:
+            self._fills.insert(elem_index, ([], None))
 
     def remove_control_element(self, elem):
         elem_index = self.control_elements.index(elem)
         self.pop_control_element(elem_index)
 
     def pop_control_element(self, elem_index):
-        elem = self.control_elements.pop(elem_index)
+        elem = self._control_elements.pop(elem_index)
         pop_index = elem_index - 1
         if elem_index == 0:
             pop_index = 0
-        self.fill_elements.pop(pop_index)
-        self.batch_seq_fills.pop(pop_index)
+        pop_index = range(len(self._fills) + 1)[pop_index]
+        if pop_index == len(self._fills):
+            self._close_fill = self._fills.pop() if self._fills else None
+        else:
+            self._fills.pop(pop_index)
         return elem
 
     def get_pairs_items(self, elem_index):
@@ -243,3 +308,391 @@ class Path:
             pairs_items.extend([[self.control_elements[0], self.control_elements[-1], -1]])
 
         return pairs_items
+
+
+def _frozen(array):
+    """Array which can not be changed in place, so it can be shared by copies of ArrayPath"""
+    array.flags.writeable = False
+    return array
+
+
+def _gen_indices(elem_seq):
+    return np.array([n.index for n in elem_seq], dtype=np.int32)
+
+
+class _FillBuffer:
+    """
+    Flat buffer of fill element indices shared by ArrayPath and its copies. Indices are only appended, ranges
+    of fills which are in use are never changed, so each copy keeps valid ranges while others append new fills.
+    """
+
+    __slots__ = ("array", "size")
+
+    def __init__(self, array):
+        self.array = array
+        self.size = len(array)
+
+    def append(self, indices):
+        """Return's position of appended indices"""
+        start = self.size
+        end = start + len(indices)
+        if end > len(self.array):
+            array = np.empty(max(end, len(self.array) * 2), dtype=np.int32)
+            array[:start] = self.array[:start]
+            self.array = array
+        self.array[start:end] = indices
+        self.size = end
+        return start
+
+
+class _ArrayControlView:
+    """List-like access to control elements of ArrayPath, elements are resolved by control element sequence"""
+
+    __slots__ = ("_path",)
+
+    def __init__(self, path):
+        self._path = path
+
+    def __len__(self):
+        return len(self._path._control_indices)
+
+    def __getitem__(self, index):
+        path = self._path
+        return path._control_elem_seq[int(path._control_indices[index])]
+
+    def __setitem__(self, index, elem):
+        path = self._path
+        control_indices = path._control_indices.copy()
+        control_indices[index] = elem.index
+        path._control_indices = _frozen(control_indices)
+
+    def __iter__(self):
+        elem_seq = self._path._control_elem_seq
+        return (elem_seq[i] for i in self._path._control_indices.tolist())
+
+    def __contains__(self, elem):
+        return self._path.is_in_control_elements(elem) is not None
+
+    def index(self, elem):
+        elem_index = self._path.is_in_control_elements(elem)
+        if elem_index is None:
+            raise ValueError("%r is not in path control elements" % (elem,))
+        return elem_index
+
+
+class _ArrayFillsView:
+    """List-like access to one field (fill elements or fill batch) of ArrayPath fills, close fill is the last item"""
+
+    __slots__ = ("_path", "_field")
+
+    def __init__(self, path, field):
+        self._path = path
+        self._field = field
+
+    def __len__(self):
+        return len(self._path._fill_batches)
+
+    def __getitem__(self, fill_index):
+        path = self._path
+        fill_index = range(len(self))[fill_index]
+        if self._field == 1:
+            return path._fill_batches[fill_index]
+        start, end = int(path._fill_starts[fill_index]), int(path._fill_ends[fill_index])
+        elem_seq = path._fill_elem_seq
+        return [elem_seq[i] for i in path._fill_buffer.array[start:end].tolist()]
+
+    def __setitem__(self, fill_index, value):
+        path = self._path
+        fill_index = range(len(self))[fill_index]
+        if self._field == 1:
+            path._fill_batches[fill_index] = value
+        else:
+            path._set_fill(fill_index, _gen_indices(value))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ArrayPath:
+    """
+    Path container with the same interface as Path, backed by int32 element indices. Elements are resolved
+    by element sequences of object (bm.verts and bm.edges in edges mode, bm.faces in faces mode) on access.
+    Structure:
+
+    control_indices: [ce_0, ce_1, ..., ce_n]
+    fill_buffer:     [fill_0 ..., fill_1 ..., ..., fill_close ..., (indices of replaced fills)]
+    fill_starts:     [start of fill_0, start of fill_1, ..., start of fill_close]
+    fill_ends:       [end of fill_0, end of fill_1, ..., end of fill_close]
+
+    Arrays of control indices and fill ranges are never changed in place and fill buffer is only appended,
+    so copies share them and undo history steps keep only changed fills. Changed fill is appended to
+    the buffer, the buffer is compacted when replaced fills take more than FILL_BUFFER_SLACK of it.
+    Reverse reorders fill ranges, join gathers fills of both pathes into a new buffer.
+    Memory use is compared with Path by utils.path_memory benchmark.
+    """
+
+    # Minimal ratio of size of fill buffer to size of fills in use at which buffer is compacted
+    FILL_BUFFER_SLACK = 2.0
+
+    __slots__ = (
+        "island_index",
+        "ob",
+        "batch_control_elements",
+        "_control_elem_seq",
+        "_fill_elem_seq",
+        "_control_indices",
+        "_fill_buffer",
+        "_fill_starts",
+        "_fill_ends",
+        "_fill_batches",
+        "close",
+        "direction",
+    )
+
+    def __init__(self, elem=None, linked_island_index=0, ob=None, control_elem_seq=None, fill_elem_seq=None):
+        self.island_index = linked_island_index
+        self.ob = ob
+        self.batch_control_elements = None
+
+        # Sequences which resolve element indices
+        self._control_elem_seq = control_elem_seq
+        self._fill_elem_seq = fill_elem_seq
+
+        self._control_indices = _frozen(np.empty(0, dtype=np.int32))
+        self._fill_buffer = _FillBuffer(np.empty(0, dtype=np.int32))
+        self._fill_starts = _frozen(np.empty(0, dtype=np.int32))
+        self._fill_ends = _frozen(np.empty(0, dtype=np.int32))
+        # Fill batches, the last one is batch of close fill
+        self._fill_batches = []
+
+        if elem is not None:
+            self.insert_control_element(0, elem)
+
+        self.close = False
+        self.direction = True
+
+    @property
+    def control_elements(self):
+        return _ArrayControlView(self)
+
+    @control_elements.setter
+    def control_elements(self, value):
+        self._control_indices = _frozen(_gen_indices(value))
+
+    @property
+    def fill_elements(self):
+        return _ArrayFillsView(self, 0)
+
+    @fill_elements.setter
+    def fill_elements(self, value):
+        fill_indices_seq = [_gen_indices(n) for n in value]
+        fill_lengths = np.array([len(n) for n in fill_indices_seq], dtype=np.int32)
+        fill_batches = list(self._fill_batches)[:len(fill_indices_seq)]
+        fill_batches.extend(None for _ in range(len(fill_indices_seq) - len(fill_batches)))
+        self._set_fills((np.concatenate([np.empty(0, dtype=np.int32)] + fill_indices_seq), fill_lengths, fill_batches))
+
+    @property
+    def batch_seq_fills(self):
+        return _ArrayFillsView(self, 1)
+
+    @batch_seq_fills.setter
+    def batch_seq_fills(self, value):
+        fill_batches = list(value)[:len(self._fill_starts)]
+        fill_batches.extend(None for _ in range(len(self._fill_starts) - len(fill_batches)))
+        self._fill_batches = fill_batches
+
+    def copy(self):
+        new_path = ArrayPath(None, self.island_index, self.ob, self._control_elem_seq, self._fill_elem_seq)
+        new_path._control_indices = self._control_indices
+        new_path._fill_buffer = self._fill_buffer
+        new_path._fill_starts = self._fill_starts
+        new_path._fill_ends = self._fill_ends
+        new_path._fill_batches = self._fill_batches.copy()
+
+        new_path.batch_control_elements = self.batch_control_elements
+        new_path.close = self.close
+        new_path.direction = self.direction
+
+        return new_path
+
+    def __repr__(self):
+        # For development purposes only
+        return "\nArrayPath[%d]:\n    ce: %s\n    fe: %s\n    fb: %s" % (
+            id(self),
+            str(self._control_indices.tolist()),
+            str((self._fill_ends - self._fill_starts).tolist()),
+            str(["fb_%d" % i if batch is not None else None for i, batch in enumerate(self._fill_batches)])
+        )
+
+    def _take_fills(self, order):
+        """Return's tuple (fill indices, fill lengths, fill batches) of fills in given order"""
+        order = np.asarray(order, dtype=np.int32)
+        starts = self._fill_starts[order]
+        lengths = self._fill_ends[order] - starts
+        offsets = np.cumsum(lengths) - lengths
+        indices = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum(), dtype=np.int32)
+        return self._fill_buffer.array[indices], lengths, [self._fill_batches[i] for i in order.tolist()]
+
+    def _set_fills(self, *fills_seq):
+        """Set fills in a new buffer, joined from (fill indices, fill lengths, fill batches) tuples"""
+        fill_lengths = np.concatenate([n[1] for n in fills_seq]).astype(np.int32)
+        fill_ends = np.cumsum(fill_lengths, dtype=np.int32)
+        self._fill_buffer = _FillBuffer(np.concatenate([n[0] for n in fills_seq]))
+        self._fill_starts = _frozen(fill_ends - fill_lengths)
+        self._fill_ends = _frozen(fill_ends)
+        self._fill_batches = [batch for n in fills_seq for batch in n[2]]
+
+    def _set_fill(self, fill_index, fill_indices):
+        fill_buffer = self._fill_buffer
+        start = fill_buffer.append(fill_indices)
+        fill_starts = self._fill_starts.copy()
+        fill_ends = self._fill_ends.copy()
+        fill_starts[fill_index] = start
+        fill_ends[fill_index] = start + len(fill_indices)
+        self._fill_starts = _frozen(fill_starts)
+        self._fill_ends = _frozen(fill_ends)
+
+        # Buffer is replaced only for this path, copies (undo history steps) keep the previous one
+        if fill_buffer.size > (fill_ends - fill_starts).sum() * self.FILL_BUFFER_SLACK + len(fill_indices):
+            self._set_fills(self._take_fills(range(len(fill_starts))))
+
+    def __add__(self, other):
+        assert self.island_index == other.island_index
+
+        # Fills, except close fill, in order and reversed
+        def regular(path):
+            return range(len(path._fill_batches) - 1)
+
+        def regular_reversed(path):
+            return range(len(path._fill_batches) - 2, -1, -1)
+
+        for i in (0, -1):
+            elem = self.control_elements[i]
+            for j in (0, -1):
+                if elem != other.control_elements[j]:
+                    continue
+
+                if i == -1 and j == 0:
+                    # End-First
+                    control_indices = (self._control_indices[:-1], other._control_indices)
+                    fills_seq = (self._take_fills(regular(self)), other._take_fills(range(len(other._fill_batches))))
+
+                elif i == 0 and j == -1:
+                    # First-End
+                    control_indices = (other._control_indices, self._control_indices[1:])
+                    fills_seq = (other._take_fills(regular(other)), self._take_fills(range(len(self._fill_batches))))
+
+                elif i == 0 and j == 0:
+                    # First-First
+                    control_indices = (other._control_indices[::-1], self._control_indices[1:])
+                    fills_seq = (
+                        other._take_fills(regular_reversed(other)), self._take_fills(range(len(self._fill_batches))))
+
+                elif i == -1 and j == -1:
+                    # End-End
+                    control_indices = (self._control_indices[:-1], other._control_indices[::-1])
+                    fills_seq = (
+                        self._take_fills(regular(self)),
+                        other._take_fills(list(regular_reversed(other)) + [len(other._fill_batches) - 1]))
+
+                self._control_indices = _frozen(np.concatenate(control_indices))
+                self._set_fills(*fills_seq)
+                return self
+
+        return self
+
+    def reverse(self):
+        self._control_indices = _frozen(self._control_indices[::-1].copy())
+        fill_count = len(self._fill_batches)
+        if fill_count:
+            # Close fill keeps it's place, fill indices stay in buffer
+            order = list(range(fill_count - 2, -1, -1)) + [fill_count - 1]
+            self._fill_starts = _frozen(self._fill_starts[order])
+            self._fill_ends = _frozen(self._fill_ends[order])
+            self._fill_batches = [self._fill_batches[i] for i in order]
+        self.direction = not self.direction
+        return self
+
+    def is_in_control_elements(self, elem):
+        """
+        Return's element index in self.control_elements if exist, otherwise None
+        """
+        found = np.flatnonzero(self._control_indices == elem.index)
+        # Element with the same index may be element of other object or of other type
+        if len(found) and self._control_elem_seq[elem.index] == elem:
+            return int(found[0])
+
+    def is_in_fill_elements(self, elem):
+        """
+        Return's index of fill in self.fill_elements if element exist in any fill, otherwise None
+        """
+        if mesh_graph.is_vert(elem):
+            link_edges = list(elem.link_edges)
+            fill_elem_indices = [edge.index for edge in link_edges]
+        elif mesh_graph.is_face(elem):
+            fill_elem_indices = [elem.index]
+        else:
+            return None
+
+        fill_buffer = self._fill_buffer
+        found = np.flatnonzero(np.isin(fill_buffer.array[:fill_buffer.size], fill_elem_indices))
+        # Buffer positions of found elements to fills, positions out of fills are of replaced fills
+        fill_order = np.flatnonzero(self._fill_ends > self._fill_starts)
+        if not len(found) or not len(fill_order):
+            return None
+        fill_order = fill_order[np.argsort(self._fill_starts[fill_order])]
+        found_fills = fill_order[np.maximum(np.searchsorted(self._fill_starts[fill_order], found, side='right') - 1, 0)]
+        is_in_fill = (self._fill_starts[found_fills] <= found) & (found < self._fill_ends[found_fills])
+        found, found_fills = found[is_in_fill], found_fills[is_in_fill]
+        if not len(found):
+            return None
+
+        found_index = int(np.argmin(found_fills))
+        fill_index = int(found_fills[found_index])
+        fill_elem = self._fill_elem_seq[int(fill_buffer.array[found[found_index]])]
+        # Element with the same index may be element of other object
+        if mesh_graph.is_vert(elem):
+            if fill_elem not in link_edges:
+                return None
+        elif fill_elem != elem:
+            return None
+        return fill_index
+
+    def insert_control_element(self, elem_index, elem):
+        """
+        Insert
+        - new control element
+        - empty fill after this element
+        - placeholder for fill batch
+        """
+        control_elements_count = len(self._control_indices)
+        if elem_index < 0:
+            elem_index = max(0, elem_index + control_elements_count)
+        elem_index = min(elem_index, control_elements_count)
+        self._control_indices = _frozen(np.insert(self._control_indices, elem_index, elem.index))
+
+        # Previous close fill now is between previous last and new element if element is appended
+        fill_index = min(elem_index, len(self._fill_batches))
+        self._fill_starts = _frozen(np.insert(self._fill_starts, fill_index, 0))
+        self._fill_ends = _frozen(np.insert(self._fill_ends, fill_index, 0))
+        self._fill_batches.insert(fill_index, None)
+
+    remove_control_element = Path.remove_control_element
+
+    def pop_control_element(self, elem_index):
+        elem = self.control_elements[elem_index]
+        self._control_indices = _frozen(np.delete(self._control_indices, elem_index))
+        if not self._fill_batches:
+            return elem
+
+        pop_index = elem_index - 1
+        if elem_index == 0:
+            pop_index = 0
+        pop_index = range(len(self._fill_batches))[pop_index]
+        self._fill_starts = _frozen(np.delete(self._fill_starts, pop_index))
+        self._fill_ends = _frozen(np.delete(self._fill_ends, pop_index))
+        self._fill_batches.pop(pop_index)
+        return elem
+
+    get_pairs_items = Path.get_pairs_items